@@ -0,0 +1,148 @@
+import mmap
+import os
+import struct
+
+import numpy as np
+
+from session_audio import SessionAudio
+
+MAGIC = b"SALI"
+VERSION = 1
+
+# magic, version, channels, rate, data offset, data end, first segment, segment count, word count, path length
+HEADER = struct.Struct("<4sBBIIIIIIH")
+# Byte offsets into the archived WAV; a WAV file cannot exceed 4 GiB, so 32 bits suffice
+SEGMENT = np.dtype([('start', '<u4'), ('end', '<u4'), ('first_word', '<u4')])
+WORD = np.dtype([('start', '<u4'), ('end', '<u4')])
+
+
+class AlignmentIndex:
+    """Maps transcript segments and their words to byte ranges of the archived audio.
+
+    The .align file holds a small header, the path of the session WAV and
+    two fixed-width tables (12 bytes per segment, 8 per word). Opening it
+    maps the file and reads only the header; the tables are NumPy views
+    into the mapping, so a lookup touches the pages it needs and nothing
+    else. Segment numbers are positions in the saved transcript; the
+    index covers first_segment onwards, the segments of the recording the
+    audio belongs to.
+    """
+
+    def __init__(self, filename):
+        self.segments = self.words = self.session = None
+        self.file = open(filename, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, self.channels, self.rate, self.data_offset, self.data_end,
+         self.first_segment, segment_count, word_count, path_length) = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"Not an alignment index: {filename}")
+        position = HEADER.size
+        self.audio_file = self.map[position:position + path_length].decode('utf-8')
+        position = _aligned(position + path_length)
+        self.segments = np.frombuffer(self.map, SEGMENT, segment_count, position)
+        self.words = np.frombuffer(self.map, WORD, word_count, position + segment_count * SEGMENT.itemsize)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        return len(self.segments)
+
+    def _entry(self, segment):
+        position = segment - self.first_segment
+        if not 0 <= position < len(self.segments):
+            raise IndexError(f"Segment {segment} is not in the aligned recording")
+        return position
+
+    def segment_bytes(self, segment):
+        """(start, end) byte offsets of a transcript segment in the audio file"""
+        entry = self.segments[self._entry(segment)]
+        return int(entry['start']), int(entry['end'])
+
+    def word_count(self, segment):
+        position = self._entry(segment)
+        end = self.segments[position + 1]['first_word'] if position + 1 < len(self.segments) else len(self.words)
+        return int(end - self.segments[position]['first_word'])
+
+    def word_bytes(self, segment, word):
+        """(start, end) byte offsets of the segment's word-th word"""
+        if not 0 <= word < self.word_count(segment):
+            raise IndexError(f"Segment {segment} has no word {word}")
+        entry = self.words[int(self.segments[self._entry(segment)]['first_word']) + word]
+        return int(entry['start']), int(entry['end'])
+
+    def segment_at(self, ms):
+        """Transcript segment number playing at ms, or None"""
+        offset = self.data_offset + ms * self.rate // 1000 * 2 * self.channels
+        position = int(np.searchsorted(self.segments['start'], offset, side='right')) - 1
+        if position < 0 or offset >= self.segments[position]['end']:
+            return None
+        return position + self.first_segment
+
+    def to_ms(self, offset):
+        """Recording offset in ms of a byte offset in the audio file"""
+        return (offset - self.data_offset) // (2 * self.channels) * 1000 // self.rate
+
+    def audio(self, segment, word=None):
+        """int16 view of a segment's (or word's) audio in the memory-mapped archive"""
+        if self.session is None:
+            self.session = SessionAudio(self.audio_file)
+        start, end = self.segment_bytes(segment) if word is None else self.word_bytes(segment, word)
+        frame_bytes = 2 * self.channels
+        return self.session.samples[(start - self.data_offset) // frame_bytes:(end - self.data_offset) // frame_bytes]
+
+    def play(self, segment, word=None):
+        """Play a segment or one of its words; returns at once (needs sounddevice)"""
+        import sounddevice as sd
+        sd.play(self.audio(segment, word), self.rate)
+
+    def close(self):
+        self.segments = self.words = None
+        if self.session:
+            self.session.close()
+        try:
+            self.map.close()
+        except BufferError:
+            pass  # A table view is still in use; the mapping is released with it
+        self.file.close()
+
+
+def write_alignment(segments, filename, audio_file, first_segment=0):
+    """Write the alignment of segments[first_segment:] to the session WAV audio_file.
+
+    Words are taken from segment.words entries with start_ms and end_ms,
+    as the streaming recognizer fills them. Segments are expected in
+    start-time order. Returns the segment count.
+    """
+    segments = list(segments)[first_segment:]
+    with SessionAudio(audio_file) as session:
+        channels, rate, data_offset = session.channels, session.rate, session.data_offset
+        data_end = data_offset + session.samples.nbytes
+        segment_table = np.zeros(len(segments), SEGMENT)
+        word_offsets = []
+        for i, segment in enumerate(segments):
+            segment_table[i] = (session.byte_offset(segment.start_ms), session.byte_offset(segment.end_ms),
+                                len(word_offsets))
+            for word in segment.words:
+                if 'start_ms' in word and 'end_ms' in word:
+                    word_offsets.append((session.byte_offset(word['start_ms']), session.byte_offset(word['end_ms'])))
+    word_table = np.array(word_offsets, WORD)
+
+    path = os.path.abspath(audio_file).encode('utf-8')
+    with open(filename, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, channels, rate, data_offset, data_end,
+                            first_segment, len(segment_table), len(word_table), len(path)))
+        f.write(path)
+        f.write(b"\0" * (_aligned(HEADER.size + len(path)) - HEADER.size - len(path)))
+        f.write(segment_table.tobytes())
+        f.write(word_table.tobytes())
+    return len(segment_table)
+
+
+def _aligned(position):
+    """Round up to 4 bytes so the tables are aligned for NumPy"""
+    return (position + 3) & ~3
@@ -6,6 +6,7 @@ import os
 from audio_recorder import AudioRecorder
 from transcription_service import TranscriptionService
 from file_manager import FileManager
+from transcript_segment import format_offset
 import plotly.graph_objects as go
 import numpy as np
 
@@ -59,6 +60,8 @@ if 'recording_state' not in st.session_state:
     st.session_state.recording_state = False
 if 'transcription_text' not in st.session_state:
     st.session_state.transcription_text = ""
+if 'live_text' not in st.session_state:
+    st.session_state.live_text = ""  # Interim hypothesis of a streaming backend
 if 'audio_recorder' not in st.session_state:
     st.session_state.audio_recorder = AudioRecorder()
 if 'transcription_service' not in st.session_state:
@@ -70,26 +73,31 @@ def start_recording():
     """Start the recording process"""
     st.session_state.recording_state = True
     st.session_state.transcription_text = ""
+    st.session_state.live_text = ""
+    # A new session: "auto" identifies the language again
+    service = st.session_state.transcription_service
+    service.set_language(service.language)
     
     # Start recording in background thread
     def record_audio():
         try:
-            audio_file = st.session_state.audio_recorder.start_recording()
+            recorder = st.session_state.audio_recorder
+            if st.session_state.transcription_service.supports_streaming():
+                stream_audio(recorder, st.session_state.transcription_service)
+                return
+            recorder.start_recording()
             
-            while st.session_state.recording_state:
-                time.sleep(1)
-                if st.session_state.audio_recorder.has_audio_data():
-                    chunk_file = st.session_state.audio_recorder.get_audio_chunk()
-                    if chunk_file:
-                        text = st.session_state.transcription_service.transcribe_audio(chunk_file)
-                        if text:
-                            st.session_state.transcription_text += text + "\n"
+            # Each chunk arrives as soon as it is captured; stop_recording() wakes the loop
+            for chunk_file, _, _ in recorder.chunks(until=lambda: not st.session_state.recording_state):
+                text = st.session_state.transcription_service.transcribe_audio(chunk_file)
+                if text:
+                    st.session_state.transcription_text += text + "\n"
             
-            # Final transcription
-            st.session_state.audio_recorder.stop_recording()
-            final_text = st.session_state.transcription_service.transcribe_audio(audio_file)
+            # Final transcription of the audio not yet chunked
+            final_file = recorder.stop_recording()
+            final_text = final_file and st.session_state.transcription_service.transcribe_audio(final_file)
             if final_text:
-                st.session_state.transcription_text = final_text
+                st.session_state.transcription_text += final_text + "\n"
                 
         except Exception as e:
             st.error(f"Recording error: {str(e)}")
@@ -98,9 +106,34 @@ def start_recording():
     thread.daemon = True
     thread.start()
 
+def stream_audio(recorder, transcription_service):
+    """Recognize with a streaming backend; interim hypotheses update the live line"""
+    from streaming_recognition import identify_streaming_language, stream_transcripts
+    
+    tap = recorder.open_tap()
+    try:
+        recorder.start_recording()
+        until = lambda: not st.session_state.recording_state
+        # "auto" picks the model from the first seconds, which are then recognized with it
+        lead_in = identify_streaming_language(tap, recorder, transcription_service, until)
+        recognizer = transcription_service.create_streaming_recognizer(recorder.rate)
+        for kind, value in stream_transcripts(tap, recorder, recognizer, until, lead_in=lead_in):
+            if kind == "partial":
+                st.session_state.live_text = value
+                continue
+            # Release the recognized audio; the chunk path's files are not needed
+            recorder.take_audio(value.end_ms if value else None)
+            st.session_state.live_text = ""
+            if value:
+                st.session_state.transcription_text += f"[{format_offset(value.start_ms)}] {value.text}\n"
+    finally:
+        recorder.close_tap(tap)
+        recorder.stop_capture()
+
 def stop_recording():
     """Stop the recording process"""
     st.session_state.recording_state = False
+    st.session_state.audio_recorder.wake()
 
 def main():
     # Header
@@ -132,7 +165,13 @@ def main():
         
         # Settings
         st.header("🔧 Settings")
-        language = st.selectbox("Language", ["en", "es", "fr", "de", "it"], index=0)
+        service = st.session_state.transcription_service
+        language_names = service.get_available_languages()
+        languages = ["auto"] + list(language_names)
+        language = st.selectbox("Language", languages, index=languages.index(service.language),
+                                format_func=lambda code: language_names.get(code, "Detect automatically"))
+        if language != service.language:
+            service.set_language(language)
         audio_quality = st.slider("Audio Quality", 1, 10, 7)
         
         st.divider()
@@ -173,6 +212,16 @@ def main():
                     if content:
                         st.session_state.transcription_text = content
                         st.rerun()
+        
+        # Full-text search over the transcript archive
+        search_query = st.text_input("🔍 Search transcriptions")
+        if search_query:
+            hits = st.session_state.file_manager.search_transcriptions(search_query, limit=10)
+            if hits:
+                for hit in hits:
+                    st.caption(f"📄 {hit['name']} [{format_offset(hit['start_ms'])}] {hit['snippet']}")
+            else:
+                st.info("No matches found")
     
     # Main content area
     col1, col2 = st.columns([2, 1])
@@ -180,9 +229,10 @@ def main():
     with col1:
         st.header("📝 Live Transcription")
         
-        # Auto-refresh transcription display every 2 seconds during recording
+        # Auto-refresh the transcription display during recording; reruns are
+        # the frames that coalesce interim hypotheses, faster while one is shown
         if st.session_state.recording_state:
-            time.sleep(2)
+            time.sleep(0.5 if st.session_state.live_text else 2)
             st.rerun()
         
         # Transcription display
@@ -195,6 +245,8 @@ def main():
                 )
             else:
                 st.info("👆 Click 'Start Recording' to begin transcribing your meeting")
+            if st.session_state.live_text:
+                st.markdown(f"*{st.session_state.live_text}…*")
         
         # Meeting summary section
         if st.session_state.transcription_text and not st.session_state.recording_state:
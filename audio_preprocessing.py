@@ -0,0 +1,219 @@
+import numpy as np
+
+STAGES = ("dc", "noise_gate", "agc", "pre_emphasis")
+
+
+class AudioPreprocessor:
+    """Cleans up captured blocks before they are buffered.
+
+    Stages, applied in this order and each optional:
+
+    - dc: removes the DC offset tracked as a slow moving average;
+    - noise_gate: spectral gate on a short-time Fourier transform with
+      square-root Hann windows of two blocks at 50% overlap, resynthesized
+      by overlap-add, so block boundaries stay continuous. Each block is
+      held back until the next one arrives, see process(). A per-bin noise floor is averaged over the
+      low-energy blocks only: blocks within quiet_ratio of the quietest
+      recent level, which itself may rise by quiet_rise_db per second and
+      never above max_noise_rms, so speech or a loud steady tone is not
+      learned as noise. Until the first low-energy block nothing is gated.
+      Bins near the floor are attenuated down to gate_floor, with gains
+      smoothed over time;
+    - agc: automatic gain control towards target_rms, with a fast attack
+      and slow release, frozen on the gate's low-energy blocks;
+    - pre_emphasis: y[n] = x[n] - coefficient * x[n-1] (off by default;
+      it helps HMM recognizers such as Sphinx more than cloud ones).
+
+    process() works in place on float32 blocks of shape (frames, channels)
+    and reuses buffers allocated for the first block size; only NumPy's
+    FFT allocates its own output. With the noise gate each block comes
+    back one call later: the first call returns None and flush() returns
+    the last block, so the output lines up with the input sample for
+    sample.
+    """
+
+    def __init__(self, rate, dc=True, noise_gate=True, agc=True, pre_emphasis=0.0,
+                 dc_seconds=0.5, gate_ratio=2.0, gate_floor=0.1, noise_seconds=1.0,
+                 quiet_ratio=2.0, quiet_rise_db=3.0, max_noise_rms=0.01,
+                 target_rms=0.1, max_gain=20.0, attack_seconds=0.05, release_seconds=2.0):
+        self.rate = rate
+        self.dc = dc
+        self.noise_gate = noise_gate
+        self.agc = agc
+        self.pre_emphasis = pre_emphasis
+        self.dc_seconds = dc_seconds
+        self.gate_ratio = gate_ratio
+        self.gate_floor = gate_floor
+        self.noise_seconds = noise_seconds
+        self.quiet_ratio = quiet_ratio
+        self.quiet_rise_db = quiet_rise_db
+        self.max_noise_rms = max_noise_rms
+        self.target_rms = target_rms
+        self.max_gain = max_gain
+        self.attack_seconds = attack_seconds
+        self.release_seconds = release_seconds
+        self.gain = 1.0
+        self.shape = None
+
+    def _allocate(self, shape):
+        frames, channels = shape
+        self.shape = shape
+        self.block_seconds = frames / self.rate
+        self.dc_alpha = min(self.block_seconds / self.dc_seconds, 1.0)
+        self.attack = min(self.block_seconds / self.attack_seconds, 1.0)
+        self.release = min(self.block_seconds / self.release_seconds, 1.0)
+        self.noise_alpha = min(self.block_seconds / self.noise_seconds, 1.0)
+        self.quiet_rise = 10 ** (self.quiet_rise_db * self.block_seconds / 20)
+        self.quiet_rms = None  # Quietest recent block level
+        self.quiet = False  # Whether the block held back in history was quiet
+        self.holding = False  # The gate holds a block back, see flush
+        self.held_frames = frames  # Its length; the last block may be short
+        self.offset = np.zeros(channels, dtype=np.float32)
+        self.mean = np.zeros(channels, dtype=np.float32)
+        # STFT frames span the previous and the current block
+        bins = frames + 1
+        n = np.arange(2 * frames)
+        self.window = np.sqrt(0.5 - 0.5 * np.cos(np.pi * n / frames)).astype(np.float32).reshape(-1, 1)
+        self.history = np.zeros((2 * frames, channels), dtype=np.float32)
+        self.frame = np.empty((2 * frames, channels), dtype=np.float32)
+        self.overlap = np.zeros((2 * frames, channels), dtype=np.float32)
+        self.magnitude = np.zeros((bins, channels), dtype=np.float32)
+        self.noise = np.zeros((bins, channels), dtype=np.float32)
+        self.noise_ready = False  # Set by the first low-energy block
+        self.threshold = np.zeros((bins, channels), dtype=np.float32)  # gate_ratio * noise
+        self.mask = np.ones((bins, channels), dtype=np.float32)
+        self.target_mask = np.empty((bins, channels), dtype=np.float32)
+        self.opening = np.empty((bins, channels), dtype=bool)
+        self.update = np.empty((bins, channels), dtype=np.float32)
+        self.smoothing = np.empty((bins, channels), dtype=np.float32)
+        self.shifted = np.empty(shape, dtype=np.float32)
+        self.last_sample = np.zeros(channels, dtype=np.float32)
+
+    def process(self, block):
+        """Clean up a float32 (frames, channels) block in place and return it.
+
+        Returns None instead for the first block with the noise gate, whose
+        output would be the silence before the recording. A block shorter
+        than the first ones (the end of a replayed file) is padded to their
+        size in a copy.
+        """
+        frames = len(block)
+        if self.shape is not None and block.shape[1:] == self.shape[1:] and frames < self.shape[0]:
+            padded = np.zeros(self.shape, dtype=np.float32)
+            padded[:frames] = block
+            block = padded
+        elif block.shape != self.shape:
+            self._allocate(block.shape)
+        if self.dc:
+            self._remove_dc(block)
+        if not self.noise_gate:
+            return self._finish(block, False)[:frames]
+        leading = not self.holding
+        held_frames, self.held_frames = self.held_frames, frames
+        is_noise = self._gate(block)
+        self.holding = True
+        return None if leading else self._finish(block, is_noise)[:held_frames]
+
+    def flush(self):
+        """The block the noise gate still holds back, cleaned up; None when there is none"""
+        if not self.holding:
+            return None
+        self.holding = False
+        block = np.zeros(self.shape, dtype=np.float32)
+        return self._finish(block, self._gate(block, learn=False))[:self.held_frames]
+
+    def _finish(self, block, is_noise):
+        if self.agc:
+            self._control_gain(block, is_noise)
+        if self.pre_emphasis:
+            self._emphasize(block)
+        return block
+
+    def _remove_dc(self, block):
+        np.mean(block, axis=0, out=self.mean)
+        self.offset += self.dc_alpha * (self.mean - self.offset)
+        block -= self.offset
+
+    def _gate(self, block, learn=True):
+        """Spectral gate; returns True when the block has low energy.
+
+        Replaces the block with the gated block before it (one block of
+        latency): each call completes the overlap-add of the frame that
+        ends with the incoming block. The returned flag is that of the
+        block given back. With learn=False (the padding of flush) the
+        incoming block does not count towards the noise floor.
+        """
+        frames = len(block)
+        quiet = False
+        if learn:
+            # Level without DC, which the dc stage may have left to this one
+            np.mean(block, axis=0, out=self.mean)
+            rms = float(np.sqrt(max(np.vdot(block, block) / block.size
+                                    - np.vdot(self.mean, self.mean) / len(self.mean), 0.0)))
+            if self.quiet_rms is None:
+                self.quiet_rms = rms
+            else:
+                self.quiet_rms = min(rms, max(self.quiet_rms, 1e-5) * self.quiet_rise)
+            self.quiet_rms = min(self.quiet_rms, self.max_noise_rms)
+            quiet = rms <= self.quiet_rms * self.quiet_ratio
+
+        # Analysis frame: the previous block followed by this one
+        self.history[:frames] = self.history[frames:]
+        self.history[frames:] = block
+        np.multiply(self.history, self.window, out=self.frame)
+        spectrum = np.fft.rfft(self.frame, axis=0)
+        np.abs(spectrum, out=self.magnitude)
+
+        if quiet:
+            # Average low-energy frames into the floor
+            if self.noise_ready:
+                np.subtract(self.magnitude, self.noise, out=self.update)
+                self.update *= self.noise_alpha
+                self.noise += self.update
+            else:
+                self.noise[:] = self.magnitude
+                self.noise_ready = True
+            np.multiply(self.noise, self.gate_ratio, out=self.threshold)
+
+        if self.noise_ready:
+            # Gain per bin from the magnitude over the floor, limited to gate_floor
+            np.maximum(self.magnitude, 1e-12, out=self.magnitude)
+            np.divide(self.threshold, self.magnitude, out=self.target_mask)
+            np.subtract(1.0, self.target_mask, out=self.target_mask)
+            np.clip(self.target_mask, self.gate_floor, 1.0, out=self.target_mask)
+
+            # Smoothed over time: open quickly, close over a few blocks
+            np.greater(self.target_mask, self.mask, out=self.opening)
+            np.multiply(self.opening, 0.4, out=self.smoothing)
+            self.smoothing += 0.3
+            self.target_mask -= self.mask
+            self.target_mask *= self.smoothing
+            self.mask += self.target_mask
+            spectrum *= self.mask
+
+        # Synthesis window and overlap-add; the first half is complete
+        np.multiply(np.fft.irfft(spectrum, n=2 * frames, axis=0), self.window, out=self.frame)
+        self.overlap += self.frame
+        block[:] = self.overlap[:frames]
+        self.overlap[:frames] = self.overlap[frames:]
+        self.overlap[frames:] = 0.0
+        quiet, self.quiet = self.quiet, quiet
+        return quiet
+
+    def _control_gain(self, block, is_noise):
+        if not is_noise:
+            rms = float(np.sqrt(np.vdot(block, block) / block.size))
+            if rms > 1e-6:
+                wanted = min(self.target_rms / rms, self.max_gain)
+                rate = self.attack if wanted < self.gain else self.release
+                self.gain += rate * (wanted - self.gain)
+        block *= self.gain
+        np.clip(block, -1.0, 1.0, out=block)
+
+    def _emphasize(self, block):
+        shifted = self.shifted
+        shifted[0] = self.last_sample
+        shifted[1:] = block[:-1]
+        self.last_sample[:] = block[-1]
+        shifted *= self.pre_emphasis
+        block -= shifted
@@ -0,0 +1,204 @@
+import os
+import sys
+import threading
+import time
+import wave
+
+import numpy as np
+
+SOURCE_TYPES = ("file", "pipe")
+
+
+class _Status:
+    """The part of sounddevice.CallbackFlags the recorders look at"""
+
+    def __init__(self, overflow=False):
+        self.input_overflow = overflow
+        self.input_underflow = False
+
+
+class ReplayStream:
+    """Base for streams that feed recorded audio to a sounddevice-style callback.
+
+    Blocks of ``blocksize`` frames are read by a background thread and
+    passed to ``callback(indata, frames, time, status)`` exactly like a
+    sounddevice.InputStream does, as float32 arrays of shape (frames,
+    channels). ``speed`` paces delivery relative to real time; 0 delivers
+    as fast as the callback returns. With ``drop_late`` the stream behaves
+    like a device with ``buffer_blocks`` blocks of buffering: blocks the
+    callback is too late for are skipped and the next callback sees
+    input_overflow. With ``log_delivery`` the wall-clock time of every
+    block is kept in delivery_log as (frames delivered, perf_counter()).
+    ``on_finished`` is called from the stream thread after the last block.
+    """
+
+    def __init__(self, callback, samplerate, channels, blocksize=1024, speed=1.0,
+                 drop_late=False, buffer_blocks=8, log_delivery=False):
+        self.callback = callback
+        self.samplerate = samplerate
+        self.channels = channels
+        self.blocksize = blocksize
+        self.speed = speed
+        self.drop_late = drop_late
+        self.buffer_blocks = buffer_blocks
+        self.delivery_log = [] if log_delivery else None
+        self.frames_delivered = 0
+        self.dropped_blocks = 0
+        self.finished = threading.Event()
+        self.on_finished = None
+        self.stopped = threading.Event()
+        self.thread = None
+
+    @property
+    def active(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join(timeout=1.0)  # A pipe read may block until the producer writes
+
+    def close(self):
+        self.stop()
+        self._close()
+
+    def _read_block(self, frames):
+        """Return up to `frames` frames as float32 (n, channels); empty at the end"""
+        raise NotImplementedError
+
+    def _close(self):
+        pass
+
+    def _run(self):
+        block_seconds = self.blocksize / self.samplerate / self.speed if self.speed else 0
+        started = time.perf_counter()
+        block = 0
+        overflow = False
+        try:
+            while not self.stopped.is_set():
+                due = started + block * block_seconds
+                now = time.perf_counter()
+                if now < due:
+                    time.sleep(due - now)
+                elif self.drop_late and block_seconds and now - due > self.buffer_blocks * block_seconds:
+                    # The callback is too late: the device buffer has overflowed
+                    late = int((now - due) / block_seconds) - self.buffer_blocks + 1
+                    if len(self._read_block(late * self.blocksize)) == 0:
+                        break
+                    self.dropped_blocks += late
+                    block += late
+                    overflow = True
+                    continue
+
+                data = self._read_block(self.blocksize)
+                if len(data) == 0:
+                    break
+                self.callback(data, len(data), None, _Status(overflow))
+                overflow = False
+                block += 1
+                self.frames_delivered += len(data)
+                if self.delivery_log is not None:
+                    self.delivery_log.append((self.frames_delivered, time.perf_counter()))
+        finally:
+            self.finished.set()
+            if self.on_finished:
+                self.on_finished()
+
+
+class FileSource(ReplayStream):
+    """Replay a WAV file, or any format soundfile reads (FLAC, OGG), at its own rate"""
+
+    def __init__(self, path, callback, blocksize=1024, speed=1.0, **options):
+        self.path = path
+        self.wave_file = None
+        self.sound_file = None
+        try:
+            self.wave_file = wave.open(path, 'rb')
+            if self.wave_file.getsampwidth() != 2:
+                self.wave_file.close()
+                self.wave_file = None
+        except (wave.Error, EOFError):
+            self.wave_file = None
+
+        if self.wave_file is not None:
+            samplerate, channels = self.wave_file.getframerate(), self.wave_file.getnchannels()
+        else:
+            try:
+                import soundfile
+            except ImportError:
+                raise ImportError(f"Reading {os.path.basename(path)} requires: pip install soundfile")
+            self.sound_file = soundfile.SoundFile(path)
+            samplerate, channels = self.sound_file.samplerate, self.sound_file.channels
+        super().__init__(callback, samplerate, channels, blocksize, speed, **options)
+
+    @property
+    def duration_seconds(self):
+        frames = self.wave_file.getnframes() if self.wave_file else self.sound_file.frames
+        return frames / self.samplerate
+
+    def _read_block(self, frames):
+        if self.sound_file is not None:
+            return self.sound_file.read(frames, dtype='float32', always_2d=True)
+        data = np.frombuffer(self.wave_file.readframes(frames), dtype=np.int16)
+        return (data.astype(np.float32) / 32768.0).reshape(-1, self.channels)
+
+    def _close(self):
+        for audio_file in (self.wave_file, self.sound_file):
+            if audio_file is not None:
+                audio_file.close()
+
+
+class PipeSource(ReplayStream):
+    """Read raw interleaved PCM from stdin, a named pipe or any binary file object.
+
+    The producer usually sets the pace, so speed defaults to 0 (deliver as
+    soon as data arrives).
+    """
+
+    DTYPES = {'int16': (np.int16, 32768.0), 'int32': (np.int32, 2147483648.0), 'float32': (np.float32, 1.0)}
+
+    def __init__(self, callback, path=None, stream=None, samplerate=16000, channels=1, dtype='int16',
+                 blocksize=1024, speed=0, **options):
+        if dtype not in self.DTYPES:
+            raise ValueError(f"dtype must be one of {tuple(self.DTYPES)}")
+        self.dtype, self.scale = self.DTYPES[dtype]
+        self.owns_stream = stream is None and path is not None
+        if stream is None:
+            stream = open(path, 'rb') if path else sys.stdin.buffer
+        self.stream = stream
+        super().__init__(callback, samplerate, channels, blocksize, speed, **options)
+
+    def _read_block(self, frames):
+        frame_bytes = self.channels * np.dtype(self.dtype).itemsize
+        wanted = frames * frame_bytes
+        data = bytearray()
+        # Pipes return short reads; keep reading until a full block or EOF
+        while len(data) < wanted:
+            piece = self.stream.read(wanted - len(data))
+            if not piece:
+                break
+            data.extend(piece)
+        usable = len(data) - len(data) % frame_bytes
+        samples = np.frombuffer(bytes(data[:usable]), dtype=self.dtype).astype(np.float32)
+        if self.scale != 1.0:
+            samples /= self.scale
+        return samples.reshape(-1, self.channels)
+
+    def _close(self):
+        if self.owns_stream:
+            self.stream.close()
+
+
+def open_source(kind, callback, blocksize=1024, **options):
+    """Create the stream for a "file" (path=...) or "pipe" source"""
+    if kind == "file":
+        if not options.get('path'):
+            raise ValueError("The file source needs path=")
+        return FileSource(options.pop('path'), callback, blocksize, **options)
+    if kind == "pipe":
+        return PipeSource(callback, blocksize=blocksize, **options)
+    raise ValueError(f"Source must be one of {SOURCE_TYPES}")
@@ -0,0 +1,254 @@
+"""
+Offline benchmark of the capture-to-transcript pipeline
+Replays a WAV fixture through a recorder's file source, which paces blocks like a
+real device and drops them when the callback falls behind, with a stub recognizer;
+reports throughput, end-to-end latency, memory high-water mark and dropped blocks.
+Needs no audio hardware and no network.
+"""
+import argparse
+import bisect
+import json
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+import wave
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from process_memory import rss_mb
+
+
+def synthesize_fixture(filename, seconds=30, rate=16000, seed=0):
+    """Write a deterministic speech-like fixture: tone bursts separated by pauses"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * rate)) / rate
+    envelope = (np.sin(2 * np.pi * 0.4 * t) > -0.3).astype(np.float32)
+    voice = sum(np.sin(2 * np.pi * f * t) / (i + 1) for i, f in enumerate((180, 360, 720, 1440)))
+    samples = 0.2 * envelope * voice + 0.005 * rng.standard_normal(len(t))
+    with wave.open(filename, 'wb') as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(rate)
+        wf.writeframes(np.clip(samples * 32767, -32767, 32767).astype(np.int16).tobytes())
+
+
+class StubTranscriptionService:
+    """Deterministic recognizer with a configurable latency.
+
+    Reads the chunk file like a real backend would, waits ``latency``
+    seconds plus a seeded random jitter, and returns a segment whose text
+    names the chunk.
+    """
+
+    def __init__(self, latency=0.3, jitter=0.0, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.random = random.Random(seed)
+        self.calls = 0
+
+    def transcribe_segment(self, audio_file_path, start_ms, end_ms):
+        from transcript_segment import TranscriptSegment
+
+        with wave.open(audio_file_path, 'rb') as wf:
+            wf.readframes(wf.getnframes())
+        self.calls += 1
+        time.sleep(max(self.latency + self.random.uniform(-self.jitter, self.jitter), 0))
+        return TranscriptSegment(f"Chunk {self.calls}.", start_ms, end_ms)
+
+
+class _MemorySampler:
+    """Samples the resident set size in the background and keeps the peak"""
+
+    def __init__(self, interval=0.05):
+        self.interval = interval
+        self.peak = rss_mb()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stopped.set()
+        self.thread.join()
+        return False
+
+    def _run(self):
+        while not self.stopped.wait(self.interval):
+            self.peak = max(self.peak, rss_mb())
+
+
+# Recorder wrappers around the capture engine, by benchmark name
+RECORDERS = {
+    'enhanced': ('enhanced_audio_recorder', 'EnhancedAudioRecorder'),
+    'windows': ('windows_audio_recorder', 'WindowsAudioRecorder'),
+    'pyaudio': ('audio_recorder', 'AudioRecorder'),
+}
+
+
+def run_pipeline(fixture, service, speed=1.0, chunk_seconds=1.0, recorder="enhanced", adaptive=False,
+                 silence_gate=False):
+    """Drive the recorder like main.py does and return the benchmark report.
+
+    With adaptive, an AdaptiveChunkController sets the chunk length and
+    the number of chunks recognized at once; otherwise chunks are
+    chunk_seconds long and recognized one at a time. With silence_gate,
+    silent chunks are dropped before they reach the recognizer.
+    """
+    import importlib
+    from chunk_controller import AdaptiveChunkController
+    from pipeline_metrics import metrics
+
+    metrics.reset()
+    module_name, class_name = RECORDERS[recorder]
+    recorder_name, recorder = recorder, getattr(importlib.import_module(module_name), class_name)()
+    # Drop late blocks like a device would, and log when each block arrived
+    recorder.set_audio_source("file", path=fixture, speed=speed, drop_late=True, log_delivery=True)
+    if silence_gate:
+        recorder.enable_silence_gate()
+    controller = AdaptiveChunkController(min_seconds=chunk_seconds) if adaptive else None
+    latencies = []
+    segments = []
+
+    def emit(segment):
+        frames = segment.end_ms * stream.samplerate // 1000
+        index = bisect.bisect_left(stream.delivery_log, (frames,))
+        captured_at = stream.delivery_log[min(index, len(stream.delivery_log) - 1)][1]
+        latencies.append(time.perf_counter() - captured_at)
+        segments.append(segment)
+
+    def recognize(chunk_file, start_ms, end_ms):
+        recognize_started = time.perf_counter()
+        segment = service.transcribe_segment(chunk_file, start_ms, end_ms)
+        if controller:
+            controller.observe((end_ms - start_ms) / 1000, time.perf_counter() - recognize_started)
+        return segment
+
+    with _MemorySampler() as memory, ThreadPoolExecutor(max_workers=4) as executor:
+        started = time.perf_counter()
+        recorder.start_recording()
+        stream = recorder.stream
+        pending = deque()
+        while True:
+            seconds = controller.seconds if controller else chunk_seconds
+            while pending and pending[0].done():
+                emit(pending.popleft().result())
+            if len(pending) >= (controller.workers if controller else 1):
+                emit(pending.popleft().result())
+            elif recorder.wait_for_audio(seconds):
+                chunk = recorder.get_audio_segment(seconds=seconds)
+                if controller:
+                    controller.observe_lag(recorder.buffered_seconds())
+                if chunk:
+                    future = executor.submit(recognize, *chunk)
+                    future.add_done_callback(lambda _: recorder.wake())
+                    pending.append(future)
+            elif recorder.source_finished():
+                break
+        for future in pending:
+            emit(future.result())
+        final_chunk = recorder.stop_recording_segment()
+        if final_chunk:
+            emit(service.transcribe_segment(*final_chunk))
+        recorder.recording = False
+        wall_seconds = time.perf_counter() - started
+    recorder.cleanup()
+
+    audio_seconds = recorder.samples_consumed / recorder.rate
+    callback = metrics.histogram("capture_callback_seconds").snapshot()
+    encode = metrics.histogram("chunk_encode_seconds").snapshot()
+    return {
+        'recorder': recorder_name,
+        'adaptive': adaptive,
+        'silence_gate': silence_gate,
+        'speed': speed,
+        'recognizer_latency': service.latency,
+        'audio_seconds': round(audio_seconds, 2),
+        'wall_seconds': round(wall_seconds, 2),
+        'throughput': round(audio_seconds / wall_seconds, 2) if wall_seconds else None,
+        'segments': len(segments),
+        'recognizer_calls': service.calls,
+        'skipped_seconds': round(sum(recorder.silent_ms.values()) / 1000, 2),
+        'latency_p50': _percentile(latencies, 50),
+        'latency_p95': _percentile(latencies, 95),
+        'latency_p99': _percentile(latencies, 99),
+        'latency_max': round(max(latencies), 3) if latencies else None,
+        'peak_rss_mb': round(memory.peak, 1),
+        'dropped_blocks': stream.dropped_blocks,
+        'callback_p99_ms': round(callback['p99'] * 1000, 3) if callback['count'] else None,
+        'encode_p50_ms': round(encode['p50'] * 1000, 2) if encode['count'] else None,
+        'controller': controller.snapshot() if controller else None,
+    }
+
+
+def _percentile(values, percent):
+    if not values:
+        return None
+    if len(values) == 1:
+        return round(values[0], 3)
+    return round(statistics.quantiles(values, n=100, method='inclusive')[percent - 1], 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a WAV fixture through the recording pipeline")
+    parser.add_argument("fixture", nargs="?", help="WAV or FLAC recording (default: a synthetic 30 s fixture)")
+    parser.add_argument("--speed", type=float, nargs="+", default=[1.0, 4.0, 0.0],
+                        help="Replay speeds relative to real time; 0 replays as fast as possible")
+    parser.add_argument("--latency", type=float, default=0.3, help="Stub recognizer latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.05, help="Random latency variation in seconds")
+    parser.add_argument("--chunk-seconds", type=float, default=1.0,
+                        help="Audio per recognition chunk (the minimum with --adaptive)")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="Let the chunk controller adapt chunk length and parallelism")
+    parser.add_argument("--recorder", nargs="+", choices=sorted(RECORDERS), default=["enhanced"],
+                        help="Recorders to compare; all share the capture engine core")
+    parser.add_argument("--silence-gate", action="store_true",
+                        help="Drop silent chunks before recognition")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args()
+
+    fixture = args.fixture
+    if fixture is None:
+        fixture = os.path.join(tempfile.gettempdir(), "meeting_fixture.wav")
+        synthesize_fixture(fixture)
+    with wave.open(fixture, 'rb') as wf:
+        fixture_seconds = wf.getnframes() / wf.getframerate()
+
+    results = []
+    for recorder in args.recorder:
+        for speed in args.speed:
+            service = StubTranscriptionService(args.latency, args.jitter)
+            results.append(run_pipeline(fixture, service, speed, args.chunk_seconds, recorder,
+                                        args.adaptive, args.silence_gate))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"Fixture: {fixture} ({fixture_seconds:.1f} s), recognizer latency "
+          f"{args.latency * 1000:.0f}±{args.jitter * 1000:.0f} ms\n")
+    print(f"{'recorder':>9} {'speed':>6} {'x real time':>11} {'p50 s':>7} {'p95 s':>7} {'p99 s':>7} {'max s':>7} "
+          f"{'RSS MB':>7} {'dropped':>8} {'cb p99 ms':>10} {'enc ms':>7}")
+    for result in results:
+        speed = f"{result['speed']:g}x" if result['speed'] else "max"
+        print(f"{result['recorder']:>9} {speed:>6} {result['throughput']:>11.2f} {result['latency_p50']:>7.3f} "
+              f"{result['latency_p95']:>7.3f} {result['latency_p99']:>7.3f} {result['latency_max']:>7.3f} "
+              f"{result['peak_rss_mb']:>7.1f} {result['dropped_blocks']:>8} "
+              f"{result['callback_p99_ms'] or 0:>10.3f} {result['encode_p50_ms'] or 0:>7.2f}")
+        if result['controller']:
+            controller = result['controller']
+            print(f"{'':>16} controller: {controller['seconds']} s chunks, {controller['workers']} workers, "
+                  f"round trip {controller['round_trip']} s, lag {controller['lag']} s")
+        if result['silence_gate']:
+            print(f"{'':>16} silence gate: {result['skipped_seconds']} s skipped, "
+                  f"{result['recognizer_calls']} recognizer calls")
+
+
+if __name__ == "__main__":
+    main()
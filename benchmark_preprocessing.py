@@ -0,0 +1,105 @@
+"""
+Benchmark of the capture preprocessing stage
+Runs AudioPreprocessor over a synthetic quiet, noisy, DC-shifted recording block by block, like the capture callback does,
+and reports the CPU share of one core per stage combination plus the level and signal-to-noise change.
+"""
+import argparse
+import json
+import statistics
+import time
+
+import numpy as np
+
+from audio_preprocessing import AudioPreprocessor, STAGES
+
+# Share of one core the stage may use at 16 kHz
+CPU_BUDGET_PERCENT = 2.0
+
+
+def synthesize(seconds, rate, seed=0):
+    """Quiet tone bursts (like distant system audio) over noise and a DC offset.
+
+    Returns the (frames, 1) float32 signal and the boolean mask of the
+    samples where the "voice" is on.
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * rate)) / rate
+    voice_on = np.sin(2 * np.pi * 0.4 * t) > -0.3
+    voice = sum(np.sin(2 * np.pi * f * t) / (i + 1) for i, f in enumerate((180, 360, 720, 1440)))
+    signal = 0.02 * voice_on * voice + 0.004 * rng.standard_normal(len(t)) + 0.05
+    return signal.astype(np.float32).reshape(-1, 1), voice_on
+
+
+def run(signal, rate, blocksize, **options):
+    """Process the signal block by block; returns the output and per-block seconds"""
+    preprocessor = AudioPreprocessor(rate, **options)
+    blocks = []
+    timings = []
+    for start in range(0, len(signal) - blocksize + 1, blocksize):
+        block = signal[start:start + blocksize].copy()  # The callback's indata.copy()
+        started = time.perf_counter()
+        block = preprocessor.process(block)
+        timings.append(time.perf_counter() - started)
+        if block is not None:
+            blocks.append(block)
+    # The block the noise gate holds back, as the capture engine buffers it when stopping
+    block = preprocessor.flush()
+    if block is not None:
+        blocks.append(block)
+    return np.concatenate(blocks), timings
+
+
+def snr_db(audio, voice_on):
+    audio = audio[:, 0] - audio[:, 0].mean()
+    voice = np.sqrt(np.mean(audio[voice_on] ** 2))
+    noise = np.sqrt(np.mean(audio[~voice_on] ** 2))
+    return 20 * np.log10(voice / noise)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CPU cost of the capture preprocessing stages")
+    parser.add_argument("--rate", type=int, default=16000, help="Sample rate in Hz")
+    parser.add_argument("--blocksize", type=int, default=1024, help="Frames per capture block")
+    parser.add_argument("--seconds", type=float, default=60.0, help="Audio to process")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args()
+
+    signal, voice_on = synthesize(args.seconds, args.rate)
+    # The default stages, every stage including pre-emphasis, then each alone
+    configurations = {'default': {}, 'all': {'pre_emphasis': 0.97}}
+    for stage in STAGES:
+        alone = {other: False for other in STAGES if other != "pre_emphasis"}
+        alone['pre_emphasis'] = 0.0
+        alone[stage] = 0.97 if stage == "pre_emphasis" else True
+        configurations[stage] = alone
+
+    results = []
+    for name, options in configurations.items():
+        output, timings = run(signal, args.rate, args.blocksize, **options)
+        audio_seconds = len(output) / args.rate
+        results.append({
+            'stages': name,
+            'cpu_percent': round(sum(timings) / audio_seconds * 100, 3),
+            'block_p50_us': round(statistics.median(timings) * 1e6, 1),
+            'block_p99_us': round(statistics.quantiles(timings, n=100)[98] * 1e6, 1),
+            'voice_rms': round(float(np.sqrt(np.mean(output[voice_on[:len(output)]] ** 2))), 4),
+            'snr_gain_db': round(snr_db(output, voice_on[:len(output)]) - snr_db(signal, voice_on), 1),
+        })
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{args.seconds:g} s at {args.rate} Hz in blocks of {args.blocksize}; "
+          f"input voice RMS {np.sqrt(np.mean((signal[voice_on] - 0.05) ** 2)):.4f}\n")
+    print(f"{'stages':>13} {'CPU %':>7} {'p50 us':>8} {'p99 us':>8} {'voice RMS':>10} {'SNR +dB':>8}")
+    for result in results:
+        print(f"{result['stages']:>13} {result['cpu_percent']:>7.3f} {result['block_p50_us']:>8.1f} "
+              f"{result['block_p99_us']:>8.1f} {result['voice_rms']:>10.4f} {result['snr_gain_db']:>8.1f}")
+    total = results[1]['cpu_percent']
+    verdict = "within" if total < CPU_BUDGET_PERCENT else "OVER"
+    print(f"\nAll stages: {total:.3f}% of one core, {verdict} the {CPU_BUDGET_PERCENT:g}% budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Quantization benchmark for the summarization model
+Compares tokens/second, resident memory and accuracy of the fp32, int8 and ONNX Runtime paths
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+
+MODES = ["fp32", "int8", "onnx"]
+NEW_TOKENS = 48
+
+PROMPTS = [
+    "Meeting transcript:\nWe agreed to move the product launch to March because the testing "
+    "phase needs two more weeks. Sarah will update the roadmap and inform the sales team.\n\n"
+    "Short summary of the discussion:",
+    "Meeting transcript:\nThe budget for the marketing campaign was approved. John asked for a "
+    "breakdown per channel before Friday and the design team will prepare the first drafts.\n\n"
+    "Short summary of the discussion:",
+    "Meeting transcript:\nCustomer support tickets increased by twenty percent after the last "
+    "release. The team will add more logging and schedule a review of the login flow.\n\n"
+    "Short summary of the discussion:",
+    "Meeting transcript:\nWe discussed hiring two backend engineers. Interviews start next week "
+    "and everyone should send their availability to the recruiting coordinator.\n\n"
+    "Short summary of the discussion:",
+]
+
+# Used for the perplexity sanity check
+REFERENCE_TEXT = (
+    "Good morning everyone. Let's start with a quick update on the project timeline. "
+    "The development team finished the new dashboard last week and testing is in progress. "
+    "We found a few issues with the export feature, which should be fixed by Thursday. "
+    "Next, we need to decide on the release date and who will write the announcement."
+)
+
+
+def run_mode(mode):
+    """Benchmark one inference path in this process and print a JSON result"""
+    import torch
+    from summarization_service import load_language_model
+
+    before = rss_mb()
+    started = time.perf_counter()
+    tokenizer, model = load_language_model(quantize=None if mode == "fp32" else mode)
+    load_seconds = time.perf_counter() - started
+    loaded = rss_mb()
+
+    inputs = tokenizer(PROMPTS, return_tensors="pt", padding=True)
+    generate_args = dict(input_ids=inputs.input_ids, attention_mask=inputs.attention_mask,
+                         max_new_tokens=NEW_TOKENS, min_new_tokens=NEW_TOKENS,
+                         do_sample=False, num_beams=1, pad_token_id=tokenizer.pad_token_id)
+    with torch.inference_mode():
+        model.generate(**{**generate_args, 'max_new_tokens': 4, 'min_new_tokens': 4})  # Warm-up
+        started = time.perf_counter()
+        output = model.generate(**generate_args)
+        generate_seconds = time.perf_counter() - started
+    new_tokens = output[:, inputs.input_ids.shape[1]:]
+
+    reference = tokenizer(REFERENCE_TEXT, return_tensors="pt")
+    with torch.inference_mode():
+        logits = model(input_ids=reference.input_ids, attention_mask=reference.attention_mask).logits
+        loss = torch.nn.functional.cross_entropy(
+            logits[0, :-1].float(), reference.input_ids[0, 1:])
+
+    print(json.dumps({
+        'mode': mode,
+        'load_seconds': round(load_seconds, 2),
+        'tokens_per_second': round(new_tokens.numel() / generate_seconds, 1),
+        'rss_mb': round(rss_mb(), 1),
+        'model_rss_mb': round(loaded - before, 1),
+        'perplexity': round(float(torch.exp(loss)), 3),
+        'tokens': new_tokens.tolist(),
+    }))
+
+
+def main():
+    results = {}
+    for mode in MODES:
+        print(f"Benchmarking {mode}...")
+        # A fresh interpreter per mode keeps the memory figures independent
+        completed = subprocess.run([sys.executable, os.path.abspath(__file__), "--mode", mode],
+                                   capture_output=True, text=True)
+        if completed.returncode != 0:
+            error = completed.stderr.strip().splitlines()[-1:] or ["unknown error"]
+            print(f"  skipped: {error[0]}")
+            continue
+        results[mode] = json.loads(completed.stdout.strip().splitlines()[-1])
+
+    if "fp32" not in results:
+        print("fp32 baseline failed; nothing to compare")
+        return
+
+    baseline = results["fp32"]
+    print(f"\n{'mode':<6} {'tok/s':>8} {'speedup':>8} {'RSS MB':>8} {'model MB':>9} "
+          f"{'ppl':>8} {'ppl Δ%':>7} {'agree':>6}")
+    for mode, result in results.items():
+        pairs = [(a, b) for row, base_row in zip(result['tokens'], baseline['tokens'])
+                 for a, b in zip(row, base_row)]
+        agreement = sum(a == b for a, b in pairs) / max(len(pairs), 1)
+        ppl_change = (result['perplexity'] / baseline['perplexity'] - 1) * 100
+        result['agreement'] = agreement
+        result['perplexity_change'] = ppl_change
+        print(f"{mode:<6} {result['tokens_per_second']:>8.1f} "
+              f"{result['tokens_per_second'] / baseline['tokens_per_second']:>7.2f}x "
+              f"{result['rss_mb']:>8.1f} {result['model_rss_mb']:>9.1f} "
+              f"{result['perplexity']:>8.2f} {ppl_change:>+7.1f} {agreement:>6.0%}")
+
+    # Sanity check: a usable quantized path stays close to fp32
+    for mode, result in results.items():
+        if result['perplexity_change'] > 10 or result['agreement'] < 0.5:
+            print(f"⚠️  {mode} drifts from fp32 (perplexity {result['perplexity_change']:+.1f}%, "
+                  f"greedy agreement {result['agreement']:.0%}); check summaries before using it")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "--mode":
+        run_mode(sys.argv[2])
+    else:
+        main()
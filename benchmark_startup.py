@@ -0,0 +1,78 @@
+"""
+Start-up benchmark for the Smart Meeting Assistant
+Measures the import-time profile of main.py and the time until the window is drawn
+"""
+import os
+import statistics
+import subprocess
+import sys
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Runs in a fresh interpreter; prints seconds from interpreter start to the
+# first drawn window, or "nodisplay" when Tk cannot open one
+WINDOW_SCRIPT = """
+import time, sys
+start = time.perf_counter()
+import tkinter as tk
+import main
+try:
+    root = tk.Tk()
+except tk.TclError:
+    print("nodisplay", time.perf_counter() - start)
+    sys.exit(0)
+app = main.SmartMeetingAssistant(root)
+root.update()
+print("window", time.perf_counter() - start)
+root.destroy()
+"""
+
+
+def import_profile(top=15):
+    """Return the slowest imports of main.py as (cumulative_us, self_us, module)"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=PROJECT_DIR, capture_output=True, text=True
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        rows.append((int(cumulative_us), int(self_us), module.rstrip()))
+    rows.sort(reverse=True)
+    return rows[:top]
+
+
+def time_to_window(runs=5):
+    """Return (kind, seconds) samples for start-up in fresh interpreters"""
+    samples = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", WINDOW_SCRIPT],
+            cwd=PROJECT_DIR, capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip())
+        kind, seconds = result.stdout.split()[-2:]
+        samples.append((kind, float(seconds)))
+    return samples
+
+
+def main():
+    print("=== Import-time profile of main.py ===")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for cumulative_us, self_us, module in import_profile():
+        print(f"{cumulative_us / 1000:14.1f} {self_us / 1000:9.1f}  {module}")
+
+    print("\n=== Time to window ===")
+    samples = time_to_window()
+    seconds = [value for _, value in samples]
+    label = "window drawn" if samples[0][0] == "window" else "import only (no display)"
+    print(f"{label}: median {statistics.median(seconds) * 1000:.1f} ms, "
+          f"min {min(seconds) * 1000:.1f} ms, max {max(seconds) * 1000:.1f} ms "
+          f"over {len(seconds)} runs")
+
+
+if __name__ == "__main__":
+    main()
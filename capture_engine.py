@@ -0,0 +1,947 @@
+import asyncio
+import itertools
+from collections import deque
+import wave
+import os
+import queue
+import threading
+import numpy as np
+from datetime import datetime
+from time import perf_counter
+from transcript_segment import samples_to_ms
+from pipeline_metrics import metrics
+from structured_logging import get_logger
+from device_registry import get_registry, STEREO_MIX_KEYWORDS
+from audio_sources import _Status
+from silence_gate import SilenceGate, block_rms
+
+try:
+    import sounddevice as sd
+except (ImportError, OSError):  # OSError: PortAudio missing, e.g. on a headless server
+    sd = None
+
+log = get_logger("recorder")
+
+# Sources that need an audio device; "file" and "pipe" replay recorded audio
+DEVICE_SOURCES = ("microphone", "system", "both")
+
+# Tracks kept apart in "both" mode
+SOURCES = ("microphone", "system")
+
+CALLBACK_SECONDS = metrics.histogram("capture_callback_seconds", "Time spent in the audio capture callback")
+CAPTURED_BLOCKS = metrics.counter("capture_blocks_total", "Audio blocks delivered by the capture stream")
+OVERFLOWS = metrics.counter("capture_overflows_total", "Blocks dropped by the driver because the callback was late")
+ENCODE_SECONDS = metrics.histogram("chunk_encode_seconds", "Time to write an audio chunk as WAV")
+TAP_DROPS = metrics.counter("capture_tap_drops_total", "Blocks dropped because a streaming consumer fell behind")
+
+TEMP_DIR = os.path.join(os.path.dirname(__file__), "temp")
+
+
+class SoundDeviceBackend:
+    """Capture through sounddevice/PortAudio, with devices from the shared registry"""
+
+    name = "sounddevice"
+
+    @property
+    def registry(self):
+        return get_registry()
+
+    def available(self):
+        return sd is not None
+
+    def find(self, capability, role=None):
+        return self.registry.find(capability, role)
+
+    def has_host_api(self, name):
+        return self.registry.has_host_api(name)
+
+    def rescan(self, reinitialize=True):
+        self.registry.rescan(reinitialize=reinitialize)
+
+    def remember(self, role, device):
+        self.registry.remember(role, device)
+
+    def device_name(self, device):
+        return self.registry.get(device)['name']
+
+    def describe(self):
+        return self.registry.describe()
+
+    def open_input(self, device, rate, channels, blocksize, callback):
+        """Return an unstarted stream calling callback(indata, frames, time, status)"""
+        return sd.InputStream(
+            device=device,
+            samplerate=rate,
+            channels=channels,
+            callback=callback,
+            blocksize=blocksize,
+            dtype=np.float32
+        )
+
+    def close(self):
+        pass
+
+
+class _PyAudioStream:
+    """PyAudio stream with the start/stop/close interface of sounddevice streams"""
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def start(self):
+        self.stream.start_stream()
+
+    def stop(self):
+        self.stream.stop_stream()
+
+    def close(self):
+        self.stream.close()
+
+
+class PyAudioBackend:
+    """Capture through PyAudio.
+
+    PyAudio delivers interleaved int16 bytes; the adapter converts each
+    block to the float32 (frames, channels) array sounddevice would pass,
+    so the engine buffers and writes both backends' audio the same way.
+    PyAudio is imported on first use.
+    """
+
+    name = "pyaudio"
+
+    def __init__(self):
+        self.pyaudio = None
+        self.audio = None
+        self.devices = None
+
+    def _audio(self):
+        if self.audio is None:
+            import pyaudio
+            self.pyaudio = pyaudio
+            self.audio = pyaudio.PyAudio()
+        return self.audio
+
+    def available(self):
+        try:
+            self._audio()
+            return True
+        except Exception:
+            return False
+
+    def rescan(self, reinitialize=True):
+        audio = self._audio()
+        self.devices = [audio.get_device_info_by_index(i) for i in range(audio.get_device_count())]
+
+    def _scanned(self):
+        if self.devices is None:
+            self.rescan()
+        return self.devices
+
+    def find(self, capability, role=None):
+        devices = self._scanned()
+        if capability == "default_input":
+            return self._default('get_default_input_device_info')
+        if capability == "default_output":
+            return self._default('get_default_output_device_info')
+        for device in devices:
+            name = device['name'].lower()
+            if device['maxInputChannels'] <= 0:
+                continue
+            if capability == "input" or (capability == "stereo_mix" and
+                                         any(keyword in name for keyword in STEREO_MIX_KEYWORDS)):
+                return device['index']
+        return None
+
+    def _default(self, method):
+        try:
+            return getattr(self._audio(), method)()['index']
+        except (IOError, OSError):
+            return None
+
+    def has_host_api(self, name):
+        audio = self._audio()
+        return any(name in audio.get_host_api_info_by_index(i)['name'].lower()
+                   for i in range(audio.get_host_api_count()))
+
+    def remember(self, role, device):
+        pass  # Only the sounddevice registry persists device choices
+
+    def device_name(self, device):
+        return self._scanned()[device]['name']
+
+    def describe(self):
+        def info(device, channels_key):
+            return {
+                'id': device['index'],
+                'name': device['name'],
+                'channels': device[channels_key],
+                'default_samplerate': device['defaultSampleRate'],
+                'hostapi': device.get('hostApi')
+            }
+
+        devices = self._scanned()
+        return {
+            'input_devices': [info(d, 'maxInputChannels') for d in devices if d['maxInputChannels'] > 0],
+            'output_devices': [info(d, 'maxOutputChannels') for d in devices if d['maxOutputChannels'] > 0],
+            'default_input': self._default('get_default_input_device_info') or 0,
+            'default_output': self._default('get_default_output_device_info') or 0
+        }
+
+    def open_input(self, device, rate, channels, blocksize, callback):
+        """Return an unstarted stream calling callback(indata, frames, time, status)"""
+        audio = self._audio()
+        pyaudio = self.pyaudio
+
+        def pyaudio_callback(in_data, frame_count, time_info, status_flags):
+            block = np.frombuffer(in_data, dtype=np.int16).astype(np.float32)
+            block *= 1 / 32768.0
+            callback(block.reshape(-1, channels), frame_count, time_info,
+                     _Status(bool(status_flags & pyaudio.paInputOverflow)))
+            return None, pyaudio.paContinue
+
+        return _PyAudioStream(audio.open(
+            format=pyaudio.paInt16,
+            channels=channels,
+            rate=rate,
+            input=True,
+            input_device_index=device,
+            frames_per_buffer=blocksize,
+            stream_callback=pyaudio_callback,
+            start=False
+        ))
+
+    def close(self):
+        if self.audio is not None:
+            self.audio.terminate()
+            self.audio = None
+
+
+BACKENDS = {'sounddevice': SoundDeviceBackend, 'pyaudio': PyAudioBackend}
+
+
+class CaptureEngine:
+    """Capture core shared by the recorders.
+
+    A backend (sounddevice or PyAudio) only opens device streams; the
+    engine owns everything after the callback: the per-track block
+    buffers, chunking with sample-count offsets, level metering, WAV
+    writing, temp files and metrics. Recorded audio can be replayed
+    through the same callback path with the "file" and "pipe" sources.
+    """
+
+    def __init__(self, backend="sounddevice"):
+        self.backend = BACKENDS[backend]() if isinstance(backend, str) else backend
+        self.chunk = 1024
+        self.channels = 2  # Stereo for better system audio capture
+        self.device_rate = 44100
+        self.rate = self.device_rate  # Rate of the current recording
+        self.recording = False
+        self.frames = []
+        self.samples_consumed = 0  # Samples already handed out as chunks
+        self.recording_thread = None
+        self.audio_source = "microphone"  # "microphone", "system", "both", "file" or "pipe"
+        self.source_options = {}  # Options of the file/pipe source, see audio_sources
+        self.stream = None
+        self.system_stream = None  # Second stream in "both" mode
+        self.source_frames = {}  # Per-source buffers in "both" mode
+        self.source_samples_consumed = {}
+        self.silent_ms = {}  # Per-source audio skipped as silence
+        # Notified by the capture callback once a waiting consumer's chunk is buffered
+        self.audio_ready = threading.Condition()
+        self._wake_blocks = None
+        self._file_numbers = itertools.count()
+        self.taps = []  # Queues of streaming consumers, see open_tap
+        self.preprocessing = None  # AudioPreprocessor options, see enable_preprocessing
+        self.preprocessors = []  # (preprocessor, buffer) per track, flushed when the streams close
+        self.silence_gate_options = None  # SilenceGate options, see enable_silence_gate
+        self.silence_gates = {}  # Per-source gate state
+        self.session_directory = None  # Where recordings are archived, see enable_session_archive
+        self.session_keep = None
+        self.session_writer = None
+        self.session_file = None  # Archive of the current or last recording
+
+    def set_audio_source(self, source, **options):
+        """Set the audio source: 'microphone', 'system', 'both', 'file' or 'pipe'.
+
+        The file and pipe sources replay recorded audio through the same
+        callback path as a device; options are passed to them, e.g.
+        set_audio_source("file", path="call.wav", speed=4.0).
+        """
+        if source in DEVICE_SOURCES or source in ("file", "pipe"):
+            self.audio_source = source
+            self.source_options = options
+        else:
+            raise ValueError("Audio source must be 'microphone', 'system', 'both', 'file' or 'pipe'")
+
+    @property
+    def devices(self):
+        """The backend's device catalog (find, rescan, describe, ...)"""
+        return self.backend
+
+    def get_available_devices(self):
+        """Get list of available audio devices"""
+        try:
+            return self.devices.describe()
+        except Exception as e:
+            log.error("Error getting devices", extra={'error': str(e)})
+            return {'input_devices': [], 'output_devices': [], 'default_input': 0, 'default_output': 0}
+
+    def start_recording(self):
+        """Start recording audio based on selected source"""
+        self.recording = True
+        self.frames = []
+        self.samples_consumed = 0
+        self.source_frames = {}
+        self.source_samples_consumed = {}
+        self.silent_ms = {}
+        self.silence_gates = {}
+        self.rate = self.device_rate
+        self.session_file = None
+        self.preprocessors = []
+        # Tapped before the stream starts so the archive has every block
+        archive_tap = self.open_tap(maxsize=0) if self.session_directory and self.audio_source != "both" else None
+
+        try:
+            if self.audio_source in DEVICE_SOURCES and not self.backend.available():
+                raise Exception(f"{self.backend.name} is not available; use the file or pipe source")
+            if self.audio_source == "microphone":
+                self._start_microphone_recording()
+            elif self.audio_source == "system":
+                self._start_system_recording()
+            elif self.audio_source == "both":
+                self._start_mixed_recording()
+            else:
+                self._start_replay_recording()
+            if archive_tap:
+                self._start_session_archive(archive_tap)
+
+            return self._get_temp_filename()
+
+        except Exception as e:
+            if archive_tap:
+                self.close_tap(archive_tap)
+            raise Exception(f"Failed to start recording: {str(e)}")
+
+    def enable_session_archive(self, directory=None, keep=20):
+        """Archive each single-track recording as a WAV file for later seeking.
+
+        The file is written from a tap by session_audio.SessionAudioWriter;
+        its path is session_file. "both" mode is not archived. Before each
+        recording, the oldest archives beyond keep are deleted (None keeps
+        them all).
+        """
+        from session_audio import RECORDINGS_DIR
+        self.session_directory = directory or RECORDINGS_DIR
+        self.session_keep = keep
+
+    def disable_session_archive(self):
+        self.session_directory = None
+
+    def _start_session_archive(self, tap):
+        from session_audio import SessionAudioWriter, prune_recordings
+
+        os.makedirs(self.session_directory, exist_ok=True)
+        if self.session_keep is not None:
+            # Room for the new one
+            prune_recordings(self.session_directory, max(self.session_keep - 1, 0))
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        # The sequence number keeps sessions started within the same second apart
+        while True:
+            self.session_file = os.path.join(self.session_directory,
+                                             f"session_{timestamp}_{next(self._file_numbers)}.wav")
+            if not os.path.exists(self.session_file):
+                break
+        self.session_writer = SessionAudioWriter(self.session_file, self.rate, tap)
+
+    def _finish_session_archive(self):
+        writer, self.session_writer = self.session_writer, None
+        if writer:
+            self.close_tap(writer.tap)
+            writer.close()
+
+    def _start_microphone_recording(self):
+        """Start recording from microphone"""
+        try:
+            # Use the default microphone device, mono
+            self.stream = self._open_stream("microphone", None, 1, self._buffer_callback(self.frames))
+            log.info("Started microphone recording", extra={'backend': self.backend.name})
+        except Exception as e:
+            log.error("Failed to start microphone recording", extra={'error': str(e)})
+            raise
+
+    def _start_system_recording(self):
+        """Start recording system audio using Stereo Mix or WASAPI loopback"""
+        try:
+            audio_callback = self._buffer_callback(self.frames)
+            if self.find_stereo_mix_device() is not None:
+                # Use Stereo Mix for system audio recording, stereo
+                self.stream = self._open_stream("system", "stereo_mix", 2, audio_callback)
+            else:
+                # Try WASAPI loopback approach
+                log.info("Stereo Mix not found, trying WASAPI loopback")
+                self._try_wasapi_loopback(audio_callback)
+
+        except Exception as e:
+            raise Exception(f"Failed to start system recording: {str(e)}")
+
+    def find_stereo_mix_device(self):
+        """Find Stereo Mix or similar device for system audio recording"""
+        try:
+            device = self.devices.find("stereo_mix", role="system")
+            if device is not None:
+                log.debug("Found stereo mix device", extra={'device': device})
+            return device
+        except Exception:
+            return None
+
+    def _try_wasapi_loopback(self, audio_callback):
+        """Try to use WASAPI loopback for system audio recording"""
+        try:
+            self.stream = self._open_stream("system", "wasapi_input", 2, audio_callback)
+        except Exception as e:
+            self._fall_back_to_default_input(audio_callback, e)
+
+    def _fall_back_to_default_input(self, audio_callback, error, channels=1):
+        """Final fallback for system audio: use the default input and inform the user"""
+        log.warning("System audio loopback not available, using the default input device. "
+                    "To record system audio, please enable 'Stereo Mix' in your sound settings.",
+                    extra={'error': str(error)})
+        self.stream = self._open_stream("system", None, channels, audio_callback)
+
+    def _open_stream(self, role, capability, channels, callback):
+        """Open and start an input stream on the device with a capability.
+
+        capability None uses the default input. If the stream cannot be
+        opened, the device list is rescanned once (a device may have been
+        plugged in or removed) and the lookup is repeated. A device found
+        by capability that works is remembered for the role.
+        """
+        for attempt in range(2):
+            device = self.devices.find(capability, role) if capability else None
+            if capability and device is None:
+                raise Exception(f"No {capability} device available")
+            try:
+                stream = self.backend.open_input(device, self.rate, channels, self.chunk, callback)
+                stream.start()
+            except Exception as e:
+                if attempt:
+                    raise
+                log.warning("Could not open audio device, rescanning devices",
+                            extra={'role': role, 'device': device, 'error': str(e)})
+                # Re-initializing PortAudio would abort a stream already running
+                self.devices.rescan(reinitialize=self.stream is None and self.system_stream is None)
+                continue
+            if device is not None:
+                log.info("Opened audio device", extra={'role': role, 'device': device,
+                                                       'device_name': self.devices.device_name(device)})
+                self.devices.remember(role, device)
+            return stream
+
+    def _start_mixed_recording(self):
+        """Record microphone and system audio as separate tracks.
+
+        Each source gets its own stream and buffer, so segments can be
+        attributed to local speakers or remote participants. Both streams
+        run at the same rate and are started back to back, so their sample
+        counts share one timeline.
+        """
+        system_device = self.find_stereo_mix_device()
+        if system_device is None:
+            # Without a loopback device the "system" track would be the
+            # microphone a second time
+            log.warning("No Stereo Mix device found; recording the microphone only. "
+                        "To record system audio, please enable 'Stereo Mix' in your sound settings.")
+
+        for source in SOURCES:
+            if source == "system" and system_device is None:
+                continue
+            self.source_frames[source] = []
+            self.source_samples_consumed[source] = 0
+            self.silent_ms[source] = 0
+
+        try:
+            if system_device is not None:
+                self.system_stream = self._open_stream("system", "stereo_mix", 2,
+                                                       self._buffer_callback(self.source_frames["system"]))
+            self.stream = self._open_stream("microphone", None, 1,
+                                            self._buffer_callback(self.source_frames["microphone"]))
+            log.info("Started recording separate tracks", extra={'sources': ",".join(self.source_frames)})
+        except Exception as e:
+            self._close_streams()
+            raise Exception(f"Failed to start mixed recording: {str(e)}")
+
+    def _start_replay_recording(self):
+        """Feed the capture callback from a file or a raw PCM pipe instead of a device"""
+        from audio_sources import open_source
+
+        self.stream = open_source(self.audio_source, None, blocksize=self.chunk, **self.source_options)
+        # Offsets, chunk sizes and the preprocessing follow the rate of the recorded audio
+        self.rate = self.stream.samplerate
+        self.stream.callback = self._buffer_callback(self.frames)
+        self.stream.on_finished = self.wake
+        self.stream.start()
+        log.info("Started replay", extra={'source': self.audio_source, 'rate': self.rate,
+                                          'speed': self.stream.speed})
+
+    def source_finished(self):
+        """True once a file or pipe source has delivered all of its audio"""
+        finished = getattr(self.stream, 'finished', None)
+        return finished is not None and finished.is_set()
+
+    def enable_preprocessing(self, **options):
+        """Clean up captured audio per block, see audio_preprocessing.AudioPreprocessor.
+
+        Takes effect from the next recording; each track gets its own
+        preprocessor state. The noise gate holds each block back until the
+        next one is captured; the last one is buffered when the streams
+        close, so offsets and the archive stay on the capture timeline.
+        """
+        self.preprocessing = options
+
+    def disable_preprocessing(self):
+        self.preprocessing = None
+
+    def enable_silence_gate(self, **options):
+        """Drop silent chunks in get_audio_segment before they are encoded.
+
+        The threshold adapts to the noise floor, see silence_gate.SilenceGate;
+        "both" mode always skips silent tracks.
+        """
+        self.silence_gate_options = options
+
+    def disable_silence_gate(self):
+        self.silence_gate_options = None
+
+    def _buffer_callback(self, frames):
+        """Capture callback appending blocks to the given buffer"""
+        preprocessor = None
+        if self.preprocessing is not None:
+            from audio_preprocessing import AudioPreprocessor
+            preprocessor = AudioPreprocessor(self.rate, **self.preprocessing)
+            self.preprocessors.append((preprocessor, frames))
+
+        def audio_callback(indata, frame_count, time, status):
+            started = perf_counter()
+            if status.input_overflow:
+                OVERFLOWS.inc()
+            if self.recording:
+                # sounddevice reuses indata for the next block
+                block = indata.copy()
+                if preprocessor:
+                    block = preprocessor.process(block)
+                if block is not None:
+                    self._buffer_block(block, frames)
+            CALLBACK_SECONDS.observe(perf_counter() - started)
+        return audio_callback
+
+    def _buffer_block(self, block, frames):
+        """Append a captured block to its track and pass it to the taps"""
+        frames.append(block)
+        CAPTURED_BLOCKS.inc()
+        if frames is self.frames:
+            for tap in self.taps:
+                try:
+                    tap.put_nowait(block)
+                except queue.Full:
+                    TAP_DROPS.inc()
+        wake_blocks = self._wake_blocks
+        if wake_blocks is not None and len(frames) >= wake_blocks:
+            self.wake()
+
+    def _flush_preprocessors(self):
+        """Buffer the blocks the preprocessors still hold, once the streams are closed"""
+        preprocessors, self.preprocessors = self.preprocessors, []
+        for preprocessor, frames in preprocessors:
+            block = preprocessor.flush()
+            if block is not None:
+                self._buffer_block(block, frames)
+
+    def wake(self):
+        """Wake the consumers blocked in wait_for_audio, e.g. when stopping"""
+        with self.audio_ready:
+            self._wake_blocks = None
+            self.audio_ready.notify_all()
+
+    def wait_for_audio(self, seconds=1, timeout=None):
+        """Block until `seconds` of audio are buffered, instead of polling.
+
+        Returns True when a chunk of that length can be taken; False on
+        timeout, after wake(), or when a replayed source has finished.
+        The capture callback only takes the lock once the threshold is
+        reached, so waiting costs no wakeups in between.
+        """
+        num_frames = max(self._blocks_for(seconds), 1)
+
+        def ready():
+            buffers = self.source_frames.values() if self.source_frames else [self.frames]
+            return any(len(frames) >= num_frames for frames in buffers)
+
+        with self.audio_ready:
+            # Published before checking: a block appended meanwhile is
+            # either seen by ready() or makes the callback notify
+            self._wake_blocks = num_frames
+            try:
+                if ready():
+                    return True
+                if not self.recording or self.source_finished():
+                    return False
+                self.audio_ready.wait(timeout)
+                return ready()
+            finally:
+                self._wake_blocks = None
+
+    def chunks(self, seconds=1, until=None):
+        """Iterate over the chunks of the recording as soon as each is buffered.
+
+        Works with both `for` and `async for` and yields the
+        (filename, start_ms, end_ms) tuples of get_audio_segment; in "both"
+        mode each track's chunk of get_source_segments is yielded as such a
+        tuple, in start order. seconds may be a callable returning the current
+        chunk length (e.g. lambda: controller.seconds). Iteration ends when
+        the recording stops, a replayed source is exhausted, or until()
+        returns true; it is checked whenever the waiting consumer is woken,
+        so whoever makes it true should call wake().
+        """
+        return ChunkIterator(self, seconds, until)
+
+    def open_tap(self, maxsize=512):
+        """Return a queue receiving every captured block, for streaming recognizers.
+
+        Open it before start_recording so no block is missed. Blocks are
+        also buffered as usual; a consumer that falls behind by maxsize
+        blocks loses blocks rather than stalling the capture callback.
+        Only single-track recordings are tapped.
+        """
+        tap = queue.Queue(maxsize)
+        self.taps = self.taps + [tap]  # Copy: the callback iterates without a lock
+        return tap
+
+    def close_tap(self, tap):
+        self.taps = [other for other in self.taps if other is not tap]
+
+    def take_audio(self, end_ms=None):
+        """Consume the buffered blocks up to end_ms on the recording timeline.
+
+        Returns them as one float32 array (None when nothing is buffered),
+        e.g. to label the speaker of a segment recognized by a streaming
+        backend. Whole blocks are taken, all of them without end_ms.
+        """
+        count = len(self.frames)
+        if end_ms is not None:
+            end = end_ms * self.rate // 1000
+            position = self.samples_consumed
+            count = 0
+            for block in self.frames:
+                if position + len(block) > end:
+                    break
+                position += len(block)
+                count += 1
+        if not count:
+            return None
+        blocks = self.frames[:count]
+        del self.frames[:count]
+        self._consume_span(blocks)
+        return np.concatenate(blocks)
+
+    def stop_capture(self):
+        """Stop recording without saving the unconsumed audio"""
+        self.recording = False
+        self._close_streams()
+
+    def buffered_seconds(self):
+        """Audio captured but not yet chunked, on the fullest track"""
+        buffers = self.source_frames.values() if self.source_frames else [self.frames]
+        return max(sum(len(block) for block in frames) for frames in buffers) / self.rate if self.rate else 0
+
+    def _blocks_for(self, seconds):
+        return int(self.rate * seconds / self.chunk)
+
+    def _close_streams(self):
+        for stream in (self.stream, self.system_stream):
+            if stream:
+                try:
+                    stream.stop()
+                    stream.close()
+                except Exception as e:
+                    log.warning("Could not close audio stream", extra={'error': str(e)})
+        self.stream = None
+        self.system_stream = None
+        self._flush_preprocessors()
+        self._finish_session_archive()
+
+    def stop_recording(self):
+        """Stop recording and save audio file; None when all audio was already chunked"""
+        segment = self.stop_recording_segment()
+        return segment[0] if segment else None
+
+    def stop_recording_segment(self):
+        """Stop recording and save the unconsumed audio.
+
+        Returns (filename, start_ms, end_ms) where the offsets locate the
+        saved audio on the recording timeline, or None when every block
+        has already been handed out as a chunk (e.g. a replayed file whose
+        length is a multiple of the chunk length).
+        """
+        self.recording = False
+        self._close_streams()
+
+        if self.source_frames:
+            # Separate tracks: keep the loudest remainder as the single file
+            segments = self.stop_recording_sources(skip_silent=False)
+            if not segments:
+                return None
+            _, filename, start_ms, end_ms = max(segments, key=lambda segment: segment[4])[:4]
+            return filename, start_ms, end_ms
+
+        if not self.frames:
+            return None
+        # Save the recorded audio
+        filename = self._get_temp_filename()
+        start_ms, end_ms = self._consume_span(self.frames)
+        self._save_audio_file(filename)
+        return filename, start_ms, end_ms
+
+    def stop_recording_sources(self, skip_silent=True, silence_rms=None):
+        """Stop a "both" recording and save the unconsumed audio of each track.
+
+        Returns a list of (source, filename, start_ms, end_ms, rms); see
+        get_source_segments for the silence handling.
+        """
+        self.recording = False
+        self._close_streams()
+        segments = []
+        for source, frames in self.source_frames.items():
+            if frames:
+                segment = self._take_source_frames(source, len(frames), skip_silent, silence_rms)
+                if segment:
+                    segments.append(segment)
+        return segments
+
+    def has_audio_data(self):
+        """Check if there's audio data available"""
+        if self.source_frames:
+            return any(len(frames) > 10 for frames in self.source_frames.values())
+        return len(self.frames) > 10
+
+    def get_audio_chunk(self, seconds=1):
+        """Get a chunk of audio for real-time processing (default: 1 second)"""
+        segment = self.get_audio_segment(seconds)
+        return segment[0] if segment else None
+
+    def get_audio_segment(self, seconds=1):
+        """Get a chunk of audio together with its position in the recording.
+
+        Returns (filename, start_ms, end_ms), or None when not enough audio
+        has been captured yet or the silence gate dropped the chunk. Offsets are computed from sample counts, so
+        they do not drift with processing delays.
+        """
+        num_frames = self._blocks_for(seconds)
+        metrics.gauge("capture_buffer_blocks", "Captured blocks waiting to be chunked",
+                      source=self.audio_source).set(len(self.frames))
+        if len(self.frames) >= num_frames:
+            chunk_frames = self.frames[:num_frames]
+            # Remove the frames that have been processed; del keeps blocks
+            # appended by the audio callback meanwhile
+            del self.frames[:num_frames]
+            start_ms, end_ms = self._consume_span(chunk_frames)
+            if self.silence_gate_options is not None:
+                silent, _ = self._is_silent(self.audio_source, chunk_frames)
+                if silent:
+                    self._skip_silence(self.audio_source, start_ms, end_ms)
+                    return None
+            chunk_filename = self._get_temp_filename("chunk")
+            self._save_audio_file(chunk_filename, chunk_frames)
+            return chunk_filename, start_ms, end_ms
+        return None
+
+    def get_source_segments(self, seconds=1, silence_rms=None):
+        """Get a chunk of every track recorded in "both" mode.
+
+        Returns a list of (source, filename, start_ms, end_ms, rms) for the
+        tracks that have at least `seconds` of audio buffered. Silent chunks
+        are consumed but not saved, so the recognizer is not run on a silent
+        track; their length is added to silent_ms. Each track has its own
+        adaptive silence gate unless a fixed silence_rms level is given.
+        """
+        num_frames = self._blocks_for(seconds)
+        segments = []
+        for source, frames in self.source_frames.items():
+            metrics.gauge("capture_buffer_blocks", "Captured blocks waiting to be chunked",
+                          source=source).set(len(frames))
+            if len(frames) >= num_frames:
+                segment = self._take_source_frames(source, num_frames, True, silence_rms)
+                if segment:
+                    segments.append(segment)
+        return segments
+
+    def _take_source_frames(self, source, num_frames, skip_silent, silence_rms):
+        frames = self.source_frames[source]
+        chunk_frames = frames[:num_frames]
+        del frames[:num_frames]
+        start = self.source_samples_consumed[source]
+        self.source_samples_consumed[source] += sum(len(frame) for frame in chunk_frames)
+        start_ms = samples_to_ms(start, self.rate)
+        end_ms = samples_to_ms(self.source_samples_consumed[source], self.rate)
+
+        # Energy-based voice activity check
+        silent, rms = self._is_silent(source, chunk_frames, silence_rms)
+        if skip_silent and silent:
+            self._skip_silence(source, start_ms, end_ms)
+            return None
+        chunk_filename = self._get_temp_filename(f"chunk_{source}")
+        self._save_audio_file(chunk_filename, chunk_frames)
+        return source, chunk_filename, start_ms, end_ms, rms
+
+    def _is_silent(self, source, chunk_frames, silence_rms=None):
+        """Check a chunk's energy from its block levels; returns (silent, rms)"""
+        levels = block_rms(chunk_frames)
+        rms = float(np.sqrt(np.mean(levels * levels)))
+        if silence_rms is not None:
+            return rms < silence_rms, rms
+        gate = self.silence_gates.get(source)
+        if gate is None:
+            gate = self.silence_gates[source] = SilenceGate(**(self.silence_gate_options or {}))
+        return gate.is_silent(levels), rms
+
+    def _skip_silence(self, source, start_ms, end_ms):
+        self.silent_ms[source] = self.silent_ms.get(source, 0) + end_ms - start_ms
+        metrics.counter("silence_skipped_chunks_total", "Chunks dropped as silence before recognition",
+                        source=source).inc()
+        metrics.counter("silence_skipped_seconds_total", "Audio dropped as silence before recognition",
+                        source=source).inc((end_ms - start_ms) / 1000)
+
+    def _consume_span(self, frames):
+        """Advance the consumed sample counter and return the span of frames in ms"""
+        start = self.samples_consumed
+        self.samples_consumed += sum(len(frame) for frame in frames)
+        return samples_to_ms(start, self.rate), samples_to_ms(self.samples_consumed, self.rate)
+
+    def get_audio_levels(self):
+        """Get current audio levels for visualization"""
+        if self.source_frames:
+            return max((_level(frames) for frames in self.source_frames.values()), default=0)
+        return _level(self.frames)
+
+    def _save_audio_file(self, filename, frames=None, audio_data=None):
+        """Save audio frames to file; audio_data is their concatenation if already made"""
+        if frames is None:
+            frames = self.frames
+
+        if not frames:
+            raise Exception("No audio data to save")
+
+        try:
+            started = perf_counter()
+            if audio_data is None:
+                audio_data = np.concatenate(frames)
+
+            # Ensure the data is in the right format for speech recognition
+            if audio_data.dtype != np.int16:
+                # Convert float32 to int16 with proper scaling
+                audio_data = np.clip(audio_data * 32767, -32767, 32767).astype(np.int16)
+
+            # Save using wave module for better compatibility
+            with wave.open(filename, 'wb') as wf:
+                wf.setnchannels(1 if len(audio_data.shape) == 1 else audio_data.shape[1])
+                wf.setsampwidth(2)  # 16-bit
+                wf.setframerate(self.rate)
+                wf.writeframes(audio_data.tobytes())
+            ENCODE_SECONDS.observe(perf_counter() - started)
+
+        except Exception as e:
+            raise Exception(f"Failed to save audio file: {str(e)}")
+
+    def _get_temp_filename(self, prefix="recording"):
+        """Generate a temporary filename.
+
+        The sequence number keeps chunks written within the same second
+        apart while earlier ones are still being recognized.
+        """
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        os.makedirs(TEMP_DIR, exist_ok=True)
+        return os.path.join(TEMP_DIR, f"{prefix}_{timestamp}_{next(self._file_numbers)}.wav")
+
+    def cleanup(self):
+        """Clean up resources"""
+        self.recording = False
+        for stream in (self.stream, self.system_stream):
+            if stream:
+                try:
+                    stream.close()
+                except Exception:
+                    pass
+        self.stream = None
+        self.system_stream = None
+        self._finish_session_archive()
+        self.backend.close()
+
+        # Clean up temp files
+        if os.path.exists(TEMP_DIR):
+            for file in os.listdir(TEMP_DIR):
+                try:
+                    file_path = os.path.join(TEMP_DIR, file)
+                    if os.path.isfile(file_path):
+                        os.remove(file_path)
+                except OSError:
+                    pass
+
+
+class ChunkIterator:
+    """Chunks of a recording as they become ready, for `for` and `async for` loops.
+
+    The async form waits in the default executor, so the event loop keeps
+    running while the capture thread fills the buffer.
+    """
+
+    def __init__(self, engine, seconds=1, until=None):
+        self.engine = engine
+        self.seconds = seconds
+        self.until = until
+        self.ready = deque()  # Track chunks of "both" mode not yielded yet
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        chunk = self._next_chunk()
+        if chunk is None:
+            raise StopIteration
+        return chunk
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        chunk = await asyncio.get_running_loop().run_in_executor(None, self._next_chunk)
+        if chunk is None:
+            raise StopAsyncIteration
+        return chunk
+
+    def _next_chunk(self):
+        if self.ready:
+            return self.ready.popleft()
+        engine = self.engine
+        while engine.recording and not (self.until and self.until()):
+            seconds = self.seconds() if callable(self.seconds) else self.seconds
+            if engine.wait_for_audio(seconds):
+                # Read the buffer wait_for_audio watched; an empty result
+                # (silence) has still consumed the audio
+                if engine.source_frames:
+                    segments = sorted(engine.get_source_segments(seconds), key=lambda segment: segment[2])
+                    self.ready.extend(segment[1:4] for segment in segments)
+                    chunk = self.ready.popleft() if self.ready else None
+                else:
+                    chunk = engine.get_audio_segment(seconds)
+                if chunk:
+                    return chunk
+            elif engine.source_finished():
+                break
+        return None
+
+
+def _level(frames, blocks=5):
+    """Mean absolute level of the last blocks in percent, without concatenating them"""
+    recent = frames[-blocks:]
+    if not recent:
+        return 0
+    return sum(float(np.abs(block).mean()) for block in recent) / len(recent) * 100
@@ -0,0 +1,92 @@
+import math
+import threading
+
+from pipeline_metrics import metrics
+
+CHUNK_SECONDS = metrics.gauge("chunk_seconds", "Current length of the audio chunks sent to the recognizer")
+RECOGNIZER_WORKERS = metrics.gauge("recognizer_workers", "Chunks the controller lets the recognizer work on at once")
+QUEUE_LAG = metrics.gauge("capture_lag_seconds", "Audio still buffered after the last chunk was taken")
+
+
+class AdaptiveChunkController:
+    """Chooses the chunk length and recognizer parallelism from measured latency.
+
+    A chunk's end-to-end latency is roughly its length (the audio has to
+    be captured first) plus the audio still queued before it plus the
+    recognizer round trip. The controller keeps moving averages of the
+    round trip, the real-time factor (round trip / chunk length) and the
+    queue lag, and after every chunk:
+
+    - falls behind (the real-time factor per worker is above 1, or more
+      than a chunk of audio is queued): adds a worker up to max_workers,
+      then grows the chunks, since recognizers have a fixed cost per call
+      that larger chunks amortize;
+    - keeps up comfortably: shrinks the chunks back towards min_seconds
+      while the expected latency stays above target_latency, and drops
+      workers that are no longer needed.
+
+    The gap between the two thresholds keeps it from oscillating.
+    """
+
+    def __init__(self, target_latency=2.0, min_seconds=1.0, max_seconds=8.0, max_workers=4,
+                 smoothing=0.3, grow=1.5, shrink=0.8):
+        self.target_latency = target_latency
+        self.min_seconds = min_seconds
+        self.max_seconds = max_seconds
+        self.max_workers = max_workers
+        self.smoothing = smoothing
+        self.grow = grow
+        self.shrink = shrink
+        self.seconds = min_seconds
+        self.workers = 1
+        self.round_trip = None
+        self.real_time_factor = None
+        self.lag = 0.0
+        self.lock = threading.Lock()
+        CHUNK_SECONDS.set(self.seconds)
+        RECOGNIZER_WORKERS.set(self.workers)
+
+    def observe(self, audio_seconds, processing_seconds):
+        """Record one recognized chunk and adapt the chunk length and workers"""
+        if audio_seconds <= 0:
+            return
+        with self.lock:
+            self.round_trip = self._average(self.round_trip, processing_seconds)
+            self.real_time_factor = self._average(self.real_time_factor, processing_seconds / audio_seconds)
+            self._adjust()
+            CHUNK_SECONDS.set(round(self.seconds, 2))
+            RECOGNIZER_WORKERS.set(self.workers)
+
+    def observe_lag(self, lag_seconds):
+        """Record the audio left in the buffer after a chunk was taken"""
+        QUEUE_LAG.set(round(lag_seconds, 3))
+        with self.lock:
+            self.lag = self._average(self.lag, lag_seconds)
+
+    def expected_latency(self):
+        return self.seconds + self.lag + (self.round_trip or 0)
+
+    def _average(self, average, value):
+        return value if average is None else average + self.smoothing * (value - average)
+
+    def _adjust(self):
+        load = self.real_time_factor / self.workers
+        if load > 1.0 or self.lag > self.seconds:
+            if load > 1.0 and self.workers < self.max_workers:
+                self.workers += 1
+            else:
+                self.seconds = min(self.seconds * self.grow, self.max_seconds)
+        elif load < 0.7 and self.lag < self.seconds / 2:
+            if self.expected_latency() > self.target_latency:
+                self.seconds = max(self.seconds * self.shrink, self.min_seconds)
+            needed = max(math.ceil(self.real_time_factor / 0.7), 1)
+            self.workers = max(min(self.workers, needed), 1)
+
+    def snapshot(self):
+        return {
+            'seconds': round(self.seconds, 2),
+            'workers': self.workers,
+            'round_trip': round(self.round_trip, 3) if self.round_trip is not None else None,
+            'real_time_factor': round(self.real_time_factor, 3) if self.real_time_factor is not None else None,
+            'lag': round(self.lag, 3),
+        }
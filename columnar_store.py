@@ -0,0 +1,285 @@
+import bisect
+import math
+import mmap
+import struct
+import zlib
+from array import array
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from transcript_segment import TranscriptSegment
+
+MAGIC = b"SMTC"
+VERSION = 1
+CODEC_ZLIB = 0
+CODEC_ZSTD = 1
+
+# magic, version, codec, block_size, segment_count, block_count, labels_offset, index_offset
+HEADER = struct.Struct("<4sBBHIIQQ")
+# first_start_ms, max_end_ms, payload offset, payload length, segment count
+BLOCK_ENTRY = struct.Struct("<qqQII")
+
+
+class ColumnarWriter:
+    """Write segments to the compact columnar transcript format (.smtc).
+
+    Segments are grouped into blocks of ``block_size``. Each block stores
+    its columns separately: start offsets as zigzag varint deltas,
+    durations as varints, speaker and source as ids into a shared label
+    table, confidence as float16, and text as a block-local word
+    dictionary plus token ids. The block is then compressed with zstd when
+    available, otherwise zlib. A block index at the end of the file records
+    each block's time span, so readers can decompress only the blocks a
+    time range touches. Segments are expected in start-time order.
+    """
+
+    def __init__(self, filename, block_size=256):
+        self.block_size = block_size
+        self.codec = CODEC_ZSTD if zstandard else CODEC_ZLIB
+        self.compressor = zstandard.ZstdCompressor(level=19) if zstandard else None
+        self.labels = {}
+        self.index = []
+        self.pending = []
+        self.segment_count = 0
+        self.file = open(filename, 'wb')
+        self.file.write(b"\0" * HEADER.size)  # Filled in by close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def write_segment(self, segment):
+        """Buffer one segment, flushing a block when it is full"""
+        self.pending.append(segment)
+        if len(self.pending) >= self.block_size:
+            self._flush_block()
+
+    def close(self):
+        """Write the remaining block, label table, index and header"""
+        if not self.file:
+            return
+        if self.pending:
+            self._flush_block()
+        labels_offset = self.file.tell()
+        labels = sorted(self.labels, key=self.labels.get)
+        self.file.write(self._compress("\0".join(labels).encode('utf-8')))
+        index_offset = self.file.tell()
+        for entry in self.index:
+            self.file.write(BLOCK_ENTRY.pack(*entry))
+        self.file.seek(0)
+        self.file.write(HEADER.pack(MAGIC, VERSION, self.codec, self.block_size,
+                                    self.segment_count, len(self.index),
+                                    labels_offset, index_offset))
+        self.file.close()
+        self.file = None
+
+    def _label_id(self, label):
+        if label is None:
+            return 0
+        if label not in self.labels:
+            self.labels[label] = len(self.labels)
+        return self.labels[label] + 1
+
+    def _flush_block(self):
+        segments, self.pending = self.pending, []
+        payload = bytearray()
+        _write_varint(payload, len(segments))
+
+        first_start = segments[0].start_ms
+        previous = first_start
+        for segment in segments:
+            _write_varint(payload, _zigzag(segment.start_ms - previous))
+            previous = segment.start_ms
+        for segment in segments:
+            _write_varint(payload, max(segment.end_ms - segment.start_ms, 0))
+        for segment in segments:
+            _write_varint(payload, self._label_id(segment.speaker))
+        for segment in segments:
+            _write_varint(payload, self._label_id(segment.source))
+        for segment in segments:
+            confidence = math.nan if segment.confidence is None else segment.confidence
+            payload += struct.pack("<e", confidence)
+
+        vocabulary = {}
+        tokens = bytearray()
+        for segment in segments:
+            words = segment.text.split(" ")
+            _write_varint(tokens, len(words))
+            for word in words:
+                if word not in vocabulary:
+                    vocabulary[word] = len(vocabulary)
+                _write_varint(tokens, vocabulary[word])
+        vocab_bytes = "\0".join(vocabulary).encode('utf-8')
+        _write_varint(payload, len(vocab_bytes))
+        payload += vocab_bytes
+        payload += tokens
+
+        data = self._compress(bytes(payload))
+        offset = self.file.tell()
+        self.file.write(data)
+        max_end = max(segment.end_ms for segment in segments)
+        self.index.append((first_start, max_end, offset, len(data), len(segments)))
+        self.segment_count += len(segments)
+
+    def _compress(self, data):
+        if self.compressor:
+            return self.compressor.compress(data)
+        return zlib.compress(data, 9)
+
+
+class ColumnarReader:
+    """Memory-mapped reader for .smtc transcript files.
+
+    Opening a file reads only the header, label table and block index;
+    block payloads are decompressed on demand straight from the mapping.
+    """
+
+    def __init__(self, filename):
+        self.file = open(filename, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, self.codec, self.block_size, self.segment_count,
+         block_count, labels_offset, index_offset) = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"Not a columnar transcript file: {filename}")
+        if self.codec == CODEC_ZSTD and zstandard is None:
+            self.close()
+            raise ValueError("File is zstd-compressed but the zstandard package is not installed")
+
+        self.blocks = [BLOCK_ENTRY.unpack_from(self.map, index_offset + i * BLOCK_ENTRY.size)
+                       for i in range(block_count)]
+        self.block_starts = [block[0] for block in self.blocks]
+        labels = self._decompress(self.map[labels_offset:index_offset]).decode('utf-8')
+        self.labels = labels.split("\0") if labels else []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        return self.segment_count
+
+    def __iter__(self):
+        for block in range(len(self.blocks)):
+            yield from self._read_block(block)
+
+    @property
+    def duration_ms(self):
+        return max((block[1] for block in self.blocks), default=0)
+
+    def read_range(self, start_ms, end_ms):
+        """Return the segments overlapping [start_ms, end_ms).
+
+        Only blocks whose time span overlaps the range are decompressed.
+        """
+        segments = []
+        last_block = bisect.bisect_left(self.block_starts, end_ms)
+        for block in range(last_block):
+            if self.blocks[block][1] <= start_ms:
+                continue
+            segments.extend(segment for segment in self._read_block(block)
+                            if segment.end_ms > start_ms and segment.start_ms < end_ms)
+        return segments
+
+    def close(self):
+        """Release the memory map and file handle"""
+        self.map.close()
+        self.file.close()
+
+    def _read_block(self, block):
+        first_start, _, offset, length, count = self.blocks[block]
+        payload = self._decompress(memoryview(self.map)[offset:offset + length])
+        position = 0
+
+        stored_count, position = _read_varint(payload, position)
+        if stored_count != count:
+            raise ValueError("Corrupt columnar transcript block")
+        starts, previous = [], first_start
+        for _ in range(count):
+            delta, position = _read_varint(payload, position)
+            previous += _unzigzag(delta)
+            starts.append(previous)
+        durations = []
+        for _ in range(count):
+            value, position = _read_varint(payload, position)
+            durations.append(value)
+        speakers = []
+        for _ in range(count):
+            value, position = _read_varint(payload, position)
+            speakers.append(self.labels[value - 1] if value else None)
+        sources = []
+        for _ in range(count):
+            value, position = _read_varint(payload, position)
+            sources.append(self.labels[value - 1] if value else None)
+        confidences = array('f', struct.unpack_from(f"<{count}e", payload, position))
+        position += 2 * count
+
+        vocab_length, position = _read_varint(payload, position)
+        vocabulary = payload[position:position + vocab_length].decode('utf-8').split("\0")
+        position += vocab_length
+
+        for i in range(count):
+            word_count, position = _read_varint(payload, position)
+            words = []
+            for _ in range(word_count):
+                word_id, position = _read_varint(payload, position)
+                words.append(vocabulary[word_id])
+            confidence = confidences[i]
+            yield TranscriptSegment(
+                " ".join(words), starts[i], starts[i] + durations[i],
+                speaker=speakers[i], source=sources[i],
+                confidence=None if math.isnan(confidence) else round(confidence, 3)
+            )
+
+    def _decompress(self, data):
+        if self.codec == CODEC_ZSTD:
+            return zstandard.ZstdDecompressor().decompress(data)
+        return zlib.decompress(data)
+
+
+def write_columnar(segments, filename, block_size=256):
+    """Write an iterable of segments to a .smtc file and return the segment count"""
+    with ColumnarWriter(filename, block_size) as writer:
+        for segment in segments:
+            writer.write_segment(segment)
+    # Counted after close() has flushed the last block
+    return writer.segment_count
+
+
+def read_columnar(filename):
+    """Read every segment from a .smtc file"""
+    with ColumnarReader(filename) as reader:
+        return list(reader)
+
+
+def _zigzag(value):
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def _unzigzag(value):
+    return value >> 1 if not value & 1 else -((value + 1) >> 1)
+
+
+def _write_varint(buffer, value):
+    while value > 0x7F:
+        buffer.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def _read_varint(data, position):
+    result = shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, position
+        shift += 7
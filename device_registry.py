@@ -0,0 +1,172 @@
+import json
+import os
+import threading
+
+from structured_logging import get_logger
+
+log = get_logger("devices")
+
+STATE_FILE = os.path.join(os.path.expanduser("~"), ".smart_meeting_assistant", "audio_devices.json")
+
+# Name fragments of devices that capture what the speakers play
+STEREO_MIX_KEYWORDS = ('stereo', 'stereomix', 'wave out mix', 'what u hear', 'loopback')
+
+
+class DeviceRegistry:
+    """Cached audio device enumeration with a capability index.
+
+    PortAudio is queried once; the devices are then indexed by capability
+    ("input", "output", "stereo_mix", "wasapi_input", "default_input",
+    "default_output") so lookups are dictionary reads. The cache is only
+    refreshed by rescan(), which callers use explicitly or after a stream
+    failed to open (a device was plugged in or removed). Devices that
+    worked are remembered by name per role in a small JSON file and
+    preferred on the next run, since device ids change between sessions.
+    """
+
+    def __init__(self, backend=None, state_file=STATE_FILE):
+        self.backend = backend
+        self.state_file = state_file
+        self.lock = threading.Lock()
+        self.devices = None
+        self.host_apis = []
+        self.index = {}
+        self.last_good = self._load_state()
+
+    def _sd(self):
+        if self.backend is None:
+            import sounddevice
+            self.backend = sounddevice
+        return self.backend
+
+    def rescan(self, reinitialize=True):
+        """Re-enumerate the devices, picking up hot-plugged ones.
+
+        PortAudio only sees device changes after it is re-initialized,
+        which also aborts open streams; pass reinitialize=False while
+        streams are running.
+        """
+        sd = self._sd()
+        with self.lock:
+            if reinitialize and self.devices is not None and hasattr(sd, '_terminate'):
+                try:
+                    sd._terminate()
+                    sd._initialize()
+                except Exception as e:
+                    log.warning("Could not re-initialize PortAudio", extra={'error': str(e)})
+            self.devices = [dict(device, id=i) for i, device in enumerate(sd.query_devices())]
+            try:
+                self.host_apis = [dict(api) for api in sd.query_hostapis()]
+            except Exception:
+                self.host_apis = []
+            self.index = self._build_index(sd)
+        log.info("Audio devices scanned", extra={'devices': len(self.devices)})
+        return self.devices
+
+    def _build_index(self, sd):
+        index = {'input': [], 'output': [], 'stereo_mix': [], 'wasapi_input': []}
+        for device in self.devices:
+            name = device['name'].lower()
+            if device['max_input_channels'] > 0:
+                index['input'].append(device['id'])
+                if any(keyword in name for keyword in STEREO_MIX_KEYWORDS):
+                    index['stereo_mix'].append(device['id'])
+                if 'wasapi' in name:
+                    index['wasapi_input'].append(device['id'])
+            if device['max_output_channels'] > 0:
+                index['output'].append(device['id'])
+        default_input, default_output = sd.default.device
+        index['default_input'] = [default_input] if default_input is not None and default_input >= 0 else []
+        index['default_output'] = [default_output] if default_output is not None and default_output >= 0 else []
+        return index
+
+    def _ensure_scanned(self):
+        if self.devices is None:
+            self.rescan()
+
+    def get(self, device_id):
+        self._ensure_scanned()
+        if device_id is None or not 0 <= device_id < len(self.devices):
+            return None
+        return self.devices[device_id]
+
+    def find(self, capability, role=None):
+        """Return a device id with the capability, or None.
+
+        When role is given and the device remembered for it still has the
+        capability, that device wins over the first match.
+        """
+        self._ensure_scanned()
+        candidates = self.index.get(capability, [])
+        remembered = self.last_good.get(role) if role else None
+        if remembered:
+            for device_id in candidates:
+                if self.devices[device_id]['name'] == remembered:
+                    return device_id
+        return candidates[0] if candidates else None
+
+    def has_host_api(self, name):
+        """True when a host API whose name contains `name` (e.g. "wasapi") exists"""
+        self._ensure_scanned()
+        return any(name in api['name'].lower() for api in self.host_apis)
+
+    def input_devices(self):
+        self._ensure_scanned()
+        return [self.devices[i] for i in self.index['input']]
+
+    def output_devices(self):
+        self._ensure_scanned()
+        return [self.devices[i] for i in self.index['output']]
+
+    def describe(self):
+        """Devices in the format of the recorders' get_available_devices()"""
+        def info(device, channels_key):
+            return {
+                'id': device['id'],
+                'name': device['name'],
+                'channels': device[channels_key],
+                'default_samplerate': device['default_samplerate'],
+                'hostapi': device.get('hostapi')
+            }
+
+        self._ensure_scanned()
+        defaults = [self.index['default_input'], self.index['default_output']]
+        return {
+            'input_devices': [info(device, 'max_input_channels') for device in self.input_devices()],
+            'output_devices': [info(device, 'max_output_channels') for device in self.output_devices()],
+            'default_input': defaults[0][0] if defaults[0] else 0,
+            'default_output': defaults[1][0] if defaults[1] else 0
+        }
+
+    def remember(self, role, device_id):
+        """Persist the device that worked for a role ("microphone", "system", ...)"""
+        device = self.get(device_id)
+        if device is None or self.last_good.get(role) == device['name']:
+            return
+        self.last_good[role] = device['name']
+        try:
+            os.makedirs(os.path.dirname(self.state_file), exist_ok=True)
+            with open(self.state_file, 'w', encoding='utf-8') as f:
+                json.dump(self.last_good, f, indent=2)
+        except OSError as e:
+            log.warning("Could not save the device choice", extra={'error': str(e)})
+
+    def _load_state(self):
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry():
+    """The process-wide registry shared by the recorders"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = DeviceRegistry()
+        return _registry
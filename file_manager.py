@@ -1,11 +1,27 @@
 import os
 import json
 from datetime import datetime
+from columnar_store import read_columnar, write_columnar
+from subtitle_exporter import export_subtitles
+from transcript_archive import TranscriptArchive
+from transcript_segment import TranscriptSegment, parse_transcript_text, segments_to_text
+from structured_logging import get_logger
+
+log = get_logger("files")
+
+TRANSCRIPT_EXTENSIONS = ('.txt', '.json', '.smtc')
 
 class FileManager:
     def __init__(self):
         self.output_dir = os.path.join(os.path.dirname(__file__), "transcriptions")
         os.makedirs(self.output_dir, exist_ok=True)
+        try:
+            self.archive = TranscriptArchive(self.output_dir)
+            self._sync_archive()
+        except Exception as e:
+            # SQLite without FTS5 or an unwritable folder: fall back to scanning
+            log.warning("Transcript archive unavailable", extra={'path': self.output_dir, 'error': str(e)})
+            self.archive = None
     
     def save_transcription(self, transcription_text, filename=None):
         """Save transcription to file"""
@@ -20,9 +36,10 @@ class FileManager:
                 f.write("=" * 50 + "\n\n")
                 f.write(transcription_text)
             
+            self._index_file(filename, parse_transcript_text(transcription_text))
             return True
         except Exception as e:
-            print(f"Error saving transcription: {e}")
+            log.error("Error saving transcription", extra={'path': filename, 'error': str(e)})
             return False
     
     def save_transcription_json(self, transcription_data, filename=None):
@@ -39,33 +56,167 @@ class FileManager:
                     "duration": transcription_data.get('duration', 'Unknown')
                 },
                 "transcription": transcription_data.get('text', ''),
+                "segments": [segment.to_dict() for segment in transcription_data.get('segments', [])],
                 "participants": transcription_data.get('participants', []),
-                "summary": transcription_data.get('summary', '')
+                "summary": transcription_data.get('summary', ''),
+                "analysis": transcription_data.get('analysis', {})
             }
             
             with open(filename, 'w', encoding='utf-8') as f:
                 json.dump(data, f, indent=2, ensure_ascii=False)
             
+            segments = transcription_data.get('segments') or parse_transcript_text(data['transcription'])
+            self._index_file(filename, segments, meeting_date=data['meeting_info']['date'],
+                             duration=str(data['meeting_info']['duration']),
+                             summary=data['summary'])
+            return True
+        except Exception as e:
+            log.error("Error saving JSON transcription", extra={'path': filename, 'error': str(e)})
+            return False
+    
+    def update_transcription_json(self, filename, **fields):
+        """Update top-level fields (e.g. summary) of a saved JSON transcription"""
+        try:
+            with open(filename, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            data.update(fields)
+            with open(filename, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+            
+            self._index_file(filename, self.load_segments(filename), **self._read_metadata(filename))
+            return True
+        except Exception as e:
+            log.error("Error updating JSON transcription", extra={'path': filename, 'error': str(e)})
+            return False
+    
+    def save_subtitles(self, segments, filename=None, fmt="srt", **options):
+        """Export timed segments as SRT or WebVTT subtitles"""
+        try:
+            if filename is None:
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                filename = os.path.join(self.output_dir, f"meeting_transcription_{timestamp}.{fmt}")
+            
+            export_subtitles(segments, filename, fmt, **options)
+            return True
+        except Exception as e:
+            log.error("Error saving subtitles", extra={'path': filename, 'subtitle_format': fmt, 'error': str(e)})
+            return False
+    
+    def save_transcription_columnar(self, segments, filename=None):
+        """Save timed segments in the compressed columnar format (.smtc)"""
+        try:
+            if filename is None:
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                filename = os.path.join(self.output_dir, f"meeting_transcription_{timestamp}.smtc")
+            
+            segments = list(segments)
+            write_columnar(segments, filename)
+            self._index_file(filename, segments)
             return True
         except Exception as e:
-            print(f"Error saving JSON transcription: {e}")
+            log.error("Error saving columnar transcription", extra={'path': filename, 'error': str(e)})
             return False
     
+    def save_alignment(self, segments, transcript_filename, audio_file, first_segment=0):
+        """Write the .align index linking a saved transcript to its archived audio"""
+        try:
+            from alignment_index import write_alignment
+            target = os.path.splitext(transcript_filename)[0] + ".align"
+            write_alignment(segments, target, audio_file, first_segment)
+            return target
+        except Exception as e:
+            log.error("Error saving alignment index", extra={'path': transcript_filename, 'error': str(e)})
+            return None
+    
+    def load_alignment(self, transcript_filename):
+        """Open the alignment index of a saved transcript, or None when it has none"""
+        from alignment_index import AlignmentIndex
+        target = os.path.splitext(transcript_filename)[0] + ".align"
+        if not os.path.exists(target):
+            return None
+        return AlignmentIndex(target)
+    
+    def convert_to_columnar(self, filename, target=None):
+        """Convert a .txt or .json transcription to .smtc and return the new path"""
+        target = target or os.path.splitext(filename)[0] + ".smtc"
+        if self.save_transcription_columnar(self.load_segments(filename), target):
+            return target
+        return None
+    
+    def convert_from_columnar(self, filename, target):
+        """Convert a .smtc transcription to the .txt or .json format of target"""
+        segments = self.load_segments(filename)
+        if target.endswith('.json'):
+            success = self.save_transcription_json(
+                {'text': segments_to_text(segments), 'segments': segments}, target)
+        else:
+            success = self.save_transcription(segments_to_text(segments), target)
+        return target if success else None
+    
+    def load_segments(self, filename):
+        """Load timed segments from a saved JSON, text or columnar transcription"""
+        try:
+            if filename.endswith('.smtc'):
+                return read_columnar(filename)
+            with open(filename, 'r', encoding='utf-8') as f:
+                if filename.endswith('.json'):
+                    data = json.load(f)
+                    if 'segments' not in data:
+                        # Written before segments were stored
+                        return parse_transcript_text(data.get('transcription', ''))
+                    return [TranscriptSegment.from_dict(item) for item in data['segments']]
+                return parse_transcript_text(f.read())
+        except Exception as e:
+            log.error("Error loading segments", extra={'path': filename, 'error': str(e)})
+            return []
+    
     def load_transcription(self, filename):
         """Load transcription from file"""
         try:
+            if filename.endswith('.smtc'):
+                return segments_to_text(read_columnar(filename))
             with open(filename, 'r', encoding='utf-8') as f:
                 return f.read()
         except Exception as e:
-            print(f"Error loading transcription: {e}")
+            log.error("Error loading transcription", extra={'path': filename, 'error': str(e)})
             return None
     
     def get_transcription_files(self):
-        """Get list of saved transcription files"""
+        """Get list of saved transcription files in the output folder.
+
+        Files saved elsewhere stay searchable but are not listed; files
+        deleted since they were indexed are dropped from the index.
+        """
+        if self.archive:
+            try:
+                output_dir = os.path.abspath(self.output_dir)
+                files = []
+                for entry in self.archive.list_transcripts():
+                    if not os.path.exists(entry['path']):
+                        self.archive.remove_transcript(entry['path'])
+                    elif os.path.dirname(entry['path']) == output_dir:
+                        files.append(entry)
+                return files
+            except Exception as e:
+                log.error("Error reading transcript archive", extra={'error': str(e)})
+        return self._scan_transcription_files()
+    
+    def search_transcriptions(self, query, limit=20):
+        """Search saved transcriptions; hits carry the segment offsets in ms"""
+        if not self.archive:
+            return []
+        try:
+            return self.archive.search(query, limit)
+        except Exception as e:
+            log.error("Error searching transcriptions", extra={'query': query, 'error': str(e)})
+            return []
+    
+    def _scan_transcription_files(self):
+        """List transcription files straight from the output folder"""
         try:
             files = []
             for file in os.listdir(self.output_dir):
-                if file.endswith(('.txt', '.json')):
+                if file.endswith(TRANSCRIPT_EXTENSIONS):
                     filepath = os.path.join(self.output_dir, file)
                     files.append({
                         'name': file,
@@ -74,14 +225,55 @@ class FileManager:
                     })
             return sorted(files, key=lambda x: x['modified'], reverse=True)
         except Exception as e:
-            print(f"Error getting transcription files: {e}")
+            log.error("Error getting transcription files", extra={'path': self.output_dir, 'error': str(e)})
             return []
     
     def delete_transcription(self, filename):
         """Delete a transcription file"""
         try:
             os.remove(filename)
+            if self.archive:
+                self.archive.remove_transcript(filename)
             return True
         except Exception as e:
-            print(f"Error deleting transcription: {e}")
+            log.error("Error deleting transcription", extra={'path': filename, 'error': str(e)})
             return False
+    
+    def _index_file(self, filename, segments, **metadata):
+        """Add a saved file to the archive; indexing problems never fail a save"""
+        if not self.archive:
+            return
+        try:
+            self.archive.index_transcript(filename, segments, **metadata)
+        except Exception as e:
+            log.error("Error indexing transcription", extra={'path': filename, 'error': str(e)})
+    
+    def _sync_archive(self):
+        """Index files added or changed outside the app and forget deleted ones"""
+        indexed = self.archive.indexed_files()
+        for entry in os.scandir(self.output_dir):
+            if not entry.name.endswith(TRANSCRIPT_EXTENSIONS):
+                continue
+            path = os.path.abspath(entry.path)
+            modified = entry.stat().st_mtime
+            if indexed.pop(path, None) != modified:
+                metadata = self._read_metadata(path)
+                self.archive.index_transcript(path, self.load_segments(path), modified=modified, **metadata)
+        for path in indexed:
+            if not os.path.exists(path):
+                self.archive.remove_transcript(path)
+    
+    def _read_metadata(self, filename):
+        """Read archive metadata from a JSON transcription"""
+        if not filename.endswith('.json'):
+            return {}
+        try:
+            with open(filename, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return {
+                'meeting_date': data.get('meeting_info', {}).get('date'),
+                'duration': str(data.get('meeting_info', {}).get('duration')),
+                'summary': data.get('summary')
+            }
+        except Exception:
+            return {}
@@ -1,15 +1,26 @@
 import tkinter as tk
 from tkinter import ttk, scrolledtext, filedialog, messagebox
 import threading
-import datetime
 import time
 import os
 import glob
-import webbrowser
-from enhanced_audio_recorder import EnhancedAudioRecorder
-from windows_audio_recorder import WindowsAudioRecorder
-from transcription_service import TranscriptionService
-from file_manager import FileManager
+import importlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from chunk_controller import AdaptiveChunkController
+from pipeline_metrics import metrics
+from structured_logging import get_logger
+from ui_updates import CoalescingUpdater
+
+log = get_logger("ui")
+
+# Modules that pull in sounddevice, numpy, scipy or speech_recognition. They
+# are imported when first needed (or warmed up once the window is shown) so
+# they do not delay start-up.
+HEAVY_MODULES = ("enhanced_audio_recorder", "transcription_service")
+
+# Recognition languages offered in the window; "auto" identifies the language
+LANGUAGES = ("auto", "en", "es", "fr", "de", "it", "pt", "ru", "ja", "ko", "zh")
 
 class SmartMeetingAssistant:
     def __init__(self, root):
@@ -17,16 +28,130 @@ class SmartMeetingAssistant:
         self.root.title("Smart Meeting Assistant")
         self.root.geometry("900x700")
         
-        self.enhanced_audio_recorder = EnhancedAudioRecorder()
-        self.windows_audio_recorder = WindowsAudioRecorder()
-        self.transcription_service = TranscriptionService()
-        self.file_manager = FileManager()
+        # Services are created on first use, see the properties below
+        self._lazy_lock = threading.Lock()
+        self._enhanced_audio_recorder = None
+        self._windows_audio_recorder = None
+        self._transcription_service = None
+        self._file_manager = None
+        self._summarization_service = None
+        self._meeting_analyzer = None
+        self._speaker_diarizer = None
+        # Source selected in the UI, read on the UI thread so the recorder can be created on any
+        self._audio_source = ("microphone", {})
         
         self.is_recording = False
         self.current_transcription = ""
-        self.current_recorder = self.enhanced_audio_recorder  # Default to enhanced recorder
+        self.segments = []  # TranscriptSegment objects with audio offsets
+        self.session_first_segment = 0  # First segment of the last recording, see _save_alignment
+        self.current_summary = ""
+        self.live_summarizer = None
+        self.live_text = ""  # Interim hypothesis shown at the end of the transcript
+        # Worker threads post transcript updates here; the UI applies them at most 10 times a second
+        self.ui_updates = CoalescingUpdater(self.root.after, self._show_segments, self._set_live_line)
+        self.chunk_controller = None  # Adapts chunk length and parallelism per recording
+        self.metrics_window = None
+        self.replay_file = None  # Recording replayed by the "Audio File" source
+        
+        # Prometheus scrape endpoint, e.g. METRICS_PORT=9464
+        if os.environ.get("METRICS_PORT"):
+            try:
+                metrics.serve(int(os.environ["METRICS_PORT"]))
+            except Exception as e:
+                log.error("Could not start metrics endpoint", extra={'error': str(e)})
         
         self.setup_ui()
+        self.root.after(1000, self.warm_up_imports)
+        
+    @property
+    def enhanced_audio_recorder(self):
+        with self._lazy_lock:
+            if self._enhanced_audio_recorder is None:
+                from enhanced_audio_recorder import EnhancedAudioRecorder
+                self._enhanced_audio_recorder = EnhancedAudioRecorder()
+                source, options = self._audio_source
+                self._enhanced_audio_recorder.set_audio_source(source, **options)
+                # DC removal, noise gate and gain control for quiet Stereo Mix audio;
+                # AUDIO_PREPROCESSING=0 records the raw signal
+                if os.environ.get("AUDIO_PREPROCESSING", "1") != "0":
+                    self._enhanced_audio_recorder.enable_preprocessing()
+                # Dead air is dropped before it is encoded and sent to the recognizer
+                self._enhanced_audio_recorder.enable_silence_gate()
+                # SESSION_AUDIO=1 keeps recordings in recordings/ for seeking and
+                # re-transcription, the newest SESSION_AUDIO_KEEP of them (0 keeps all)
+                if os.environ.get("SESSION_AUDIO", "0") == "1":
+                    keep = int(os.environ.get("SESSION_AUDIO_KEEP", 20))
+                    self._enhanced_audio_recorder.enable_session_archive(keep=keep or None)
+            return self._enhanced_audio_recorder
+    
+    @property
+    def windows_audio_recorder(self):
+        with self._lazy_lock:
+            if self._windows_audio_recorder is None:
+                from windows_audio_recorder import WindowsAudioRecorder
+                self._windows_audio_recorder = WindowsAudioRecorder()
+            return self._windows_audio_recorder
+    
+    @property
+    def current_recorder(self):
+        # Always use enhanced_audio_recorder since it works properly
+        return self.enhanced_audio_recorder
+    
+    @property
+    def transcription_service(self):
+        with self._lazy_lock:
+            if self._transcription_service is None:
+                from transcription_service import TranscriptionService
+                self._transcription_service = TranscriptionService()
+            return self._transcription_service
+    
+    @property
+    def file_manager(self):
+        with self._lazy_lock:
+            if self._file_manager is None:
+                from file_manager import FileManager
+                self._file_manager = FileManager()
+            return self._file_manager
+    
+    @property
+    def summarization_service(self):
+        with self._lazy_lock:
+            if self._summarization_service is None:
+                from summarization_service import SummarizationService
+                self._summarization_service = SummarizationService.from_environment()
+            return self._summarization_service
+    
+    @property
+    def meeting_analyzer(self):
+        with self._lazy_lock:
+            if self._meeting_analyzer is None:
+                from meeting_analyzer import MeetingAnalyzer
+                self._meeting_analyzer = MeetingAnalyzer()
+            return self._meeting_analyzer
+    
+    @property
+    def speaker_diarizer(self):
+        with self._lazy_lock:
+            if self._speaker_diarizer is None:
+                from speaker_diarization import SpeakerDiarizer
+                self._speaker_diarizer = SpeakerDiarizer()
+            return self._speaker_diarizer
+    
+    def warm_up_imports(self):
+        """Import the heavy modules in the background after the window is up"""
+        def warm_up():
+            for module in HEAVY_MODULES:
+                try:
+                    importlib.import_module(module)
+                except Exception as e:
+                    log.warning("Could not preload module", extra={'target': module, 'error': str(e)})
+            # Offline models of the configured languages, so switching costs no load time
+            try:
+                self.transcription_service.warm_up_models()
+            except Exception as e:
+                log.warning("Could not preload models", extra={'error': str(e)})
+        
+        threading.Thread(target=warm_up, daemon=True).start()
         
     def setup_ui(self):
         # Main frame
@@ -56,10 +181,19 @@ class SmartMeetingAssistant:
                        variable=self.audio_source_var, value="both",
                        command=self.on_audio_source_change).grid(row=0, column=2, sticky=tk.W, padx=(0, 10))
         
+        ttk.Radiobutton(audio_frame, text="Audio File...", 
+                       variable=self.audio_source_var, value="file",
+                       command=self.choose_replay_file).grid(row=0, column=3, sticky=tk.W, padx=(0, 10))
+        
         # Test audio button
         self.test_audio_btn = ttk.Button(audio_frame, text="Test Audio Setup", 
                                         command=self.test_audio_setup)
-        self.test_audio_btn.grid(row=0, column=3, sticky=tk.E)
+        self.test_audio_btn.grid(row=0, column=4, sticky=tk.E)
+        
+        ttk.Label(audio_frame, text="Language:").grid(row=1, column=0, sticky=tk.W, pady=(5, 0))
+        self.language_var = tk.StringVar(value="en")
+        ttk.Combobox(audio_frame, textvariable=self.language_var, values=LANGUAGES,
+                     state="readonly", width=6).grid(row=1, column=1, sticky=tk.W, pady=(5, 0))
         
         # Control buttons
         control_frame = ttk.Frame(main_frame)
@@ -81,9 +215,21 @@ class SmartMeetingAssistant:
                                    command=self.clean_folder)
         self.clean_btn.grid(row=0, column=3, padx=(0, 10), sticky=tk.W)
         
+        self.summarize_btn = ttk.Button(control_frame, text="Summarize", 
+                                       command=self.summarize_transcription)
+        self.summarize_btn.grid(row=0, column=4, padx=(0, 10), sticky=tk.W)
+        
         self.github_btn = ttk.Button(control_frame, text="GitHub Repo", 
                                     command=self.open_github)
-        self.github_btn.grid(row=0, column=4, sticky=tk.E)
+        self.live_summary_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(control_frame, text="Live summary", 
+                       variable=self.live_summary_var).grid(row=0, column=5, padx=(0, 10), sticky=tk.W)
+        
+        self.metrics_btn = ttk.Button(control_frame, text="Metrics", 
+                                     command=self.show_metrics)
+        self.metrics_btn.grid(row=0, column=6, padx=(0, 10), sticky=tk.W)
+        
+        self.github_btn.grid(row=0, column=7, sticky=tk.E)
         
         # Status label
         self.status_label = ttk.Label(main_frame, text="Ready to record", 
@@ -107,14 +253,24 @@ class SmartMeetingAssistant:
                                                            height=20, width=80)
         self.transcription_text.grid(row=6, column=0, columnspan=4, 
                                     pady=(0, 10), sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.transcription_text.tag_configure("live", foreground="gray", font=("Arial", 10, "italic"))
+        
+        # Rolling summary, filled while recording when "Live summary" is on
+        ttk.Label(main_frame, text="Summary so far:", 
+                 font=("Arial", 12, "bold")).grid(row=7, column=0, columnspan=4, 
+                                                 pady=(0, 5), sticky=tk.W)
+        
+        self.summary_text = scrolledtext.ScrolledText(main_frame, height=4, width=80, 
+                                                     wrap=tk.WORD)
+        self.summary_text.grid(row=8, column=0, columnspan=4, sticky=(tk.W, tk.E))
         
         # Configure grid weights
         self.root.columnconfigure(0, weight=1)
         self.root.rowconfigure(0, weight=1)
         main_frame.columnconfigure(3, weight=1)
         main_frame.rowconfigure(6, weight=1)
-        audio_frame.columnconfigure(3, weight=1)
-        control_frame.columnconfigure(5, weight=1)
+        audio_frame.columnconfigure(4, weight=1)
+        control_frame.columnconfigure(8, weight=1)
         
         # Initialize audio source
         self.on_audio_source_change()
@@ -122,28 +278,49 @@ class SmartMeetingAssistant:
     def on_audio_source_change(self):
         """Handle audio source selection change"""
         source = self.audio_source_var.get()
+        options = self._source_options()
         
-        # Always use enhanced_audio_recorder since it works properly
-        self.current_recorder = self.enhanced_audio_recorder
-        self.enhanced_audio_recorder.set_audio_source(source)
+        # A recorder that is not created yet picks the source up on creation
+        with self._lazy_lock:
+            self._audio_source = (source, options)
+            if self._enhanced_audio_recorder is not None:
+                self._enhanced_audio_recorder.set_audio_source(source, **options)
         
         # Update status
         source_names = {
             "microphone": "Microphone only",
             "system": "System audio (YouTube, etc.)",
-            "both": "Microphone + System audio"
+            "both": "Microphone + System audio",
+            "file": f"Audio file {os.path.basename(self.replay_file or '')}"
         }
         self.status_label.config(text=f"Ready to record - {source_names[source]}", foreground="green")
     
+    def choose_replay_file(self):
+        """Pick a recording to run through the live pipeline"""
+        filename = filedialog.askopenfilename(
+            filetypes=[("Audio files", "*.wav *.flac *.ogg"), ("All files", "*.*")])
+        if filename:
+            self.replay_file = filename
+        elif not self.replay_file:
+            self.audio_source_var.set("microphone")
+        self.on_audio_source_change()
+    
+    def _source_options(self):
+        if self.audio_source_var.get() == "file":
+            return {'path': self.replay_file, 'speed': 1.0}
+        return {}
+    
     def test_audio_setup(self):
         """Test and display audio setup information"""
+        source = self.audio_source_var.get()
+        
         def show_test_results():
             try:
                 # Use enhanced audio recorder for testing since it works
                 test_success = self.enhanced_audio_recorder.test_system_audio_capture()
                 
                 # Show instructions for system audio if needed
-                if self.audio_source_var.get() in ["system", "both"]:
+                if source in ["system", "both"]:
                     stereo_mix = self.enhanced_audio_recorder.find_stereo_mix_device()
                     if not stereo_mix:
                         messagebox.showinfo("System Audio Setup", 
@@ -164,17 +341,27 @@ class SmartMeetingAssistant:
         
     def start_recording(self):
         self.is_recording = True
+        self.session_first_segment = len(self.segments)
         self.start_btn.config(state="disabled")
         self.stop_btn.config(state="normal")
         
         source_names = {
             "microphone": "microphone",
             "system": "system audio",
-            "both": "microphone + system audio"
+            "both": "microphone + system audio",
+            "file": os.path.basename(self.replay_file or "audio file")
         }
         source = self.audio_source_var.get()
         self.status_label.config(text=f"Recording from {source_names[source]}... Speak now", foreground="red")
         
+        if self.live_summary_var.get():
+            from summarization_service import IncrementalSummarizer
+            self.live_summarizer = IncrementalSummarizer(
+                self.summarization_service,
+                on_update=lambda summary: self.root.after(0, lambda: self._show_live_summary(summary)))
+        else:
+            self.live_summarizer = None
+        
         # Start recording in a separate thread
         self.recording_thread = threading.Thread(target=self.record_and_transcribe)
         self.recording_thread.daemon = True
@@ -185,31 +372,176 @@ class SmartMeetingAssistant:
         
     def stop_recording(self):
         self.is_recording = False
+        self.current_recorder.wake()  # The recording thread may be waiting for audio
         self.start_btn.config(state="normal")
         self.stop_btn.config(state="disabled")
         self.status_label.config(text="Processing final transcription...", foreground="orange")
         
     def record_and_transcribe(self):
+        """Chunk the recording and recognize the chunks, showing results in order.
+
+        The chunk controller sets the chunk length and how many chunks are
+        recognized at once from the measured latency. The thread sleeps in
+        wait_for_audio until a chunk is buffered or a recognition finishes.
+        """
+        self.chunk_controller = AdaptiveChunkController()
+        self.transcription_service.set_language(self.language_var.get())
+        if self._audio_source[0] == "both":
+            self.record_and_transcribe_sources()
+            return
+        if self.transcription_service.supports_streaming():
+            self.record_and_transcribe_streaming()
+            return
         try:
-            audio_file = self.current_recorder.start_recording()
-            chunk_seconds = 1  # Process every 1 second for real-time
-            while self.is_recording:
-                chunk_file = self.current_recorder.get_audio_chunk(seconds=chunk_seconds)
-                if chunk_file:
-                    text = self.transcription_service.transcribe_audio(chunk_file)
-                    if text:
-                        self.update_transcription(text)
-                time.sleep(0.2)  # Small delay to prevent excessive CPU usage
-            # Final transcription (append, don't clear)
-            self.current_recorder.stop_recording()
-            final_text = self.transcription_service.transcribe_audio(audio_file)
-            if final_text:
-                self.update_transcription(final_text)
+            recorder = self.current_recorder
+            controller = self.chunk_controller
+            recorder.start_recording()
+            pending = deque()  # Recognitions in capture order
+            with ThreadPoolExecutor(max_workers=controller.max_workers, thread_name_prefix="recognizer") as executor:
+                while self.is_recording:
+                    while pending and pending[0].done():
+                        self._show_segment(pending.popleft().result())
+                    seconds = controller.seconds  # Workers may adapt it meanwhile
+                    if len(pending) >= controller.workers:
+                        self._show_segment(pending.popleft().result())
+                    elif recorder.wait_for_audio(seconds):
+                        chunk = recorder.get_audio_segment(seconds=seconds)
+                        controller.observe_lag(recorder.buffered_seconds())
+                        if chunk:  # None: skipped as silence
+                            future = executor.submit(self._transcribe_chunk, *chunk)
+                            future.add_done_callback(lambda _: recorder.wake())
+                            pending.append(future)
+                    elif recorder.source_finished():
+                        # A replayed file has been fully chunked
+                        self.root.after(0, self.stop_recording)
+                        break
+                for future in pending:
+                    self._show_segment(future.result())
+            # Final transcription of the audio not yet chunked (append, don't clear)
+            final_chunk = self.current_recorder.stop_recording_segment()
+            if final_chunk:  # None: everything was chunked already
+                final_file, start_ms, end_ms = final_chunk
+                final_segment = self.transcription_service.transcribe_segment(final_file, start_ms, end_ms)
+                if final_segment:
+                    final_segment.speaker = self.speaker_diarizer.label_file(final_file)
+                    self.update_transcription(final_segment)
+            self._log_silence(recorder)
             self.root.after(0, lambda: self.finalize_transcription(None))
         except Exception as error:
             error_msg = str(error)
             self.root.after(0, lambda: self.handle_error(error_msg))
     
+    def record_and_transcribe_streaming(self):
+        """Recognize the capture continuously with a streaming backend.
+
+        Interim hypotheses replace the live line at the end of the
+        transcript; when a phrase is finalized, its audio is taken from the
+        recorder to label the speaker and the line becomes a segment.
+        """
+        from streaming_recognition import identify_streaming_language, stream_transcripts
+        
+        recorder = self.current_recorder
+        tap = recorder.open_tap()
+        try:
+            recorder.start_recording()
+            until = lambda: not self.is_recording
+            # "auto" picks the model from the first seconds, which are then recognized with it
+            lead_in = identify_streaming_language(tap, recorder, self.transcription_service, until)
+            recognizer = self.transcription_service.create_streaming_recognizer(recorder.rate)
+            for kind, value in stream_transcripts(tap, recorder, recognizer, until, lead_in=lead_in):
+                if kind == "partial":
+                    self.ui_updates.set_live(value)
+                    continue
+                samples = recorder.take_audio(value.end_ms if value else None)
+                self.ui_updates.set_live("")
+                if value:
+                    if samples is not None:
+                        value.speaker = self.speaker_diarizer.label_samples(samples, recorder.rate)
+                    self.update_transcription(value)
+            if self.is_recording:
+                # A replayed file has been fully recognized
+                self.root.after(0, self.stop_recording)
+            recorder.stop_capture()
+            self.root.after(0, lambda: self.finalize_transcription(None))
+        except Exception as error:
+            recorder.stop_capture()
+            error_msg = str(error)
+            self.root.after(0, lambda: self.handle_error(error_msg))
+        finally:
+            recorder.close_tap(tap)
+    
+    def _transcribe_chunk(self, chunk_file, start_ms, end_ms):
+        started = time.perf_counter()
+        segment = self.transcription_service.transcribe_segment(chunk_file, start_ms, end_ms)
+        if segment:
+            segment.speaker = self.speaker_diarizer.label_file(chunk_file)
+        self._record_chunk_timing(started, start_ms, end_ms)
+        return segment
+    
+    def _show_segment(self, segment):
+        if segment:
+            self.update_transcription(segment)
+    
+    def record_and_transcribe_sources(self):
+        """Record microphone and system audio as separate tracks.
+
+        Whenever a chunk is buffered, the chunks of both tracks are
+        recognized in parallel, labeled with their source and shown in
+        timestamp order. Silent tracks are skipped by the recorder before
+        recognition. The chunk length follows the chunk controller.
+        """
+        try:
+            recorder = self.current_recorder
+            controller = self.chunk_controller
+            recorder.start_recording()
+            with ThreadPoolExecutor(max_workers=2, thread_name_prefix="recognizer") as executor:
+                while self.is_recording:
+                    seconds = controller.seconds
+                    if not recorder.wait_for_audio(seconds):
+                        continue
+                    chunks = recorder.get_source_segments(seconds=seconds)
+                    controller.observe_lag(recorder.buffered_seconds())
+                    if chunks:
+                        self._transcribe_source_chunks(chunks, executor)
+                self._transcribe_source_chunks(recorder.stop_recording_sources(), executor)
+            self._log_silence(recorder)
+            self.root.after(0, lambda: self.finalize_transcription(None))
+        except Exception as error:
+            error_msg = str(error)
+            self.root.after(0, lambda: self.handle_error(error_msg))
+    
+    def _log_silence(self, recorder):
+        log.info("Skipped silent audio", extra={f"{source}_seconds": round(ms / 1000, 1)
+                                                for source, ms in recorder.silent_ms.items()})
+    
+    def _transcribe_source_chunks(self, chunks, executor):
+        futures = [executor.submit(self._transcribe_source_chunk, *chunk[:4]) for chunk in chunks]
+        segments = [future.result() for future in futures]
+        for segment in sorted(filter(None, segments), key=lambda segment: segment.start_ms):
+            self.update_transcription(segment)
+    
+    def _transcribe_source_chunk(self, source, chunk_file, start_ms, end_ms):
+        started = time.perf_counter()
+        segment = self.transcription_service.transcribe_segment(chunk_file, start_ms, end_ms)
+        if segment:
+            segment.source = source
+            segment.speaker = self.speaker_diarizer.label_file(chunk_file)
+        self._record_chunk_timing(started, start_ms, end_ms)
+        return segment
+    
+    def _record_chunk_timing(self, started, start_ms, end_ms):
+        """Track chunk processing time and the real-time factor (processing / audio time)"""
+        elapsed = time.perf_counter() - started
+        audio_seconds = (end_ms - start_ms) / 1000
+        metrics.histogram("chunk_processing_seconds", "Recognition and labeling time per chunk").observe(elapsed)
+        metrics.counter("audio_seconds_total", "Audio processed").inc(audio_seconds)
+        metrics.counter("processing_seconds_total", "Time spent processing audio").inc(elapsed)
+        if audio_seconds > 0:
+            metrics.gauge("real_time_factor", "Processing time over audio time of the last chunk"
+                          ).set(round(elapsed / audio_seconds, 3))
+        if self.chunk_controller:
+            self.chunk_controller.observe(audio_seconds, elapsed)
+    
     def monitor_audio_levels(self):
         """Monitor and display audio levels"""
         if self.is_recording:
@@ -224,21 +556,81 @@ class SmartMeetingAssistant:
         else:
             self.audio_level_bar['value'] = 0
             
-    def update_transcription(self, text):
-        self.root.after(0, lambda: self._update_ui_transcription(text))
+    def update_transcription(self, segment):
+        self.ui_updates.add_segment(segment)
+        
+    def _show_segments(self, segments):
+        with metrics.time("ui_flush_seconds", "Time to append segments to the transcript view"):
+            # Finished lines go above the live line
+            live_text = self.live_text
+            self._set_live_line("")
+            for segment in segments:
+                # The segment already carries its audio offset; no second timestamp
+                self.segments.append(segment)
+                formatted_text = segment.format_line() + "\n"
+                self.transcription_text.insert(tk.END, formatted_text)
+                self.current_transcription += formatted_text
+                if self.live_summarizer:
+                    self.live_summarizer.add_segment(segment)
+            self._set_live_line(live_text)
+            self.transcription_text.see(tk.END)
+    
+    def _set_live_line(self, text):
+        """Show an interim hypothesis in place of the previous one"""
+        self.live_text = text
+        live_range = self.transcription_text.tag_ranges("live")
+        if live_range:
+            self.transcription_text.delete(*live_range)
+        if text:
+            self.transcription_text.insert(tk.END, text, "live")
+            self.transcription_text.see(tk.END)
+        
+    def show_metrics(self):
+        """Open a debug panel showing the pipeline metrics, refreshed every second"""
+        if self.metrics_window is not None and self.metrics_window.winfo_exists():
+            self.metrics_window.lift()
+            return
         
-    def _update_ui_transcription(self, text):
-        timestamp = datetime.datetime.now().strftime("%H:%M:%S")
-        formatted_text = f"[{timestamp}] {text}\n"
-        self.transcription_text.insert(tk.END, formatted_text)
-        self.transcription_text.see(tk.END)
-        self.current_transcription += formatted_text
+        window = tk.Toplevel(self.root)
+        window.title("Pipeline Metrics")
+        metrics_text = scrolledtext.ScrolledText(window, height=20, width=110, font=("Courier", 9))
+        metrics_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        ttk.Button(window, text="Export JSON", command=self.export_metrics).pack(pady=(0, 5))
+        
+        def refresh():
+            if not window.winfo_exists():
+                return
+            metrics_text.delete("1.0", tk.END)
+            metrics_text.insert(tk.END, metrics.format_text() or "No metrics recorded yet")
+            window.after(1000, refresh)
+        
+        refresh()
+        self.metrics_window = window
+    
+    def export_metrics(self):
+        """Save a JSON snapshot of the pipeline metrics"""
+        filename = filedialog.asksaveasfilename(defaultextension=".json",
+                                                filetypes=[("JSON files", "*.json")])
+        if filename:
+            with open(filename, 'w', encoding='utf-8') as f:
+                f.write(metrics.to_json(indent=2))
+    
+    def _show_live_summary(self, summary):
+        self.summary_text.delete("1.0", tk.END)
+        self.summary_text.insert(tk.END, summary)
+        self.current_summary = summary
         
     def finalize_transcription(self, final_text):
+        # The last segments may still wait for the next UI frame; show them
+        # (and feed the live summary) before completing
+        self.ui_updates.flush()
         self.status_label.config(text="Transcription completed", foreground="green")
         # Do not clear the box, just update status
         if final_text:
             self.update_transcription(final_text)
+        if self.live_summarizer:
+            # Fold the last partial window into the summary
+            self.live_summarizer.flush()
             
     def save_transcription(self):
         if not self.current_transcription:
@@ -247,16 +639,89 @@ class SmartMeetingAssistant:
             
         filename = filedialog.asksaveasfilename(
             defaultextension=".txt",
-            filetypes=[("Text files", "*.txt"), ("All files", "*.*")],
+            filetypes=[("Text files", "*.txt"), ("JSON files", "*.json"),
+                       ("SRT subtitles", "*.srt"), ("WebVTT subtitles", "*.vtt"),
+                       ("All files", "*.*")],
             title="Save Transcription"
         )
         
         if filename:
-            success = self.file_manager.save_transcription(self.current_transcription, filename)
-            if success:
-                messagebox.showinfo("Success", f"Transcription saved to {filename}")
+            extension = os.path.splitext(filename)[1].lower()
+            if extension in (".srt", ".vtt"):
+                success = self.file_manager.save_subtitles(self.segments, filename, extension[1:])
+            elif extension == ".json":
+                self._save_json(filename)
+                return
             else:
-                messagebox.showerror("Error", "Failed to save transcription!")
+                success = self.file_manager.save_transcription(self.current_transcription, filename)
+            self._show_saved(filename, success)
+    
+    def _save_json(self, filename):
+        """Analyze the meeting and save it as JSON in the background; spaCy takes a while"""
+        segments = list(self.segments)
+        data = {'text': self.current_transcription, 'segments': segments,
+                'participants': sorted({s.speaker for s in segments if s.speaker}),
+                'summary': self.current_summary}
+        self.status_label.config(text="Analyzing meeting...", foreground="orange")
+        
+        def save():
+            data['analysis'] = self.analyze_transcription(segments)
+            success = self.file_manager.save_transcription_json(data, filename)
+            self.root.after(0, lambda: self._show_saved(filename, success))
+        
+        threading.Thread(target=save, daemon=True).start()
+    
+    def _show_saved(self, filename, success):
+        if success:
+            self._save_alignment(filename)
+            self.status_label.config(text=f"Saved {os.path.basename(filename)}", foreground="green")
+            messagebox.showinfo("Success", f"Transcription saved to {filename}")
+        else:
+            messagebox.showerror("Error", "Failed to save transcription!")
+    
+    def _save_alignment(self, filename):
+        """Link the saved transcript to the archived audio of the last recording"""
+        recorder = self._enhanced_audio_recorder
+        if self.is_recording or not recorder or not recorder.session_file:
+            return
+        if os.path.exists(recorder.session_file):
+            self.file_manager.save_alignment(self.segments, filename, recorder.session_file,
+                                             self.session_first_segment)
+                
+    def summarize_transcription(self):
+        """Summarize the transcription in the background summarization service"""
+        if not self.segments:
+            messagebox.showwarning("Warning", "No transcription to summarize!")
+            return
+        
+        self.summarize_btn.config(state="disabled")
+        self.status_label.config(text="Summarizing meeting...", foreground="orange")
+        future = self.summarization_service.submit(self.segments)
+        future.add_done_callback(lambda done: self.root.after(0, lambda: self._show_summary(done)))
+    
+    def _show_summary(self, future):
+        self.summarize_btn.config(state="normal")
+        try:
+            result = future.result()
+        except Exception as e:
+            self.status_label.config(text=f"Summarization failed: {e}", foreground="red")
+            return
+        
+        self.current_summary = result['summary']
+        self._show_live_summary(self.current_summary)
+        report = result['report']
+        self.status_label.config(
+            text=f"Summary ready in {report['seconds']:.1f} s ({len(report['levels'])} level(s))",
+            foreground="green")
+        messagebox.showinfo("Meeting Summary", self.current_summary or "No summary generated.")
+                
+    def analyze_transcription(self, segments=None):
+        """Extract action items, entities and keywords; empty if spaCy is unavailable"""
+        try:
+            return self.meeting_analyzer.analyze(self.segments if segments is None else segments)
+        except Exception as e:
+            log.warning("Meeting analysis skipped", extra={'error': str(e)})
+            return {}
                 
     def clean_folder(self):
         """Clean temporary and unnecessary files from the project folder"""
@@ -340,6 +805,7 @@ class SmartMeetingAssistant:
     def open_github(self):
         """Open the GitHub repository in the default web browser"""
         try:
+            import webbrowser
             webbrowser.open("https://github.com/TarDeb/Smart-Meeting-Assistant")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to open GitHub repository: {str(e)}")
@@ -0,0 +1,128 @@
+import re
+from collections import Counter
+
+SPACY_MODEL = "en_core_web_sm"
+
+# Components the analysis never reads; excluding them skips their cost entirely
+UNUSED_COMPONENTS = ["parser", "senter", "textcat"]
+
+ENTITY_LABELS = {"PERSON", "ORG", "GPE", "LOC", "PRODUCT", "EVENT", "WORK_OF_ART", "NORP"}
+DATE_LABELS = {"DATE", "TIME"}
+
+ACTION_PATTERN = re.compile(
+    r"\b(will|i'll|we'll|you'll|going to|need to|needs to|have to|has to|should|must|"
+    r"let's|action item|follow up|follow-up|to do|todo|assign(?:ed)?|deadline|make sure)\b",
+    re.IGNORECASE
+)
+
+
+class MeetingAnalyzer:
+    """Extract action items, named entities, dates and keywords from transcripts.
+
+    Segment texts are streamed through spaCy's ``nlp.pipe`` in batches with
+    the parser and other unused components excluded. ``n_process`` > 1
+    spreads the work over several processes, which pays off for whole
+    archives; callers using it on Windows need an ``if __name__ ==
+    "__main__"`` guard.
+    """
+
+    def __init__(self, model=SPACY_MODEL, batch_size=256, n_process=1, top_keywords=15):
+        import spacy
+
+        self.nlp = spacy.load(model, exclude=UNUSED_COMPONENTS)
+        self.batch_size = batch_size
+        self.n_process = n_process
+        self.top_keywords = top_keywords
+
+    def analyze(self, segments):
+        """Analyze the segments of one meeting"""
+        return self.analyze_many([segments])[0]
+
+    def analyze_many(self, meetings):
+        """Analyze several meetings (lists of segments) in one batched pass"""
+        results = [self._empty_result() for _ in meetings]
+        keyword_counts = [Counter() for _ in meetings]
+        entity_counts = [Counter() for _ in meetings]
+
+        def items():
+            for meeting_index, segments in enumerate(meetings):
+                for segment in segments:
+                    if segment.text.strip():
+                        yield segment.text, (meeting_index, segment.start_ms, segment.end_ms,
+                                             segment.speaker)
+
+        for doc, context in self.nlp.pipe(items(), as_tuples=True, batch_size=self.batch_size,
+                                          n_process=self.n_process):
+            meeting_index, start_ms, end_ms, speaker = context
+            result = results[meeting_index]
+            dates = []
+            for ent in doc.ents:
+                if ent.label_ in DATE_LABELS:
+                    dates.append(ent.text)
+                    result['dates'].append({'text': ent.text, 'label': ent.label_, 'start_ms': start_ms})
+                elif ent.label_ in ENTITY_LABELS:
+                    entity_counts[meeting_index][(ent.text, ent.label_)] += 1
+
+            keyword_counts[meeting_index].update(
+                token.lemma_.lower() for token in doc
+                if token.pos_ in ("NOUN", "PROPN") and token.is_alpha
+                and not token.is_stop and len(token.text) > 2
+            )
+
+            if ACTION_PATTERN.search(doc.text) and any(token.pos_ == "VERB" for token in doc):
+                owners = [ent.text for ent in doc.ents if ent.label_ == "PERSON"]
+                result['action_items'].append({
+                    'text': doc.text,
+                    'start_ms': start_ms,
+                    'end_ms': end_ms,
+                    'owner': owners[0] if owners else speaker,
+                    'due': dates[0] if dates else None
+                })
+
+        for result, keywords, entities in zip(results, keyword_counts, entity_counts):
+            result['keywords'] = [{'keyword': keyword, 'count': count}
+                                  for keyword, count in keywords.most_common(self.top_keywords)]
+            result['entities'] = [{'text': text, 'label': label, 'count': count}
+                                  for (text, label), count in entities.most_common()]
+        return results
+
+    def _empty_result(self):
+        return {'action_items': [], 'entities': [], 'dates': [], 'keywords': []}
+
+
+def analyze_archive(paths, file_manager, n_process=1, meetings_per_pass=50):
+    """Analyze saved transcriptions and store the result in their JSON files.
+
+    Non-JSON transcriptions are analyzed and returned but not modified.
+    Returns {path: analysis}.
+    """
+    analyzer = MeetingAnalyzer(n_process=n_process)
+    analyses = {}
+    for start in range(0, len(paths), meetings_per_pass):
+        batch = paths[start:start + meetings_per_pass]
+        results = analyzer.analyze_many([file_manager.load_segments(path) for path in batch])
+        for path, analysis in zip(batch, results):
+            analyses[path] = analysis
+            if path.endswith('.json'):
+                file_manager.update_transcription_json(path, analysis=analysis)
+    return analyses
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+    from file_manager import FileManager
+
+    parser = argparse.ArgumentParser(description="Extract action items and keywords from saved transcriptions")
+    parser.add_argument("paths", nargs="+", help="Transcription files (.json, .txt or .smtc)")
+    parser.add_argument("--processes", type=int, default=1, help="Worker processes for spaCy")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    results = analyze_archive(args.paths, FileManager(), n_process=args.processes)
+    for path, analysis in results.items():
+        print(f"\n{path}")
+        for item in analysis['action_items']:
+            print(f"  • {item['text']}" + (f" (owner: {item['owner']})" if item['owner'] else ""))
+        print("  Keywords: " + ", ".join(k['keyword'] for k in analysis['keywords']))
+    print(f"\nAnalyzed {len(results)} meeting(s) in {time.perf_counter() - started:.1f} s")
@@ -0,0 +1,161 @@
+import json
+import os
+import threading
+import wave
+from collections import OrderedDict
+
+import numpy as np
+
+from pipeline_metrics import metrics
+from structured_logging import get_logger
+
+log = get_logger("models")
+
+POOL_MB = metrics.gauge("model_pool_mb", "Estimated memory of the loaded offline models")
+EVICTIONS = metrics.counter("model_pool_evictions_total", "Offline models unloaded to stay within the memory budget")
+
+
+def parse_model_paths(value):
+    """Parse VOSK_MODELS, e.g. "en=/models/vosk-en,fr=/models/vosk-fr", into {language: path}"""
+    paths = {}
+    for entry in (value or "").split(","):
+        language, _, path = entry.partition("=")
+        if language.strip() and path.strip():
+            paths[language.strip()] = path.strip()
+    return paths
+
+
+def model_size_mb(path):
+    """Size of a model directory; Vosk keeps roughly its files in memory"""
+    total = 0
+    for folder, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(folder, name)) for name in files)
+    return total / (1024 * 1024)
+
+
+def _load_vosk_model(path):
+    import vosk
+    vosk.SetLogLevel(-1)
+    return vosk.Model(path)
+
+
+class ModelPool:
+    """Warm offline models per language, least recently used first out.
+
+    paths maps language codes to model directories; default_path serves
+    the languages without one of their own. Models are loaded on first
+    use (or by warm_up) and kept while their estimated size fits in
+    budget_mb; loading another one unloads the least recently used once
+    it has loaded, so a failed load keeps the working models. A model
+    that does not load is remembered as missing, so a bad path costs one
+    attempt per session instead of one per chunk.
+    """
+
+    def __init__(self, paths, default_path=None, budget_mb=2048, loader=None, size_of=None):
+        self.paths = dict(paths)
+        self.default_path = default_path
+        self.budget_mb = budget_mb
+        self.loader = loader or _load_vosk_model
+        self.size_of = size_of or model_size_mb
+        self.models = OrderedDict()  # path -> (model, size_mb), least recently used first
+        self.failed = set()
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_environment(cls):
+        """Pool for VOSK_MODELS, with VOSK_MODEL as the model of every other language"""
+        budget_mb = float(os.environ.get("VOSK_MODEL_BUDGET_MB", 2048))
+        return cls(parse_model_paths(os.environ.get("VOSK_MODELS")), os.environ.get("VOSK_MODEL"), budget_mb)
+
+    def languages(self):
+        """Languages with a model of their own"""
+        return list(self.paths)
+
+    def path_for(self, language):
+        return self.paths.get(language, self.default_path)
+
+    def get(self, language, evict=True):
+        """The loaded model for language, or None when there is none.
+
+        With evict=False a model is only loaded if it fits next to the
+        loaded ones, e.g. to try languages without reloading models.
+        """
+        path = self.path_for(language)
+        if not path:
+            return None
+        with self.lock:
+            if path in self.models:
+                self.models.move_to_end(path)
+                return self.models[path][0]
+            if path in self.failed:
+                return None
+            if not evict and self.size_of(path) + self.loaded_mb() > self.budget_mb:
+                return None
+            return self._load(language, path)
+
+    def warm_up(self, languages=None):
+        """Load the models of the given (default: all configured) languages that fit the budget"""
+        for language in languages or self.languages():
+            path = self.path_for(language)
+            with self.lock:
+                if not path or path in self.models or path in self.failed:
+                    continue
+                if self.size_of(path) + self.loaded_mb() > self.budget_mb:
+                    log.info("Model not preloaded, over the memory budget", extra={'language': language})
+                    continue
+                self._load(language, path)
+
+    def loaded_mb(self):
+        return sum(size for _, size in self.models.values())
+
+    def _load(self, language, path):
+        try:
+            size = self.size_of(path)
+            with metrics.time("model_load_seconds", "Time to load an offline model", language=language):
+                model = self.loader(path)
+        except Exception as e:
+            self.failed.add(path)
+            log.warning("Could not load model", extra={'language': language, 'path': path, 'error': str(e)})
+            return None
+        while self.models and self.loaded_mb() + size > self.budget_mb:
+            evicted, _ = self.models.popitem(last=False)
+            EVICTIONS.inc()
+            log.info("Unloaded model", extra={'path': evicted})
+        self.models[path] = (model, size)
+        POOL_MB.set(self.loaded_mb())
+        log.info("Loaded model", extra={'language': language, 'path': path, 'size_mb': round(size)})
+        return model
+
+
+def read_pcm16(audio_file_path):
+    """Mono 16-bit PCM bytes and the rate of a WAV chunk"""
+    with wave.open(audio_file_path, 'rb') as wf:
+        rate, channels = wf.getframerate(), wf.getnchannels()
+        samples = np.frombuffer(wf.readframes(wf.getnframes()), dtype='<i2')
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1).astype('<i2')
+    return samples.tobytes(), rate
+
+
+def score_languages(pool, data, rate, languages):
+    """Recognize mono 16-bit PCM audio with each language's model and score the result.
+
+    The score is the summed word confidence: the model of the spoken
+    language recognizes more words, and with more confidence, than the
+    others. Only models that fit in the pool's budget next to the loaded
+    ones take part, so identification does not reload models chunk after
+    chunk. Returns {language: score} for the languages scored.
+    """
+    import vosk
+
+    scores = {}
+    for language in languages:
+        model = pool.get(language, evict=False)
+        if model is None:
+            continue
+        recognizer = vosk.KaldiRecognizer(model, rate)
+        recognizer.SetWords(True)
+        recognizer.AcceptWaveform(data)
+        words = json.loads(recognizer.FinalResult()).get('result') or []
+        scores[language] = sum(word.get('conf', 0.0) for word in words)
+    return scores
@@ -0,0 +1,275 @@
+import json
+import threading
+from time import perf_counter
+
+# Histogram resolution: 2**PRECISION_BITS buckets per power of two, i.e.
+# about 3% relative error, over microsecond values from 1 us to hours
+PRECISION_BITS = 5
+SUB_BUCKETS = 1 << PRECISION_BITS
+QUANTILES = (0.5, 0.9, 0.95, 0.99)
+
+
+class Counter:
+    """Monotonically increasing count"""
+
+    def __init__(self):
+        self.value = 0
+        self.lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self.lock:
+            self.value += amount
+
+    def reset(self):
+        self.value = 0
+
+    def snapshot(self):
+        return self.value
+
+
+class Gauge:
+    """Value that can go up and down, e.g. a queue depth"""
+
+    def __init__(self):
+        self.value = 0
+
+    def set(self, value):
+        self.value = value
+
+    def reset(self):
+        self.value = 0
+
+    def snapshot(self):
+        return self.value
+
+
+class Histogram:
+    """HDR-style histogram of durations in seconds.
+
+    Values are kept as integer microseconds in log-linear buckets: linear
+    below 32 us, then 32 buckets per power of two. Recording is one bit
+    length, one shift and a dict update, memory is bounded by the range of
+    values seen, and any quantile is read back within about 3%.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.buckets = {}
+            self.count = 0
+            self.sum = 0.0
+            self.min = None
+            self.max = None
+
+    def observe(self, seconds):
+        value = max(int(seconds * 1e6), 0)
+        shift = max(value.bit_length() - PRECISION_BITS - 1, 0)
+        index = (shift << PRECISION_BITS) + (value >> shift)
+        with self.lock:
+            self.buckets[index] = self.buckets.get(index, 0) + 1
+            self.count += 1
+            self.sum += seconds
+            if self.min is None or seconds < self.min:
+                self.min = seconds
+            if self.max is None or seconds > self.max:
+                self.max = seconds
+
+    def time(self):
+        """Context manager observing the duration of its block"""
+        return _Timer(self)
+
+    def quantile(self, q):
+        """Approximate q-quantile in seconds, or None when empty"""
+        with self.lock:
+            if not self.count:
+                return None
+            rank = q * self.count
+            seen = 0
+            for index in sorted(self.buckets):
+                seen += self.buckets[index]
+                if seen >= rank:
+                    break
+            maximum = self.max
+        shift = max((index >> PRECISION_BITS) - 1, 0) if index >= 2 * SUB_BUCKETS else 0
+        top = index - (shift << PRECISION_BITS)
+        middle = ((top << shift) + ((top + 1) << shift)) / 2 / 1e6
+        return min(middle, maximum)
+
+    def snapshot(self):
+        result = {'count': self.count, 'sum': self.sum, 'min': self.min, 'max': self.max}
+        for q in QUANTILES:
+            result[f"p{int(q * 100)}"] = self.quantile(q)
+        return result
+
+
+class _Timer:
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.started = perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.elapsed = perf_counter() - self.started
+        self.histogram.observe(self.elapsed)
+        return False
+
+
+class MetricsRegistry:
+    """Named counters, gauges and histograms with optional labels.
+
+    Metrics are created on first use and looked up by name and labels, so
+    hot paths should keep the returned object rather than look it up per
+    call. Everything can be exported as JSON, as Prometheus text format or
+    served over HTTP.
+    """
+
+    TYPES = {'counter': Counter, 'gauge': Gauge, 'histogram': Histogram}
+
+    def __init__(self, prefix=""):
+        self.prefix = prefix
+        self.families = {}  # name -> [type, help, {labels: metric}]
+        self.lock = threading.Lock()
+
+    def counter(self, name, help="", **labels):
+        return self._get('counter', name, help, labels)
+
+    def gauge(self, name, help="", **labels):
+        return self._get('gauge', name, help, labels)
+
+    def histogram(self, name, help="", **labels):
+        return self._get('histogram', name, help, labels)
+
+    def time(self, name, help="", **labels):
+        """Context manager observing a block's duration in histogram `name`"""
+        return self.histogram(name, help, **labels).time()
+
+    def _get(self, kind, name, help, labels):
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            family = self.families.setdefault(name, [kind, help, {}])
+            if family[0] != kind:
+                raise ValueError(f"Metric {name} is a {family[0]}, not a {kind}")
+            if help and not family[1]:
+                family[1] = help
+            if key not in family[2]:
+                family[2][key] = self.TYPES[kind]()
+            return family[2][key]
+
+    def reset(self):
+        """Zero every metric; objects held by instrumented code stay registered"""
+        with self.lock:
+            metrics = [metric for family in self.families.values() for metric in family[2].values()]
+        for metric in metrics:
+            metric.reset()
+
+    def snapshot(self):
+        """Return {name: {'type', 'help', 'values': [{'labels', 'value'}]}}"""
+        with self.lock:
+            families = {name: (kind, help, dict(metrics))
+                        for name, (kind, help, metrics) in self.families.items()}
+        return {
+            name: {
+                'type': kind,
+                'help': help,
+                'values': [{'labels': dict(key), 'value': metric.snapshot()}
+                           for key, metric in metrics.items()]
+            }
+            for name, (kind, help, metrics) in sorted(families.items())
+        }
+
+    def to_json(self, indent=None):
+        return json.dumps(self.snapshot(), indent=indent)
+
+    def to_prometheus(self):
+        """Render the metrics in the Prometheus text exposition format.
+
+        Histograms are exported as summaries (quantiles, _sum and _count).
+        """
+        lines = []
+        for name, family in self.snapshot().items():
+            full_name = self.prefix + name
+            kind = 'summary' if family['type'] == 'histogram' else family['type']
+            if family['help']:
+                help_text = family['help'].replace("\\", "\\\\").replace("\n", "\\n")
+                lines.append(f"# HELP {full_name} {help_text}")
+            lines.append(f"# TYPE {full_name} {kind}")
+            for entry in family['values']:
+                labels, value = entry['labels'], entry['value']
+                if kind != 'summary':
+                    lines.append(f"{full_name}{_format_labels(labels)} {value}")
+                    continue
+                for q in QUANTILES:
+                    quantile = value[f"p{int(q * 100)}"]
+                    if quantile is not None:
+                        lines.append(f"{full_name}{_format_labels(labels, quantile=q)} {quantile:.6f}")
+                lines.append(f"{full_name}_sum{_format_labels(labels)} {value['sum']:.6f}")
+                lines.append(f"{full_name}_count{_format_labels(labels)} {value['count']}")
+        return "\n".join(lines) + "\n"
+
+    def format_text(self):
+        """Human-readable one line per metric, for debug panels"""
+        lines = []
+        for name, family in self.snapshot().items():
+            for entry in family['values']:
+                label = name + _format_labels(entry['labels'])
+                value = entry['value']
+                if family['type'] != 'histogram':
+                    lines.append(f"{label}: {value:g}" if isinstance(value, float) else f"{label}: {value}")
+                elif value['count']:
+                    lines.append(f"{label}: n={value['count']} p50={value['p50'] * 1000:.1f} ms "
+                                 f"p95={value['p95'] * 1000:.1f} ms p99={value['p99'] * 1000:.1f} ms "
+                                 f"max={value['max'] * 1000:.1f} ms")
+        return "\n".join(lines)
+
+    def serve(self, port=9464, host="127.0.0.1"):
+        """Serve /metrics (Prometheus) and /metrics.json from a daemon thread.
+
+        Returns the server; call shutdown() on it to stop.
+        """
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        registry = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/metrics":
+                    body, content_type = registry.to_prometheus(), "text/plain; version=0.0.4"
+                elif self.path == "/metrics.json":
+                    body, content_type = registry.to_json(), "application/json"
+                else:
+                    self.send_error(404)
+                    return
+                data = body.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass  # Scrapes would flood the console
+
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+def _format_labels(labels, **extra):
+    labels = {**labels, **extra}
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape_label(value)}"' for key, value in labels.items()) + "}"
+
+
+def _escape_label(value):
+    """Escape a label value as the text exposition format requires"""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# Registry shared by the recorder, transcription service and UI
+metrics = MetricsRegistry(prefix="meeting_assistant_")
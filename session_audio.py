@@ -0,0 +1,173 @@
+import mmap
+import os
+import queue
+import struct
+import threading
+import wave
+
+import numpy as np
+
+from structured_logging import get_logger
+
+log = get_logger("session_audio")
+
+RECORDINGS_DIR = os.path.join(os.path.dirname(__file__), "recordings")
+
+
+def prune_recordings(directory, keep):
+    """Delete all but the newest keep session WAVs in directory; returns the count deleted"""
+    try:
+        names = [name for name in os.listdir(directory) if name.startswith("session_") and name.endswith(".wav")]
+    except FileNotFoundError:
+        return 0
+    paths = sorted((os.path.join(directory, name) for name in names), key=os.path.getmtime)
+    deleted = 0
+    for path in paths[:max(len(paths) - keep, 0)]:
+        try:
+            os.remove(path)
+            deleted += 1
+        except OSError as e:
+            log.warning("Could not delete old recording", extra={'path': path, 'error': str(e)})
+    if deleted:
+        log.info("Deleted old recordings", extra={'count': deleted, 'kept': keep})
+    return deleted
+
+
+class SessionAudioWriter:
+    """Archives a recording to a 16-bit PCM WAV file from a capture tap.
+
+    Runs on its own thread so the capture callback never waits for the
+    disk. Blocks are written in capture order with nothing dropped, so a
+    sample's position in the file is its position on the recording
+    timeline and transcript offsets point straight into the archive.
+    """
+
+    def __init__(self, filename, rate, tap):
+        self.filename = filename
+        self.rate = rate
+        self.tap = tap
+        self.stopping = threading.Event()
+        self.samples_written = 0
+        self.thread = threading.Thread(target=self._run, name="session-audio", daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        wf = None
+        try:
+            while not (self.stopping.is_set() and self.tap.empty()):
+                try:
+                    block = self.tap.get(timeout=0.25)
+                except queue.Empty:
+                    continue
+                if wf is None:
+                    # The channel count is known from the first block
+                    wf = wave.open(self.filename, 'wb')
+                    wf.setnchannels(block.shape[1] if block.ndim == 2 else 1)
+                    wf.setsampwidth(2)
+                    wf.setframerate(self.rate)
+                wf.writeframes(np.clip(block * 32767, -32767, 32767).astype('<i2').tobytes())
+                self.samples_written += len(block)
+        except Exception as e:
+            log.error("Could not archive session audio", extra={'path': self.filename, 'error': str(e)})
+        finally:
+            if wf is not None:
+                wf.close()
+
+    def close(self):
+        """Write the blocks still queued and finish the file"""
+        self.stopping.set()
+        self.thread.join()
+        log.info("Archived session audio", extra={'path': self.filename,
+                                                  'seconds': round(self.samples_written / self.rate, 1)})
+
+
+class SessionAudio:
+    """Read-only, memory-mapped view of an archived session WAV.
+
+    Only the pages of the requested time range are read from disk, so
+    memory use does not grow with the length of the recording. view()
+    returns int16 NumPy views into the mapping without copying; they stay
+    valid until close(). A file whose header was not finalized (e.g. after
+    a crash) is read up to the end of its data.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.file = open(filename, 'rb')
+        try:
+            self.channels, self.rate, self.data_offset, size = self._read_header()
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self.file.close()
+            raise
+        frame_bytes = 2 * self.channels
+        size = min(size, len(self.map) - self.data_offset) // frame_bytes * frame_bytes
+        self.samples = np.frombuffer(self.map, dtype='<i2', count=size // 2,
+                                     offset=self.data_offset).reshape(-1, self.channels)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _read_header(self):
+        """Find the fmt and data chunks; returns (channels, rate, data offset, data size)"""
+        riff, _, form = struct.unpack("<4sI4s", self.file.read(12))
+        if riff != b"RIFF" or form != b"WAVE":
+            raise ValueError(f"{self.filename} is not a WAV file")
+        channels = rate = None
+        while True:
+            header = self.file.read(8)
+            if len(header) < 8:
+                raise ValueError(f"{self.filename} has no audio data")
+            chunk_id, size = struct.unpack("<4sI", header)
+            if chunk_id == b"fmt ":
+                audio_format, channels, rate, _, _, bits = struct.unpack("<HHIIHH", self.file.read(16))
+                if audio_format != 1 or bits != 16:
+                    raise ValueError(f"{self.filename} is not 16-bit PCM")
+                self.file.seek(size - 16 + size % 2, os.SEEK_CUR)
+            elif chunk_id == b"data":
+                if channels is None:
+                    raise ValueError(f"{self.filename} has no format chunk")
+                return channels, rate, self.file.tell(), size
+            else:
+                self.file.seek(size + size % 2, os.SEEK_CUR)
+
+    @property
+    def duration_ms(self):
+        return len(self.samples) * 1000 // self.rate
+
+    def frame_at(self, ms):
+        """Index of the sample frame at ms, clamped to the recording"""
+        return min(max(ms * self.rate // 1000, 0), len(self.samples))
+
+    def byte_offset(self, ms):
+        """Position of ms in the file, e.g. for an alignment index or a player"""
+        return self.data_offset + self.frame_at(ms) * 2 * self.channels
+
+    def view(self, start_ms, end_ms):
+        """int16 (frames, channels) view of the range, without copying"""
+        return self.samples[self.frame_at(start_ms):self.frame_at(end_ms)]
+
+    def read(self, start_ms, end_ms):
+        """float32 copy of the range, scaled like the capture engine's blocks"""
+        return self.view(start_ms, end_ms).astype(np.float32) / 32767
+
+    def export_clip(self, start_ms, end_ms, filename):
+        """Write the range to a WAV file, e.g. to re-recognize or share it"""
+        clip = self.view(start_ms, end_ms)
+        with wave.open(filename, 'wb') as wf:
+            wf.setnchannels(self.channels)
+            wf.setsampwidth(2)
+            wf.setframerate(self.rate)
+            wf.writeframes(memoryview(clip).cast('B'))
+        return filename
+
+    def close(self):
+        self.samples = None
+        try:
+            self.map.close()
+        except BufferError:
+            pass  # A view is still in use; the mapping is released with it
+        self.file.close()
@@ -0,0 +1,40 @@
+import numpy as np
+
+
+class SilenceGate:
+    """Decides from block energies whether a chunk is worth recognizing.
+
+    The noise floor follows the quietest block seen: it drops to a quieter
+    block at once and rises by `rise` per chunk otherwise, so it adapts to
+    a louder room within seconds. A chunk is silent when even its loudest
+    block stays below ratio times the floor; the threshold is kept between
+    min_rms (digital silence) and max_rms (so a noisy floor cannot mute
+    speech).
+    """
+
+    def __init__(self, ratio=3.0, min_rms=0.003, max_rms=0.03, rise=0.05):
+        self.ratio = ratio
+        self.min_rms = min_rms
+        self.max_rms = max_rms
+        self.rise = rise
+        self.floor = None
+
+    @property
+    def threshold(self):
+        if self.floor is None:
+            return self.min_rms
+        return min(max(self.floor * self.ratio, self.min_rms), self.max_rms)
+
+    def is_silent(self, block_rms):
+        """Update the floor with a chunk's per-block RMS levels and judge the chunk"""
+        quietest = float(np.min(block_rms))
+        if self.floor is None or quietest < self.floor:
+            self.floor = quietest
+        else:
+            self.floor *= 1 + self.rise
+        return float(np.max(block_rms)) < self.threshold
+
+
+def block_rms(blocks):
+    """RMS level of each block, without concatenating them"""
+    return np.sqrt([np.vdot(block, block) / block.size for block in blocks])
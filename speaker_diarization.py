@@ -0,0 +1,223 @@
+import threading
+import wave
+
+import numpy as np
+
+
+class MFCCExtractor:
+    """Vectorized MFCC features for one sample rate.
+
+    The analysis window, mel filterbank and DCT matrix are computed once;
+    each call frames the signal with a strided view and runs one batched
+    FFT and two matrix products.
+    """
+
+    def __init__(self, rate, window_ms=25, hop_ms=10, n_mels=26, n_mfcc=13):
+        self.rate = rate
+        self.window = int(rate * window_ms / 1000)
+        self.hop = int(rate * hop_ms / 1000)
+        self.n_fft = 1 << (self.window - 1).bit_length()
+        self.hamming = np.hamming(self.window).astype(np.float32)
+        self.filterbank = self._mel_filterbank(n_mels).astype(np.float32)
+        # Orthonormal DCT-II basis, without the energy coefficient c0
+        n = np.arange(n_mels)
+        k = np.arange(1, n_mfcc)[:, None]
+        self.dct = (np.cos(np.pi * k * (2 * n + 1) / (2 * n_mels)) * np.sqrt(2 / n_mels)).astype(np.float32)
+
+    def __call__(self, samples):
+        """Return an (n_frames, n_mfcc - 1) array of MFCCs for mono float samples"""
+        if len(samples) < self.window:
+            return np.empty((0, self.dct.shape[0]), dtype=np.float32)
+        frames = np.lib.stride_tricks.sliding_window_view(samples, self.window)[::self.hop]
+        spectrum = np.fft.rfft(frames * self.hamming, self.n_fft)
+        power = spectrum.real ** 2 + spectrum.imag ** 2
+        mel = np.log(power @ self.filterbank.T + 1e-10)
+        return mel @ self.dct.T
+
+    def _mel_filterbank(self, n_mels):
+        def to_mel(hz):
+            return 2595 * np.log10(1 + hz / 700)
+
+        def to_hz(mel):
+            return 700 * (10 ** (mel / 2595) - 1)
+
+        upper = min(self.rate / 2, 8000)  # Speech energy is below 8 kHz
+        points = to_hz(np.linspace(to_mel(60), to_mel(upper), n_mels + 2))
+        bins = np.fft.rfftfreq(self.n_fft, 1 / self.rate)
+        lower, centre, upper = points[:-2, None], points[1:-1, None], points[2:, None]
+        rising = (bins - lower) / (centre - lower)
+        falling = (upper - bins) / (upper - centre)
+        return np.maximum(0, np.minimum(rising, falling))
+
+
+class SpeakerDiarizer:
+    """Label segments with speakers by clustering acoustic embeddings online.
+
+    Each segment is reduced to the mean and standard deviation of its
+    MFCCs. Embeddings are standardized with running statistics and compared
+    by cosine similarity with the speaker centroids found so far. A segment
+    joins the closest speaker when the similarity exceeds ``threshold``;
+    otherwise it starts a new speaker, up to ``max_speakers``. Centroids are
+    running means, and speakers that turn out alike are merged, so every
+    segment costs the same however long the session is.
+    """
+
+    def __init__(self, threshold=0.55, max_speakers=8, min_rms=0.005):
+        self.threshold = threshold
+        self.max_speakers = max_speakers
+        self.min_rms = min_rms
+        self.extractors = {}
+        self.centroids = []
+        self.counts = []
+        self.speaker_numbers = []  # Label number of each centroid
+        self.next_speaker = 0
+        # Welford running mean/variance of the raw embeddings
+        self.seen = 0
+        self.mean = None
+        self.m2 = None
+        self.lock = threading.Lock()  # Tracks may be labeled from several threads
+
+    @property
+    def participants(self):
+        """Speaker labels found so far"""
+        with self.lock:
+            return [self._label(number) for number in self.speaker_numbers]
+
+    def label_samples(self, samples, rate):
+        """Return the speaker label for a block of audio, or None for silence"""
+        samples = np.asarray(samples, dtype=np.float32)
+        if samples.ndim == 2:
+            samples = samples.mean(axis=1)
+        if samples.size == 0 or np.sqrt(np.mean(samples * samples)) < self.min_rms:
+            return None
+        features = self._extractor(rate)(samples)
+        if len(features) < 10:
+            return None
+        embedding = np.concatenate([features.mean(axis=0), features.std(axis=0)])
+        with self.lock:
+            return self._label(self._assign(embedding))
+
+    def label_file(self, filename):
+        """Return the speaker label for a 16-bit PCM WAV file"""
+        samples, rate = read_wav(filename)
+        return self.label_samples(samples, rate)
+
+    def label_segment(self, segment, samples, rate):
+        """Set segment.speaker from its audio and return the segment"""
+        segment.speaker = self.label_samples(samples, rate) or segment.speaker
+        return segment
+
+    def _extractor(self, rate):
+        if rate not in self.extractors:
+            self.extractors[rate] = MFCCExtractor(rate)
+        return self.extractors[rate]
+
+    def _assign(self, embedding):
+        """Add an embedding to the closest or a new speaker; returns the speaker number"""
+        self._update_stats(embedding)
+        best = None
+        if self.centroids:
+            similarity = self._similarity(np.array(self.centroids), embedding)
+            best = int(np.argmax(similarity))
+            if similarity[best] < self.threshold and len(self.centroids) < self.max_speakers:
+                best = None
+
+        if best is None:
+            self.centroids.append(embedding.astype(np.float64))
+            self.counts.append(1)
+            self.speaker_numbers.append(self.next_speaker)
+            self.next_speaker += 1
+            best = len(self.centroids) - 1
+        else:
+            self.counts[best] += 1
+            self.centroids[best] += (embedding - self.centroids[best]) / self.counts[best]
+
+        speaker = self.speaker_numbers[best]
+        merged = self._merge_close_speakers()
+        while speaker in merged:
+            speaker = merged[speaker]
+        return speaker
+
+    def _similarity(self, centroids, embedding):
+        """Cosine similarity between raw centroids and an embedding.
+
+        Both are standardized with the current statistics, so early
+        speakers are not judged on stale scaling.
+        """
+        scale = np.sqrt(self.m2 / max(self.seen - 1, 1)) + 1e-6
+        normalized = (embedding - self.mean) / scale
+        centroids = (centroids - self.mean) / scale
+        norms = np.linalg.norm(centroids, axis=1) * np.linalg.norm(normalized) + 1e-9
+        return centroids @ normalized / norms
+
+    def _merge_close_speakers(self):
+        """Merge speakers that became similar once the statistics settled.
+
+        Early on the running statistics rest on a handful of segments, so
+        one person can be split in two. The newer speaker is folded into
+        the older one; returns {merged speaker number: surviving number}.
+        """
+        merged = {}
+        index = len(self.centroids) - 1
+        while index > 0:
+            similarity = self._similarity(np.array(self.centroids[:index]), self.centroids[index])
+            best = int(np.argmax(similarity))
+            if similarity[best] >= self.threshold:
+                total = self.counts[best] + self.counts[index]
+                self.centroids[best] = (self.centroids[best] * self.counts[best] +
+                                        self.centroids[index] * self.counts[index]) / total
+                self.counts[best] = total
+                merged[self.speaker_numbers[index]] = self.speaker_numbers[best]
+                del self.centroids[index], self.counts[index], self.speaker_numbers[index]
+            index -= 1
+        return merged
+
+    def _update_stats(self, embedding):
+        self.seen += 1
+        if self.mean is None:
+            self.mean = embedding.astype(np.float64)
+            self.m2 = np.zeros_like(self.mean)
+            return
+        delta = embedding - self.mean
+        self.mean += delta / self.seen
+        self.m2 += delta * (embedding - self.mean)
+
+    def _label(self, number):
+        return f"Speaker {number + 1}"
+
+
+def read_wav(filename):
+    """Read a 16-bit PCM WAV file as float32 samples in [-1, 1] and its rate"""
+    with wave.open(filename, 'rb') as wf:
+        rate = wf.getframerate()
+        channels = wf.getnchannels()
+        data = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+    samples = data.astype(np.float32) / 32768.0
+    if channels > 1:
+        samples = samples.reshape(-1, channels)
+    return samples, rate
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+    from transcript_segment import format_offset
+
+    if len(sys.argv) != 2:
+        print("Usage: python speaker_diarization.py <recording.wav>")
+        sys.exit(1)
+
+    samples, rate = read_wav(sys.argv[1])
+    window = int(rate * 1.5)
+    diarizer = SpeakerDiarizer()
+    started = time.perf_counter()
+    timeline = []
+    for start in range(0, len(samples), window):
+        timeline.append((start * 1000 // rate, diarizer.label_samples(samples[start:start + window], rate)))
+    elapsed = time.perf_counter() - started
+
+    for start_ms, label in timeline:
+        print(f"[{format_offset(start_ms)}] {label or '(silence)'}")
+    audio_seconds = len(samples) / rate
+    print(f"\n{len(diarizer.participants)} speaker(s); processed {audio_seconds:.1f} s of audio in "
+          f"{elapsed:.2f} s (real-time factor {elapsed / audio_seconds:.3f})")
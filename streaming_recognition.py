@@ -0,0 +1,138 @@
+import json
+import queue
+
+import numpy as np
+
+from pipeline_metrics import metrics
+from structured_logging import get_logger
+from transcript_segment import TranscriptSegment, samples_to_ms
+
+log = get_logger("streaming")
+
+INTERIM_HYPOTHESES = metrics.counter("interim_hypotheses_total", "Changed interim hypotheses from streaming recognition")
+FINAL_SEGMENTS = metrics.counter("streaming_segments_total", "Segments finalized by streaming recognition")
+
+
+class VoskStreamingRecognizer:
+    """Incremental recognition with Vosk.
+
+    Audio is fed block by block as it is captured. While a phrase is
+    spoken, accept() returns ("partial", text) whenever the interim
+    hypothesis changes; when Vosk detects the end of the phrase it
+    returns ("final", segment) with the segment's offsets taken from the
+    word timings. Vosk resamples to the model's rate itself.
+    """
+
+    def __init__(self, model, rate, clean_text=None):
+        import vosk
+
+        self.rate = rate
+        self.clean_text = clean_text or (lambda text: text.strip())
+        self.recognizer = vosk.KaldiRecognizer(model, rate)
+        self.recognizer.SetWords(True)
+        self.samples_fed = 0
+        self.phrase_start = 0  # Samples fed when the current phrase began
+        self.last_partial = ""
+
+    def accept(self, block):
+        """Feed a float32 block; returns ("partial", text), ("final", segment) or None"""
+        if block.ndim == 2:
+            block = block.mean(axis=1)
+        self.samples_fed += len(block)
+        data = np.clip(block * 32767, -32767, 32767).astype('<i2').tobytes()
+        if self.recognizer.AcceptWaveform(data):
+            return self._final(self.recognizer.Result())
+        partial = json.loads(self.recognizer.PartialResult()).get('partial', '')
+        if partial == self.last_partial:
+            return None
+        self.last_partial = partial
+        INTERIM_HYPOTHESES.inc()
+        return "partial", partial
+
+    def finish(self):
+        """Flush the phrase in progress at the end of the audio"""
+        return self._final(self.recognizer.FinalResult())
+
+    def _final(self, result):
+        result = json.loads(result)
+        words = result.get('result') or []
+        if words:
+            start_ms, end_ms = int(words[0]['start'] * 1000), int(words[-1]['end'] * 1000)
+        else:
+            start_ms, end_ms = samples_to_ms(self.phrase_start, self.rate), samples_to_ms(self.samples_fed, self.rate)
+        self.phrase_start = self.samples_fed
+        self.last_partial = ""
+        text = self.clean_text(result.get('text', ''))
+        if not text:
+            return "final", None
+        FINAL_SEGMENTS.inc()
+        # Word timings, e.g. for the alignment index
+        words = [{'word': word['word'], 'start_ms': int(word['start'] * 1000), 'end_ms': int(word['end'] * 1000)}
+                 for word in words]
+        return "final", TranscriptSegment(text, start_ms, end_ms, words=words)
+
+
+def identify_streaming_language(tap, recorder, service, until=None, window_seconds=3.0, max_seconds=30.0,
+                                idle_timeout=0.25):
+    """Identify the language in "auto" mode from the first blocks of a tap.
+
+    Blocks are scored by service.identify_samples in windows of
+    window_seconds until the service has identified the language, the
+    recording stops or max_seconds have been heard (the recognizer then
+    takes the best language so far). Returns the blocks read, to be
+    recognized first: pass them to stream_transcripts as lead_in.
+    """
+    blocks, window = [], []
+    frames = window_frames = 0
+    while service.needs_identification() and frames < max_seconds * recorder.rate:
+        if not recorder.recording or (until and until()):
+            break
+        try:
+            block = tap.get(timeout=idle_timeout)
+        except queue.Empty:
+            if recorder.source_finished():
+                break
+            continue
+        blocks.append(block)
+        window.append(block)
+        frames += len(block)
+        window_frames += len(block)
+        if window_frames >= window_seconds * recorder.rate:
+            service.identify_samples(np.concatenate(window), recorder.rate)
+            window, window_frames = [], 0
+    return blocks
+
+
+def stream_transcripts(tap, recorder, recognizer, until=None, idle_timeout=0.25, lead_in=()):
+    """Yield ("partial", text) and ("final", segment or None) while the recorder captures.
+
+    tap is a queue from recorder.open_tap(), opened before the recording
+    starts so no block is missed. The lead_in blocks, already taken from
+    the tap, are recognized first. Iteration ends when the recording
+    stops, a replayed source is exhausted or until() returns true (checked
+    at least every idle_timeout seconds); the blocks still queued are
+    recognized and the last phrase is flushed.
+    """
+    for block in lead_in:
+        result = recognizer.accept(block)
+        if result:
+            yield result
+    while recorder.recording and not (until and until()):
+        try:
+            block = tap.get(timeout=idle_timeout)
+        except queue.Empty:
+            if recorder.source_finished():
+                break
+            continue
+        result = recognizer.accept(block)
+        if result:
+            yield result
+    while True:
+        try:
+            block = tap.get_nowait()
+        except queue.Empty:
+            break
+        result = recognizer.accept(block)
+        if result:
+            yield result
+    yield recognizer.finish()
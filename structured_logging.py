@@ -0,0 +1,158 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+
+LOGGER_NAME = "meeting_assistant"
+
+# Attributes every LogRecord has; anything else was passed through `extra`
+# and is written as a structured field
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "suppressed"}
+
+_setup_lock = threading.Lock()
+_listener = None
+_queue_handler = None
+
+
+class RateLimitFilter(logging.Filter):
+    """Token-bucket rate limit per message template.
+
+    Each distinct (logger, unformatted message) pair may emit ``burst``
+    records at once and ``rate`` records per second after that. Dropped
+    records are counted and the count is attached to the next record that
+    gets through as the ``suppressed`` field. CRITICAL records are never
+    dropped. Log with %-style arguments rather than f-strings so that
+    repeated messages share a template.
+    """
+
+    def __init__(self, rate=1.0, burst=5):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self.buckets = {}  # (logger, template) -> [tokens, last refill, suppressed]
+        self.lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno >= logging.CRITICAL:
+            return True
+        key = (record.name, record.msg)
+        now = time.monotonic()
+        with self.lock:
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                bucket = self.buckets[key] = [self.burst, now, 0]
+            tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if tokens < 1:
+                bucket[0] = tokens
+                bucket[2] += 1
+                return False
+            bucket[0] = tokens - 1
+            suppressed, bucket[2] = bucket[2], 0
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+
+class StructuredFormatter(logging.Formatter):
+    """Format records as `time level logger: message key=value ...` or as JSON lines"""
+
+    def __init__(self, json_output=False):
+        super().__init__(datefmt="%H:%M:%S")
+        self.json_output = json_output
+
+    def format(self, record):
+        fields = {key: value for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES}
+        if getattr(record, "suppressed", 0):
+            fields["suppressed"] = record.suppressed
+        message = record.getMessage()
+        if self.json_output:
+            entry = {'time': record.created, 'level': record.levelname, 'logger': record.name,
+                     'message': message, **fields}
+            if record.exc_info:
+                entry['exception'] = self.formatException(record.exc_info)
+            return json.dumps(entry, default=str)
+
+        line = f"{self.formatTime(record, self.datefmt)} {record.levelname:<7} {record.name}: {message}"
+        if fields:
+            line += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        if record.exc_info:
+            line += "\n" + self.formatException(record.exc_info)
+        return line
+
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records when the queue is full instead of blocking"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Keep the record as is: the listener thread does the formatting
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def setup_logging(level=None, json_output=None, filename=None, rate=1.0, burst=5, queue_size=10000):
+    """Configure the application logger once; later calls return it unchanged.
+
+    Records are filtered and queued on the calling thread and written by a
+    QueueListener thread, so logging never waits for the console or disk.
+    level and json_output default to the LOG_LEVEL and LOG_FORMAT=json
+    environment variables; filename adds a rotating log file.
+    """
+    global _listener, _queue_handler
+    logger = logging.getLogger(LOGGER_NAME)
+    with _setup_lock:
+        if _listener is not None:
+            return logger
+
+        level = level or os.environ.get("LOG_LEVEL", "INFO")
+        if json_output is None:
+            json_output = os.environ.get("LOG_FORMAT", "").lower() == "json"
+        formatter = StructuredFormatter(json_output)
+
+        handlers = [logging.StreamHandler()]
+        if filename:
+            handlers.append(logging.handlers.RotatingFileHandler(
+                filename, maxBytes=5 * 1024 * 1024, backupCount=3, encoding="utf-8"))
+        for handler in handlers:
+            handler.setFormatter(formatter)
+
+        log_queue = queue.Queue(queue_size)
+        _queue_handler = _DroppingQueueHandler(log_queue)
+        _queue_handler.addFilter(RateLimitFilter(rate, burst))
+        logger.addHandler(_queue_handler)
+        logger.setLevel(level.upper() if isinstance(level, str) else level)
+        logger.propagate = False
+
+        _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+    return logger
+
+
+def shutdown_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+            logging.getLogger(LOGGER_NAME).removeHandler(_queue_handler)
+
+
+def get_logger(name):
+    """Return the logger for a module, e.g. get_logger("transcription")"""
+    setup_logging()
+    return logging.getLogger(f"{LOGGER_NAME}.{name}")
@@ -0,0 +1,126 @@
+import math
+import textwrap
+
+SUBTITLE_FORMATS = ('srt', 'vtt')
+
+
+class SubtitleWriter:
+    """Stream timed transcript segments to an SRT or WebVTT file.
+
+    Cues are written as segments arrive, so memory use does not grow with
+    the length of the transcript. Long segments are wrapped to
+    ``max_line_length`` (including the speaker label) and split into several
+    cues when they need more than ``max_lines`` lines or last longer than
+    ``max_cue_ms``. A cue never lasts longer than ``max_cue_ms``; when a
+    segment has too few words to fill the cues its span would need, the
+    rest of the span is left without a cue.
+    """
+
+    def __init__(self, filename, fmt="srt", max_line_length=42, max_lines=2, max_cue_ms=7000):
+        if fmt not in SUBTITLE_FORMATS:
+            raise ValueError(f"Subtitle format must be one of {', '.join(SUBTITLE_FORMATS)}")
+        self.fmt = fmt
+        self.max_line_length = max_line_length
+        self.max_lines = max_lines
+        self.max_cue_ms = max_cue_ms
+        self.cue_count = 0
+        self.file = open(filename, 'w', encoding='utf-8')
+        if fmt == "vtt":
+            self.file.write("WEBVTT\n\n")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def write_segment(self, segment):
+        """Write one segment as one or more cues"""
+        for start_ms, end_ms, lines in self._split_segment(segment):
+            self._write_cue(start_ms, end_ms, lines)
+
+    def close(self):
+        """Flush and close the output file"""
+        if self.file:
+            self.file.close()
+            self.file = None
+
+    def _split_segment(self, segment):
+        """Yield (start_ms, end_ms, lines) cues for a segment"""
+        words = segment.text.split()
+        if not words:
+            return
+        duration = max(segment.end_ms - segment.start_ms, 1)
+        prefix = self._speaker_prefix(segment.speaker)
+        lines = self._wrap(" ".join(words), prefix)
+        cue_count = max(math.ceil(len(lines) / self.max_lines),
+                        math.ceil(duration / self.max_cue_ms))
+        if cue_count == 1:
+            yield segment.start_ms, segment.end_ms, lines
+            return
+
+        # Spread the words evenly by characters, never exceeding max_lines
+        # per cue, and give each cue a share of the segment duration
+        # proportional to its text
+        total_chars = sum(len(word) + 1 for word in words)
+        target = total_chars / cue_count
+        groups, current, current_chars = [], [], 0
+        for word in words:
+            if current and (current_chars >= target or
+                            len(self._wrap(" ".join(current + [word]), prefix)) > self.max_lines):
+                groups.append((current, current_chars))
+                current, current_chars = [], 0
+            current.append(word)
+            current_chars += len(word) + 1
+        groups.append((current, current_chars))
+
+        start_ms = segment.start_ms
+        consumed = 0
+        for group_words, group_chars in groups:
+            consumed += group_chars
+            end_ms = segment.start_ms + round(duration * consumed / total_chars)
+            # Few words over a long span: keep the cue within max_cue_ms
+            yield start_ms, min(end_ms, start_ms + self.max_cue_ms), self._wrap(" ".join(group_words), prefix)
+            start_ms = end_ms
+
+    def _speaker_prefix(self, speaker):
+        if not speaker:
+            return ""
+        return f"{speaker}: " if self.fmt == "srt" else f"<v {speaker}>"
+
+    def _wrap(self, text, prefix=""):
+        """Wrap text with prefix on the first line; a VTT voice tag takes no width"""
+        if prefix.startswith("<v "):
+            lines = self._wrap(text)
+            return [prefix + lines[0]] + lines[1:]
+        return textwrap.wrap(prefix + text, width=self.max_line_length, break_long_words=False) or [prefix + text]
+
+    def _write_cue(self, start_ms, end_ms, lines):
+        self.cue_count += 1
+        if self.fmt == "srt":
+            self.file.write(f"{self.cue_count}\n"
+                            f"{format_cue_time(start_ms, ',')} --> {format_cue_time(end_ms, ',')}\n")
+        else:
+            self.file.write(f"{format_cue_time(start_ms, '.')} --> {format_cue_time(end_ms, '.')}\n")
+        self.file.write("\n".join(lines))
+        self.file.write("\n\n")
+
+
+def format_cue_time(ms, separator):
+    """Format a millisecond offset as HH:MM:SS<sep>mmm"""
+    ms = max(int(ms), 0)
+    seconds, millis = divmod(ms, 1000)
+    return f"{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}{separator}{millis:03d}"
+
+
+def export_subtitles(segments, filename, fmt=None, **options):
+    """Write an iterable of segments to a subtitle file and return the cue count.
+
+    The format is taken from the file extension when not given.
+    """
+    if fmt is None:
+        fmt = filename.rsplit('.', 1)[-1].lower()
+    with SubtitleWriter(filename, fmt, **options) as writer:
+        for segment in segments:
+            writer.write_segment(segment)
+        return writer.cue_count
@@ -0,0 +1,389 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from structured_logging import get_logger
+
+log = get_logger("summarization")
+
+MODEL_NAME = "EleutherAI/gpt-neo-125M"
+QUANTIZE_MODES = (None, "int8", "onnx")
+
+SUMMARY_PROMPT = "Meeting transcript:\n{text}\n\nShort summary of the discussion:"
+MERGE_PROMPT = ("Summary of the meeting so far:\n{summary}\n\n"
+                "What was discussed next:\n{update}\n\nUpdated summary of the meeting:")
+
+
+def load_language_model(model_name=MODEL_NAME, num_threads=None, quantize=None):
+    """Load a causal language model and tokenizer tuned for CPU inference.
+
+    quantize selects the inference path: None keeps fp32 weights, "int8"
+    applies dynamic int8 quantization to the Linear layers, and "onnx"
+    exports the model to ONNX Runtime (needs the optimum[onnxruntime]
+    package). torch and transformers are imported here so that importing
+    this module stays cheap.
+    """
+    if quantize not in QUANTIZE_MODES:
+        raise ValueError(f"quantize must be one of {QUANTIZE_MODES}")
+    import torch
+    from transformers import AutoTokenizer, AutoModelForCausalLM
+
+    torch.set_num_threads(num_threads or os.cpu_count() or 1)
+    try:
+        # Generation is a chain of small ops; inter-op parallelism only adds contention
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass  # Can only be set once per process
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    if quantize == "onnx":
+        try:
+            from optimum.onnxruntime import ORTModelForCausalLM
+        except ImportError:
+            raise ImportError("ONNX inference requires: pip install optimum[onnxruntime]")
+        model = ORTModelForCausalLM.from_pretrained(model_name, export=True)
+    else:
+        model = AutoModelForCausalLM.from_pretrained(model_name)
+        model.eval()
+        if quantize == "int8":
+            # Weights stored as int8, activations quantized on the fly
+            model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    # Decoder-only models need left padding for batched generation
+    if tokenizer.pad_token is None:
+        tokenizer.pad_token = tokenizer.eos_token
+    tokenizer.padding_side = "left"
+    return tokenizer, model
+
+
+class SummarizationService:
+    """Long-lived meeting summarizer.
+
+    The model is loaded once in a worker thread and kept for the lifetime of
+    the service; requests are queued to that thread. Transcripts are
+    summarized hierarchically: segments are packed into chunks that fit the
+    context, chunks are summarized in batches, and the partial summaries are
+    summarized again until one remains. ``time_budget`` bounds the
+    generation time per request; when it runs out, the remaining chunks are
+    represented by their opening sentence instead of being generated.
+    ``quantize`` picks the inference path, see load_language_model.
+    """
+
+    def __init__(self, model_name=MODEL_NAME, num_threads=None, chunk_tokens=768,
+                 summary_tokens=60, batch_size=4, time_budget=120.0, quantize=None):
+        self.model_name = model_name
+        self.num_threads = num_threads
+        self.quantize = quantize
+        self.chunk_tokens = chunk_tokens
+        self.summary_tokens = summary_tokens
+        self.batch_size = batch_size
+        self.time_budget = time_budget
+        self.tokenizer = None
+        self.model = None
+        self.last_report = None
+        self.load_error = None  # Set by the worker when the model could not be loaded
+        self.requests = queue.Queue()
+        self.worker = threading.Thread(target=self._run, daemon=True)
+        self.worker.start()
+
+    @classmethod
+    def from_environment(cls):
+        """Service for SUMMARY_QUANTIZE: unset for fp32, "int8" or "onnx", see load_language_model"""
+        quantize = os.environ.get("SUMMARY_QUANTIZE", "").strip().lower() or None
+        if quantize not in QUANTIZE_MODES:
+            log.warning("Unknown SUMMARY_QUANTIZE, using fp32", extra={'quantize': quantize})
+            quantize = None
+        return cls(quantize=quantize)
+
+    def submit(self, segments, callback=None):
+        """Queue a summary of segments (or plain text lines) and return a Future.
+
+        The Future resolves to {'summary': str, 'report': dict}. When given,
+        callback is called with that result on the worker thread.
+        """
+        return self.run_in_worker(self._summarize, list(segments), callback=callback)
+
+    def summarize(self, segments, timeout=None):
+        """Summarize segments and wait for the result"""
+        return self.submit(segments).result(timeout)
+
+    def close(self):
+        """Stop the worker after the queued requests"""
+        self.requests.put(None)
+        self.worker.join()
+
+    def run_in_worker(self, function, *args, callback=None):
+        """Run function(*args) on the model worker, after the queued requests, and return a Future.
+
+        function may call generate(); the model is loaded when it runs.
+        """
+        future = Future()
+        if callback:
+            def notify(done):
+                if not done.cancelled() and done.exception() is None:
+                    callback(done.result())
+            future.add_done_callback(notify)
+        self.requests.put((function, args, future))
+        return future
+
+    def _run(self):
+        try:
+            self.tokenizer, self.model = load_language_model(self.model_name, self.num_threads,
+                                                             self.quantize)
+        except Exception as e:
+            log.error("Failed to load summarization model", extra={'model': self.model_name, 'error': str(e)})
+            self.load_error = e
+
+        while True:
+            request = self.requests.get()
+            if request is None:
+                break
+            function, args, future = request
+            if not future.set_running_or_notify_cancel():
+                continue
+            if self.load_error:
+                future.set_exception(self.load_error)
+                continue
+            try:
+                future.set_result(function(*args))
+            except Exception as e:
+                log.error("Summarization error", extra={'error': str(e)})
+                future.set_exception(e)
+
+    def _summarize(self, segments):
+        started = time.perf_counter()
+        deadline = started + self.time_budget
+        report = {'levels': [], 'generated_tokens': 0, 'truncated': False}
+
+        texts = [getattr(segment, 'text', segment) for segment in segments]
+        texts = [text.strip() for text in texts if text and text.strip()]
+        summary = ""
+        chunks = self._pack(texts)
+        while chunks:
+            level_started = time.perf_counter()
+            summaries = self._summarize_chunks(chunks, deadline, report)
+            report['levels'].append({
+                'chunks': len(chunks),
+                'seconds': round(time.perf_counter() - level_started, 3)
+            })
+            if len(summaries) == 1:
+                summary = summaries[0]
+                break
+            next_chunks = self._pack(summaries)
+            if len(next_chunks) >= len(chunks):
+                # Not converging (e.g. out of time budget): stop here
+                summary = " ".join(summaries)
+                break
+            chunks = next_chunks
+
+        report['seconds'] = round(time.perf_counter() - started, 3)
+        report['input_segments'] = len(texts)
+        self.last_report = report
+        log.info("Summary finished", extra={'seconds': report['seconds'], 'levels': len(report['levels']),
+                                            'truncated': report['truncated']})
+        return {'summary': summary, 'report': report}
+
+    def _pack(self, texts):
+        """Group consecutive texts into chunks of at most chunk_tokens tokens"""
+        if not texts:
+            return []
+        pieces = []
+        for text, ids in zip(texts, self.tokenizer(texts, add_special_tokens=False)['input_ids']):
+            if len(ids) <= self.chunk_tokens:
+                pieces.append((text, len(ids)))
+                continue
+            # A single text longer than a chunk is cut into chunk-sized windows
+            for start in range(0, len(ids), self.chunk_tokens):
+                window = ids[start:start + self.chunk_tokens]
+                pieces.append((self.tokenizer.decode(window), len(window)))
+
+        chunks, current, current_tokens = [], [], 0
+        for text, length in pieces:
+            if current and current_tokens + length > self.chunk_tokens:
+                chunks.append(" ".join(current))
+                current, current_tokens = [], 0
+            current.append(text)
+            current_tokens += length
+        if current:
+            chunks.append(" ".join(current))
+        return chunks
+
+    def _summarize_chunks(self, chunks, deadline, report):
+        summaries = []
+        for start in range(0, len(chunks), self.batch_size):
+            batch = chunks[start:start + self.batch_size]
+            if time.perf_counter() > deadline:
+                # Out of budget: keep the opening sentence of each chunk
+                report['truncated'] = True
+                summaries.extend(chunk.split(". ")[0].rstrip(".") + "." for chunk in batch)
+                continue
+            prompts = [SUMMARY_PROMPT.format(text=chunk) for chunk in batch]
+            summaries.extend(self.generate(prompts, self.summary_tokens, report))
+        return summaries
+
+    def generate(self, prompts, max_new_tokens, report=None):
+        """Greedy batched generation; returns the first line of each continuation (worker thread)"""
+        import torch
+
+        inputs = self.tokenizer(prompts, return_tensors="pt", padding=True,
+                                truncation=True, max_length=self.chunk_tokens + 64)
+        with torch.inference_mode():
+            output = self.model.generate(
+                input_ids=inputs.input_ids,
+                attention_mask=inputs.attention_mask,
+                max_new_tokens=max_new_tokens,
+                do_sample=False,  # Deterministic summaries
+                num_beams=1,
+                no_repeat_ngram_size=3,
+                pad_token_id=self.tokenizer.pad_token_id
+            )
+        new_tokens = output[:, inputs.input_ids.shape[1]:]
+        if report is not None:
+            report['generated_tokens'] += int((new_tokens != self.tokenizer.pad_token_id).sum())
+        return [text.strip().split("\n")[0] or "(no summary)"
+                for text in self.tokenizer.batch_decode(new_tokens, skip_special_tokens=True)]
+
+
+class IncrementalSummarizer:
+    """Rolling "summary so far" maintained while a meeting is recorded.
+
+    New segments are collected into a window. Once the window covers
+    ``window_ms`` of audio, only that window is summarized and the result is
+    merged into the running summary, whose length is capped at
+    ``summary_tokens``. Every update therefore costs the same two bounded
+    generations however long the meeting runs. At most one update is in
+    flight; segments arriving meanwhile wait for the next window. A failed
+    update puts its window back, and the retry waits with an exponential
+    back-off; when the model could not be loaded at all, live summaries
+    stop for the session.
+    """
+
+    def __init__(self, service, window_ms=60000, summary_tokens=120, on_update=None):
+        self.service = service
+        self.window_ms = window_ms
+        self.summary_tokens = summary_tokens
+        self.on_update = on_update
+        self.summary = ""
+        self.covered_until_ms = 0
+        self.updates = 0
+        self.last_update_seconds = None
+        self.pending = []
+        self.in_flight = None
+        self.failures = 0  # Consecutive failed updates
+        self.retry_at = 0.0  # time.monotonic() before which no update is started
+        self.disabled = False
+        self.lock = threading.Lock()
+
+    def add_segment(self, segment):
+        """Queue a newly transcribed segment; starts an update when the window is full"""
+        with self.lock:
+            if self.disabled:
+                return
+            self.pending.append(segment)
+            future = self._start_update()
+        if future:
+            # Outside the lock: an already finished future runs the callback at once
+            future.add_done_callback(self._update_done)
+
+    def flush(self):
+        """Fold all remaining segments into the summary; returns a Future of the summary"""
+        # Queued behind any update already submitted, so windows stay in order
+        return self.service.run_in_worker(self._run_update, True)
+
+    def _pending_span(self):
+        return self.pending[-1].end_ms - self.pending[0].start_ms
+
+    def _start_update(self):
+        """Submit an update if the window is full (lock held); returns its Future or None.
+
+        The caller registers _update_done once the lock is released.
+        """
+        if (self.in_flight is not None or not self.pending or self._pending_span() < self.window_ms
+                or time.monotonic() < self.retry_at):
+            return None
+        self.in_flight = self.service.run_in_worker(self._run_update, False)
+        return self.in_flight
+
+    def _run_update(self, whole):
+        # The window is taken when the job runs, not when it is queued. One
+        # window's worth of the oldest segments is used; a backlog built up
+        # during a slow update is drained by the following updates.
+        with self.lock:
+            count = len(self.pending)
+            if count and not whole:
+                end_ms = self.pending[0].start_ms + self.window_ms
+                count = next((i for i, segment in enumerate(self.pending) if segment.end_ms > end_ms),
+                             count) or 1
+            window, self.pending = self.pending[:count], self.pending[count:]
+        if window:
+            try:
+                self._update(window)
+            except Exception:
+                # Back in front, so the retry covers the same audio
+                with self.lock:
+                    if not self.disabled:
+                        self.pending[:0] = window
+                raise
+        return self.summary
+
+    def _update(self, window):
+        """Summarize the window and merge it into the running summary (worker thread)"""
+        started = time.perf_counter()
+        service = self.service
+        window_text = " ".join(segment.text for segment in window)
+        window_summary = service.generate([SUMMARY_PROMPT.format(text=window_text)],
+                                          service.summary_tokens)[0]
+        if self.summary:
+            prompt = MERGE_PROMPT.format(summary=self.summary, update=window_summary)
+            summary = service.generate([prompt], self.summary_tokens)[0]
+        else:
+            summary = window_summary
+        self.summary = summary
+        self.covered_until_ms = window[-1].end_ms
+        self.updates += 1
+        self.last_update_seconds = round(time.perf_counter() - started, 3)
+        if self.on_update:
+            self.on_update(summary)
+        return summary
+
+    def _update_done(self, future):
+        error = None if future.cancelled() else future.exception()
+        with self.lock:
+            self.in_flight = None
+            if error is None:
+                self.failures = 0
+            elif self.service.load_error is not None:
+                # Every later update would fail the same way
+                self.disabled = True
+                self.pending = []
+                log.error("Live summary disabled, the summarization model is unavailable",
+                          extra={'error': str(error)})
+            else:
+                self.failures += 1
+                delay = min(2 ** self.failures, 60)
+                self.retry_at = time.monotonic() + delay
+                log.error("Incremental summary update failed", extra={'error': str(error), 'retry_seconds': delay})
+            next_update = None if self.disabled else self._start_update()
+        if next_update:
+            next_update.add_done_callback(self._update_done)
+
+
+if __name__ == "__main__":
+    import sys
+    from file_manager import FileManager
+
+    if len(sys.argv) != 2:
+        print("Usage: python summarization_service.py <transcription.json|.txt|.smtc>")
+        sys.exit(1)
+
+    file_manager = FileManager()
+    service = SummarizationService.from_environment()
+    result = service.summarize(file_manager.load_segments(sys.argv[1]))
+    report = result['report']
+    print(f"\nSummary:\n{result['summary']}\n")
+    print(f"Latency: {report['seconds']} s, levels: {report['levels']}, "
+          f"generated tokens: {report['generated_tokens']}, truncated: {report['truncated']}")
+    if sys.argv[1].endswith('.json'):
+        file_manager.update_transcription_json(sys.argv[1], summary=result['summary'])
+    service.close()
@@ -67,19 +67,15 @@ def test_real_time_chunks():
     try:
         recorder.start_recording()
         
-        for i in range(10):
-            time.sleep(1)
-            
-            # Try to get and transcribe chunks
-            chunk_file = recorder.get_audio_chunk()
-            if chunk_file:
-                transcription = transcription_service.transcribe_audio(chunk_file)
-                if transcription:
-                    print(f"Chunk {i+1}: {transcription}")
-                else:
-                    print(f"Chunk {i+1}: [No transcription]")
+        # Each 1-second chunk is handed over as soon as it is captured
+        for i, (chunk_file, _, _) in enumerate(recorder.chunks(), 1):
+            transcription = transcription_service.transcribe_audio(chunk_file)
+            if transcription:
+                print(f"Chunk {i}: {transcription}")
             else:
-                print(f"Chunk {i+1}: [No audio chunk available]")
+                print(f"Chunk {i}: [No transcription]")
+            if i == 10:
+                break
         
         recorder.stop_recording()
         print("Real-time test completed")
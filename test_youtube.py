@@ -7,7 +7,6 @@ sys.path.append(os.path.dirname(__file__))
 
 from enhanced_audio_recorder import EnhancedAudioRecorder
 from transcription_service import TranscriptionService
-import time
 
 def test_youtube_recording():
     print("=== YouTube System Audio Test ===")
@@ -27,22 +26,18 @@ def test_youtube_recording():
         # Start recording
         recorder.start_recording()
         
-        # Record for 10 seconds, checking audio levels
-        for i in range(10):
-            time.sleep(1)
+        # Record 10 seconds as 2-second chunks, checking audio levels
+        for i, (chunk_file, start_ms, end_ms) in enumerate(recorder.chunks(seconds=2), 1):
             level = recorder.get_audio_levels()
-            print(f"Second {i+1}: Audio level = {level:.1f}%")
-            
-            # Try to get a chunk every 2 seconds
-            if i > 0 and i % 2 == 0:
-                chunk_file = recorder.get_audio_chunk(seconds=2)
-                if chunk_file:
-                    print(f"  Processing chunk: {os.path.basename(chunk_file)}")
-                    text = transcription_service.transcribe_audio(chunk_file)
-                    if text:
-                        print(f"  ✅ Live transcription: {text}")
-                    else:
-                        print("  ⚠️  No transcription for this chunk")
+            print(f"Seconds {start_ms / 1000:.0f}-{end_ms / 1000:.0f}: Audio level = {level:.1f}%")
+            print(f"  Processing chunk: {os.path.basename(chunk_file)}")
+            text = transcription_service.transcribe_audio(chunk_file)
+            if text:
+                print(f"  ✅ Live transcription: {text}")
+            else:
+                print("  ⚠️  No transcription for this chunk")
+            if i == 5:
+                break
         
         # Stop recording and get final result
         recorder.stop_recording()
@@ -0,0 +1,83 @@
+import wave
+
+import numpy as np
+import pytest
+
+from alignment_index import AlignmentIndex, write_alignment
+from session_audio import SessionAudio
+from transcript_segment import TranscriptSegment
+
+RATE = 16000
+
+
+@pytest.fixture
+def session_file(tmp_path):
+    """Ten seconds of mono audio whose samples count the milliseconds"""
+    filename = str(tmp_path / "session.wav")
+    samples = (np.arange(10 * RATE) * 1000 // RATE).astype('<i2')
+    with wave.open(filename, 'wb') as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(RATE)
+        wf.writeframes(samples.tobytes())
+    return filename
+
+
+def make_segments():
+    segments = [TranscriptSegment("from an earlier recording", 0, 500)]
+    for i in range(4):
+        start = i * 2000
+        segments.append(TranscriptSegment("hello there", start, start + 1500, words=[
+            {'word': 'hello', 'start_ms': start, 'end_ms': start + 600},
+            {'word': 'there', 'start_ms': start + 700, 'end_ms': start + 1500},
+        ]))
+    segments.append(TranscriptSegment("no word timings", 8000, 9000))
+    return segments
+
+
+@pytest.fixture
+def index(tmp_path, session_file):
+    filename = str(tmp_path / "meeting.align")
+    assert write_alignment(make_segments(), filename, session_file, first_segment=1) == 5
+    index = AlignmentIndex(filename)
+    yield index
+    index.close()
+
+
+def test_segment_and_word_offsets(index, session_file):
+    with SessionAudio(session_file) as session:
+        assert index.audio_file == session_file
+        assert index.segment_bytes(2) == (session.byte_offset(2000), session.byte_offset(3500))
+        assert index.word_bytes(2, 1) == (session.byte_offset(2700), session.byte_offset(3500))
+    assert index.to_ms(index.segment_bytes(3)[0]) == 4000
+    assert [index.word_count(segment) for segment in range(1, 6)] == [2, 2, 2, 2, 0]
+
+
+def test_segment_numbers_outside_the_recording(index):
+    with pytest.raises(IndexError):
+        index.segment_bytes(0)
+    with pytest.raises(IndexError):
+        index.segment_bytes(6)
+    with pytest.raises(IndexError):
+        index.word_bytes(5, 0)
+
+
+def test_segment_at(index):
+    assert index.segment_at(100) == 1
+    assert index.segment_at(2100) == 2
+    assert index.segment_at(1700) is None  # Between segments
+    assert index.segment_at(8500) == 5
+    assert index.segment_at(9500) is None
+
+
+def test_audio_views_the_archive(index):
+    audio = index.audio(3, 1)
+    assert audio.shape == (800 * RATE // 1000, 1)
+    assert audio[0, 0] == 4700 and audio[-1, 0] == 5499
+
+
+def test_rejects_other_files(tmp_path):
+    filename = tmp_path / "other.align"
+    filename.write_bytes(b"\0" * 64)
+    with pytest.raises(ValueError):
+        AlignmentIndex(str(filename))
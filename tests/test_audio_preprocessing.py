@@ -0,0 +1,59 @@
+import numpy as np
+
+from audio_preprocessing import AudioPreprocessor
+
+RATE = 16000
+BLOCK = 1024
+
+
+def process_blocks(preprocessor, signal):
+    blocks = [preprocessor.process(signal[start:start + BLOCK].copy()) for start in range(0, len(signal), BLOCK)]
+    blocks.append(preprocessor.flush())
+    return np.concatenate([block for block in blocks if block is not None])
+
+
+def tone(frequency, seconds, amplitude):
+    t = np.arange(int(seconds * RATE)) / RATE
+    return (amplitude * np.sin(2 * np.pi * frequency * t)).astype(np.float32).reshape(-1, 1)
+
+
+def gate_only():
+    return AudioPreprocessor(RATE, dc=False, agc=False)
+
+
+def test_gate_output_lines_up_with_the_input():
+    preprocessor = gate_only()
+    ramp = np.linspace(0.0, 0.5, BLOCK * 3 + 300, dtype=np.float32).reshape(-1, 1)  # Ends with a short block
+    assert preprocessor.process(ramp[:BLOCK].copy()) is None
+    output = process_blocks(preprocessor, ramp[BLOCK:])
+    assert preprocessor.flush() is None
+    # Nothing is gated before a quiet block, so the blocks come back unchanged
+    np.testing.assert_allclose(output, ramp, atol=1e-5)
+
+
+def test_block_boundaries_are_continuous():
+    # Quiet noise to learn the floor, then a tone the gate partly attenuates
+    rng = np.random.default_rng(0)
+    signal = 0.002 * rng.standard_normal((BLOCK * 64, 1)).astype(np.float32)
+    signal[BLOCK * 16:] += tone(440, BLOCK * 48 / RATE, 0.01)
+    output = process_blocks(gate_only(), signal)[BLOCK * 20:, 0]
+    jumps = np.abs(np.diff(output))
+    at_boundaries = jumps[BLOCK - 1::BLOCK]
+    interior = np.delete(jumps, np.arange(BLOCK - 1, len(jumps), BLOCK))
+    assert at_boundaries.mean() < 1.2 * interior.mean()
+
+
+def test_sustained_tone_is_not_learned_as_noise():
+    signal = tone(300, 8, 0.1)
+    output = process_blocks(gate_only(), signal)
+    assert output.shape == signal.shape
+    tail = slice(-RATE * 2, None)
+    kept = np.sqrt(np.mean(output[tail] ** 2)) / np.sqrt(np.mean(signal[tail] ** 2))
+    assert kept > 0.95
+
+
+def test_quiet_noise_is_attenuated():
+    rng = np.random.default_rng(1)
+    signal = 0.002 * rng.standard_normal((RATE * 4, 1)).astype(np.float32)
+    output = process_blocks(gate_only(), signal)
+    assert np.sqrt(np.mean(output[-RATE:] ** 2)) < 0.5 * np.sqrt(np.mean(signal[-RATE:] ** 2))
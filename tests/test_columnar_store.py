@@ -0,0 +1,52 @@
+import pytest
+
+from columnar_store import (ColumnarReader, _read_varint, _unzigzag, _write_varint, _zigzag,
+                            read_columnar, write_columnar)
+from transcript_segment import TranscriptSegment
+
+
+@pytest.mark.parametrize("value", [0, 1, 127, 128, 300, 2 ** 31, 2 ** 63 - 1])
+def test_varint_round_trip(value):
+    buffer = bytearray()
+    _write_varint(buffer, value)
+    assert _read_varint(buffer, 0) == (value, len(buffer))
+
+
+@pytest.mark.parametrize("value", [0, 1, -1, 63, -64, 1000, -1000, 2 ** 40, -2 ** 40])
+def test_zigzag_round_trip(value):
+    assert _zigzag(value) >= 0
+    assert _unzigzag(_zigzag(value)) == value
+
+
+def make_segments(count):
+    return [TranscriptSegment(f"segment {i} says hello", i * 1000, i * 1000 + 800,
+                              speaker=f"Speaker {i % 3}" if i % 4 else None,
+                              source="microphone" if i % 2 else None,
+                              confidence=0.5 if i % 5 else None)
+            for i in range(count)]
+
+
+def test_write_read_round_trip(tmp_path):
+    segments = make_segments(50)
+    filename = str(tmp_path / "meeting.smtc")
+    assert write_columnar(segments, filename, block_size=8) == 50
+    assert [segment.to_dict() for segment in read_columnar(filename)] == \
+        [segment.to_dict() for segment in segments]
+
+
+def test_read_range_returns_overlapping_segments(tmp_path):
+    filename = str(tmp_path / "meeting.smtc")
+    write_columnar(make_segments(50), filename, block_size=8)
+    with ColumnarReader(filename) as reader:
+        assert len(reader) == 50
+        assert reader.duration_ms == 49800
+        found = reader.read_range(10500, 13000)
+        assert [segment.start_ms for segment in found] == [10000, 11000, 12000]
+        assert reader.read_range(100000, 200000) == []
+
+
+def test_rejects_other_files(tmp_path):
+    filename = tmp_path / "other.smtc"
+    filename.write_bytes(b"\0" * 64)
+    with pytest.raises(ValueError):
+        ColumnarReader(str(filename))
@@ -0,0 +1,63 @@
+import pytest
+
+from model_pool import ModelPool, parse_model_paths
+
+SIZES = {'/models/en': 40, '/models/fr': 40, '/models/de': 40, '/models/small': 10}
+
+
+def fake_loader(path):
+    if path == '/models/broken':
+        raise OSError("no model here")
+    return f"model:{path}"
+
+
+def make_pool(budget_mb=100, **paths):
+    paths = paths or {'en': '/models/en', 'fr': '/models/fr', 'de': '/models/de'}
+    return ModelPool(paths, budget_mb=budget_mb, loader=fake_loader, size_of=lambda path: SIZES.get(path, 40))
+
+
+def test_parse_model_paths():
+    assert parse_model_paths(" en=/a , fr=/b,bad,=/c,de= ") == {'en': '/a', 'fr': '/b'}
+    assert parse_model_paths(None) == {}
+
+
+def test_get_loads_once_and_falls_back_to_default():
+    pool = ModelPool({'en': '/models/en'}, default_path='/models/small', loader=fake_loader,
+                     size_of=SIZES.get)
+    assert pool.get('en') == "model:/models/en"
+    assert pool.get('it') == "model:/models/small"
+    assert pool.loaded_mb() == 50
+    assert make_pool().get('it') is None
+
+
+def test_least_recently_used_model_is_evicted_over_budget():
+    pool = make_pool()
+    pool.get('en')
+    pool.get('fr')
+    pool.get('en')  # fr is now the least recently used
+    pool.get('de')
+    assert list(pool.models) == ['/models/en', '/models/de']
+    assert pool.loaded_mb() <= pool.budget_mb
+
+
+def test_failed_load_keeps_loaded_models():
+    pool = make_pool(budget_mb=60, en='/models/en', de='/models/broken')
+    assert pool.get('en') is not None
+    assert pool.get('de') is None
+    assert list(pool.models) == ['/models/en']
+    assert '/models/broken' in pool.failed
+
+
+def test_get_without_eviction_only_loads_what_fits():
+    pool = make_pool(budget_mb=80)
+    pool.get('en')
+    assert pool.get('fr', evict=False) is not None
+    assert pool.get('de', evict=False) is None
+    assert list(pool.models) == ['/models/en', '/models/fr']
+
+
+@pytest.mark.parametrize("budget_mb, loaded", [(100, ['/models/en', '/models/fr']), (50, ['/models/en'])])
+def test_warm_up_stays_within_budget(budget_mb, loaded):
+    pool = make_pool(budget_mb=budget_mb)
+    pool.warm_up()
+    assert list(pool.models) == loaded
@@ -0,0 +1,20 @@
+from pipeline_metrics import MetricsRegistry
+
+
+def test_prometheus_label_values_are_escaped():
+    registry = MetricsRegistry(prefix="test_")
+    registry.counter("chunks_total", "Chunks\nsaved", path='C:\\temp\\"a".wav', device="Mic\n2").inc(3)
+    lines = registry.to_prometheus().splitlines()
+    assert "# HELP test_chunks_total Chunks\\nsaved" in lines
+    assert 'test_chunks_total{device="Mic\\n2",path="C:\\\\temp\\\\\\"a\\".wav"} 3' in lines
+
+
+def test_histogram_is_exported_as_summary():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "Latency", stage="asr")
+    for value in (0.1, 0.2, 0.3):
+        histogram.observe(value)
+    text = registry.to_prometheus()
+    assert "# TYPE latency_seconds summary" in text
+    assert 'latency_seconds_count{stage="asr"} 3' in text
+    assert 'latency_seconds{stage="asr",quantile="0.5"}' in text
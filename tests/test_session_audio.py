@@ -0,0 +1,19 @@
+import os
+
+from session_audio import prune_recordings
+
+
+def test_prune_keeps_the_newest_recordings(tmp_path):
+    for i in range(5):
+        path = tmp_path / f"session_20260101_000000_{i}.wav"
+        path.write_bytes(b"")
+        os.utime(path, (1000 + i, 1000 + i))
+    (tmp_path / "notes.txt").write_text("kept")
+
+    assert prune_recordings(tmp_path, 2) == 3
+    assert sorted(os.listdir(tmp_path)) == ["notes.txt", "session_20260101_000000_3.wav",
+                                            "session_20260101_000000_4.wav"]
+
+
+def test_prune_missing_directory(tmp_path):
+    assert prune_recordings(tmp_path / "missing", 2) == 0
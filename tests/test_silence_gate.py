@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from silence_gate import SilenceGate, block_rms
+
+
+def test_block_rms():
+    blocks = [np.full((4, 1), 0.5, dtype=np.float32), np.zeros((4, 2), dtype=np.float32)]
+    assert block_rms(blocks) == pytest.approx([0.5, 0.0])
+
+
+def test_floor_drops_at_once_and_rises_slowly():
+    gate = SilenceGate(rise=0.1)
+    gate.is_silent([0.01, 0.02])
+    assert gate.floor == pytest.approx(0.01)
+    gate.is_silent([0.004, 0.02])
+    assert gate.floor == pytest.approx(0.004)
+    gate.is_silent([0.02, 0.05])
+    assert gate.floor == pytest.approx(0.0044)
+
+
+@pytest.mark.parametrize("floor, threshold", [(None, 0.003), (0.0001, 0.003), (0.002, 0.006), (0.05, 0.03)])
+def test_threshold_is_clamped(floor, threshold):
+    gate = SilenceGate(ratio=3.0, min_rms=0.003, max_rms=0.03)
+    gate.floor = floor
+    assert gate.threshold == pytest.approx(threshold)
+
+
+def test_chunk_is_silent_when_its_loudest_block_is_below_the_threshold():
+    gate = SilenceGate(ratio=3.0, rise=0.0)
+    assert gate.is_silent([0.002, 0.004, 0.005])  # Floor 0.002, threshold 0.006
+    assert not gate.is_silent([0.002, 0.05])
+
+
+def test_noisy_floor_cannot_mute_speech():
+    gate = SilenceGate(max_rms=0.03)
+    for _ in range(20):
+        gate.is_silent([0.02, 0.025])  # A loud room
+    assert gate.threshold == 0.03
+    assert not gate.is_silent([0.02, 0.1])
@@ -0,0 +1,105 @@
+import pytest
+
+from subtitle_exporter import SubtitleWriter, export_subtitles, format_cue_time
+from transcript_segment import TranscriptSegment
+
+
+def read_cues(path):
+    """(timing, lines) of each cue in an SRT or WebVTT file"""
+    blocks = path.read_text(encoding='utf-8').strip().split("\n\n")
+    if blocks[0] == "WEBVTT":
+        blocks = blocks[1:]
+    cues = []
+    for block in blocks:
+        lines = block.split("\n")
+        if "-->" not in lines[0]:
+            lines = lines[1:]  # SRT cue number
+        cues.append((lines[0], lines[1:]))
+    return cues
+
+
+def cue_ms(timing):
+    """(start_ms, end_ms) of a cue timing line"""
+    return tuple(parse_cue_time(value) for value in timing.split(" --> "))
+
+
+def parse_cue_time(value):
+    hours, minutes, rest = value.split(":")
+    seconds, millis = rest.replace(",", ".").split(".")
+    return ((int(hours) * 60 + int(minutes)) * 60 + int(seconds)) * 1000 + int(millis)
+
+
+def test_format_cue_time():
+    assert format_cue_time(3723004, ",") == "01:02:03,004"
+    assert format_cue_time(-5, ".") == "00:00:00.000"
+
+
+def test_unknown_format_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        SubtitleWriter(tmp_path / "out.ass", "ass")
+
+
+def test_short_segment_is_one_cue(tmp_path):
+    path = tmp_path / "out.srt"
+    assert export_subtitles([TranscriptSegment("Hello there.", 1000, 2500)], str(path)) == 1
+    assert path.read_text(encoding='utf-8') == "1\n00:00:01,000 --> 00:00:02,500\nHello there.\n\n"
+
+
+def test_long_segment_is_split_by_max_cue_ms(tmp_path):
+    path = tmp_path / "out.srt"
+    text = " ".join(f"word{i}" for i in range(30))
+    export_subtitles([TranscriptSegment(text, 0, 20000)], str(path), max_line_length=200, max_cue_ms=7000)
+    cues = read_cues(path)
+    assert len(cues) == 3
+    spans = [cue_ms(timing) for timing, _ in cues]
+    assert spans[0][0] == 0 and spans[-1][1] == 20000
+    assert all(end - start <= 7000 for start, end in spans)
+    assert " ".join(" ".join(lines) for _, lines in cues) == text
+
+
+def test_sparse_segment_cues_stay_within_max_cue_ms(tmp_path):
+    path = tmp_path / "out.srt"
+    export_subtitles([TranscriptSegment("Yes. No.", 0, 30000)], str(path), max_cue_ms=7000)
+    spans = [cue_ms(timing) for timing, _ in read_cues(path)]
+    assert all(end - start <= 7000 for start, end in spans)
+
+
+def test_lines_are_split_by_max_lines(tmp_path):
+    path = tmp_path / "out.vtt"
+    text = "one two three four five six seven eight nine ten eleven twelve"
+    export_subtitles([TranscriptSegment(text, 0, 3000)], str(path), max_line_length=10, max_lines=2)
+    cues = read_cues(path)
+    assert len(cues) > 1
+    for _, lines in cues:
+        assert len(lines) <= 2
+        assert all(len(line) <= 10 for line in lines)
+
+
+def test_srt_speaker_label_counts_towards_the_line_length(tmp_path):
+    path = tmp_path / "out.srt"
+    segment = TranscriptSegment("the quick brown fox jumps over", 0, 3000, speaker="Alice")
+    export_subtitles([segment], str(path), max_line_length=20)
+    (_, lines), = read_cues(path)
+    assert lines[0].startswith("Alice: ")
+    assert all(len(line) <= 20 for line in lines)
+    assert " ".join(lines) == "Alice: the quick brown fox jumps over"
+
+
+def test_vtt_voice_tag_takes_no_width(tmp_path):
+    path = tmp_path / "out.vtt"
+    segment = TranscriptSegment("the quick brown fox jumps over", 0, 3000, speaker="Alice")
+    export_subtitles([segment], str(path), max_line_length=20)
+    assert path.read_text(encoding='utf-8').startswith("WEBVTT\n\n")
+    (_, lines), = read_cues(path)
+    assert lines[0].startswith("<v Alice>")
+    assert len(lines[0]) - len("<v Alice>") <= 20
+    assert all(len(line) <= 20 for line in lines[1:])
+
+
+def test_every_split_cue_keeps_the_speaker(tmp_path):
+    path = tmp_path / "out.srt"
+    text = " ".join(f"word{i}" for i in range(20))
+    export_subtitles([TranscriptSegment(text, 0, 15000, speaker="Bob")], str(path), max_cue_ms=5000)
+    cues = read_cues(path)
+    assert len(cues) >= 3
+    assert all(lines[0].startswith("Bob: ") for _, lines in cues)
@@ -0,0 +1,56 @@
+import pytest
+
+from transcript_archive import TranscriptArchive
+from transcript_segment import TranscriptSegment
+
+
+@pytest.fixture
+def archive(tmp_path):
+    archive = TranscriptArchive(str(tmp_path))
+    yield archive
+    archive.close()
+
+
+def save(tmp_path, name, segments):
+    path = tmp_path / name
+    path.write_text("transcript")
+    return str(path), segments
+
+
+def test_search_returns_segment_offsets(tmp_path, archive):
+    path, segments = save(tmp_path, "budget.txt", [
+        TranscriptSegment("We agreed on the budget for next quarter", 1000, 4000, speaker="Alice"),
+        TranscriptSegment("Lunch is at noon", 5000, 6000),
+    ])
+    archive.index_transcript(path, segments)
+    hits = archive.search("budget quarter")
+    assert len(hits) == 1
+    assert (hits[0]['name'], hits[0]['start_ms'], hits[0]['end_ms'], hits[0]['speaker']) == \
+        ("budget.txt", 1000, 4000, "Alice")
+    assert "[budget]" in hits[0]['snippet']
+    assert archive.search("dinner") == []
+
+
+def test_reindexing_replaces_segments(tmp_path, archive):
+    path, _ = save(tmp_path, "meeting.txt", [])
+    archive.index_transcript(path, [TranscriptSegment("first draft wording", 0, 1000)])
+    archive.index_transcript(path, [TranscriptSegment("final wording", 0, 1000)])
+    assert archive.search("draft") == []
+    assert len(archive.search("wording")) == 1
+    assert len(archive.list_transcripts()) == 1
+
+
+def test_remove_cascades_to_segments(tmp_path, archive):
+    path, _ = save(tmp_path, "meeting.txt", [])
+    archive.index_transcript(path, [TranscriptSegment("roadmap review", 0, 1000)])
+    archive.remove_transcript(path)
+    assert archive.search("roadmap") == []
+    assert archive.indexed_files() == {}
+    with archive.lock:
+        assert archive.conn.execute("SELECT COUNT(*) FROM segments").fetchone() == (0,)
+
+
+def test_quotes_in_plain_queries_are_escaped(tmp_path, archive):
+    path, _ = save(tmp_path, "meeting.txt", [])
+    archive.index_transcript(path, [TranscriptSegment('he said "ship it"', 0, 1000)])
+    assert len(archive.search('"ship')) == 1
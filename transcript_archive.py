@@ -0,0 +1,139 @@
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transcripts (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    name TEXT NOT NULL,
+    modified REAL NOT NULL,
+    meeting_date TEXT,
+    duration TEXT,
+    summary TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_transcripts_modified ON transcripts(modified DESC);
+
+CREATE TABLE IF NOT EXISTS segments (
+    id INTEGER PRIMARY KEY,
+    transcript_id INTEGER NOT NULL REFERENCES transcripts(id) ON DELETE CASCADE,
+    start_ms INTEGER NOT NULL,
+    end_ms INTEGER NOT NULL,
+    speaker TEXT,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_segments_transcript ON segments(transcript_id);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS segments_fts USING fts5(
+    text, speaker, content='segments', content_rowid='id'
+);
+
+CREATE TRIGGER IF NOT EXISTS segments_ai AFTER INSERT ON segments BEGIN
+    INSERT INTO segments_fts(rowid, text, speaker) VALUES (new.id, new.text, new.speaker);
+END;
+CREATE TRIGGER IF NOT EXISTS segments_ad AFTER DELETE ON segments BEGIN
+    INSERT INTO segments_fts(segments_fts, rowid, text, speaker)
+    VALUES ('delete', old.id, old.text, old.speaker);
+END;
+"""
+
+
+class TranscriptArchive:
+    """SQLite full-text index over saved transcriptions.
+
+    Every transcript is stored with its metadata and timed segments; the
+    segment text is indexed with FTS5 so searches return ranked hits with
+    their offsets in the recording. The index is updated incrementally as
+    transcripts are saved or deleted.
+    """
+
+    def __init__(self, directory, filename="archive.db"):
+        self.db_path = os.path.join(directory, filename)
+        self.lock = threading.Lock()
+        # Shared between the UI and worker threads, serialized by self.lock
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.executescript(SCHEMA)
+
+    def index_transcript(self, path, segments, modified=None, meeting_date=None,
+                         duration=None, summary=None):
+        """Add or replace a transcript and its segments in the index"""
+        path = os.path.abspath(path)
+        if modified is None:
+            modified = os.path.getmtime(path)
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM transcripts WHERE path = ?", (path,))
+            cursor = self.conn.execute(
+                "INSERT INTO transcripts (path, name, modified, meeting_date, duration, summary) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (path, os.path.basename(path), modified, meeting_date, duration, summary)
+            )
+            transcript_id = cursor.lastrowid
+            self.conn.executemany(
+                "INSERT INTO segments (transcript_id, start_ms, end_ms, speaker, text) "
+                "VALUES (?, ?, ?, ?, ?)",
+                ((transcript_id, segment.start_ms, segment.end_ms, segment.speaker, segment.text)
+                 for segment in segments)
+            )
+
+    def remove_transcript(self, path):
+        """Drop a transcript and its segments from the index"""
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM transcripts WHERE path = ?", (os.path.abspath(path),))
+
+    def indexed_files(self):
+        """Return {path: modified} for every indexed transcript"""
+        with self.lock:
+            return dict(self.conn.execute("SELECT path, modified FROM transcripts"))
+
+    def list_transcripts(self, limit=None):
+        """List indexed transcripts, most recently modified first"""
+        query = "SELECT name, path, modified FROM transcripts ORDER BY modified DESC"
+        params = ()
+        if limit is not None:
+            query += " LIMIT ?"
+            params = (limit,)
+        with self.lock:
+            rows = self.conn.execute(query, params).fetchall()
+        return [{
+            'name': name,
+            'path': path,
+            'modified': datetime.fromtimestamp(modified)
+        } for name, path, modified in rows]
+
+    def search(self, query, limit=20, raw=False):
+        """Full-text search over segment text, best matches first.
+
+        Plain queries match all words in any order; pass raw=True to use
+        FTS5 query syntax (phrases, OR, NEAR, prefix*) directly.
+        """
+        if not raw:
+            query = " ".join('"' + term.replace('"', '""') + '"' for term in query.split())
+        if not query:
+            return []
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT t.name, t.path, s.start_ms, s.end_ms, s.speaker, "
+                "snippet(segments_fts, 0, '[', ']', '...', 12), bm25(segments_fts) AS score "
+                "FROM segments_fts "
+                "JOIN segments s ON s.id = segments_fts.rowid "
+                "JOIN transcripts t ON t.id = s.transcript_id "
+                "WHERE segments_fts MATCH ? ORDER BY score LIMIT ?",
+                (query, limit)
+            ).fetchall()
+        return [{
+            'name': name,
+            'path': path,
+            'start_ms': start_ms,
+            'end_ms': end_ms,
+            'speaker': speaker,
+            'snippet': snippet,
+            'score': -score  # bm25() is lower-is-better
+        } for name, path, start_ms, end_ms, speaker, snippet, score in rows]
+
+    def close(self):
+        """Close the database connection"""
+        with self.lock:
+            self.conn.close()
@@ -0,0 +1,105 @@
+import re
+
+
+class TranscriptSegment:
+    """A piece of recognized speech positioned on the recording timeline.
+
+    ``start_ms`` and ``end_ms`` are offsets from the first captured sample,
+    derived from sample counts rather than the wall clock.
+    """
+
+    def __init__(self, text, start_ms, end_ms, speaker=None, source=None,
+                 confidence=None, words=None):
+        self.text = text
+        self.start_ms = int(start_ms)
+        self.end_ms = int(end_ms)
+        self.speaker = speaker
+        self.source = source
+        self.confidence = confidence
+        self.words = words or []
+
+    @property
+    def duration_ms(self):
+        return self.end_ms - self.start_ms
+
+    def format_line(self):
+        """Format the segment as a transcript line stamped with its audio offset"""
+        label = self.speaker or ""
+        if self.source:
+            label = f"{label} ({self.source})" if label else self.source.capitalize()
+        label = f"{label}: " if label else ""
+        return f"[{format_offset(self.start_ms)}] {label}{self.text}"
+
+    def to_dict(self):
+        """Convert the segment to a JSON-serializable dictionary"""
+        data = {
+            'text': self.text,
+            'start_ms': self.start_ms,
+            'end_ms': self.end_ms
+        }
+        if self.speaker is not None:
+            data['speaker'] = self.speaker
+        if self.source is not None:
+            data['source'] = self.source
+        if self.confidence is not None:
+            data['confidence'] = self.confidence
+        if self.words:
+            data['words'] = self.words
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a segment from a dictionary produced by to_dict"""
+        return cls(
+            data.get('text', ''),
+            data.get('start_ms', 0),
+            data.get('end_ms', 0),
+            speaker=data.get('speaker'),
+            source=data.get('source'),
+            confidence=data.get('confidence'),
+            words=data.get('words')
+        )
+
+    def __repr__(self):
+        return f"TranscriptSegment({self.start_ms}-{self.end_ms}ms, {self.text!r})"
+
+
+def samples_to_ms(samples, rate):
+    """Convert a sample count at the given rate to whole milliseconds"""
+    return samples * 1000 // rate
+
+
+def format_offset(ms):
+    """Format a millisecond offset as HH:MM:SS"""
+    seconds = int(ms) // 1000
+    return f"{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+
+def segments_to_text(segments):
+    """Join segments into the plain-text transcript layout used by the UI"""
+    return "".join(segment.format_line() + "\n" for segment in segments)
+
+
+_LINE_PATTERN = re.compile(r"^\[(\d{2}):(\d{2}):(\d{2})\] (.+)$")
+_MS_PER_WORD = 400  # 150 words per minute, the speaking rate app.py assumes
+
+
+def parse_transcript_text(text):
+    """Recover segments from a plain-text transcript written by the UI.
+
+    Plain text only keeps start times, so each end is estimated from the
+    word count and clipped to the next start. Lines without a timestamp are
+    skipped.
+    """
+    segments = []
+    for line in text.splitlines():
+        match = _LINE_PATTERN.match(line.strip())
+        if not match:
+            continue
+        hours, minutes, seconds, content = match.groups()
+        start_ms = (int(hours) * 3600 + int(minutes) * 60 + int(seconds)) * 1000
+        if segments and segments[-1].end_ms > start_ms:
+            segments[-1].end_ms = max(start_ms, segments[-1].start_ms)
+        end_ms = start_ms + _MS_PER_WORD * len(content.split())
+        segments.append(TranscriptSegment(content, start_ms, end_ms))
+    return segments
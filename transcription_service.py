@@ -1,62 +1,126 @@
 import speech_recognition as sr
 import os
+import tempfile
+import threading
 from datetime import datetime
+from transcript_segment import TranscriptSegment, format_offset
+from pipeline_metrics import metrics
+from structured_logging import get_logger
+from model_pool import ModelPool, read_pcm16, score_languages
+
+log = get_logger("transcription")
+
+DEFAULT_LANGUAGE = "en"
+
+# Language tags of Google's recognizer and of the pocketsphinx-data folders
+LANGUAGE_TAGS = {
+    'en': 'en-US',
+    'es': 'es-ES',
+    'fr': 'fr-FR',
+    'de': 'de-DE',
+    'it': 'it-IT',
+    'pt': 'pt-BR',
+    'ru': 'ru-RU',
+    'ja': 'ja-JP',
+    'ko': 'ko-KR',
+    'zh': 'zh-CN'
+}
+
+# Chunks with speech used to identify the language in "auto" mode
+LANGUAGE_ID_CHUNKS = 3
 
 class TranscriptionService:
     def __init__(self):
         self.recognizer = sr.Recognizer()
         self.recognizer.energy_threshold = 300
         self.recognizer.dynamic_energy_threshold = True
+        # Vosk models per language (VOSK_MODELS, VOSK_MODEL), loaded on first use
+        self.model_pool = ModelPool.from_environment()
+        self.language = DEFAULT_LANGUAGE  # A code of get_available_languages or "auto"
+        self.language_lock = threading.Lock()
+        self._reset_identification()
         
-    def transcribe_audio(self, audio_file_path):
+    def transcribe_audio(self, audio_file_path, start_ms=None):
         """Transcribe audio file to text"""
+        text = self._recognize_file(audio_file_path)
+        return self._format_transcription(text, start_ms)
+    
+    def transcribe_segment(self, audio_file_path, start_ms, end_ms):
+        """Transcribe an audio chunk into a TranscriptSegment spanning its audio offsets"""
+        text = self._clean_text(self._recognize_file(audio_file_path))
+        if not text:
+            return None
+        return TranscriptSegment(text, start_ms, end_ms)
+    
+    def transcribe_range(self, session_audio, start_ms, end_ms):
+        """Re-recognize a range of an archived recording (a session_audio.SessionAudio)"""
+        clip = os.path.join(tempfile.gettempdir(), f"range_{threading.get_ident()}_{start_ms}_{end_ms}.wav")
+        try:
+            session_audio.export_clip(start_ms, end_ms, clip)
+            return self.transcribe_segment(clip, start_ms, end_ms)
+        finally:
+            if os.path.exists(clip):
+                os.remove(clip)
+    
+    def _recognize_file(self, audio_file_path):
+        """Run recognition on an audio file and return the raw text"""
         if not os.path.exists(audio_file_path):
-            print(f"Audio file not found: {audio_file_path}")
+            log.warning("Audio file not found", extra={'path': audio_file_path})
             return ""
+        
+        if self.language == "auto" and self.detected_language is None:
+            self._identify_language(audio_file_path)
+        language_tag = self._language_tag()
             
         try:
-            print(f"Attempting to transcribe: {audio_file_path}")
+            log.debug("Transcribing chunk", extra={'path': audio_file_path})
+            # Record the whole file: calibrating on ambient noise here would
+            # swallow the first 200 ms and shift every offset in the chunk
             with sr.AudioFile(audio_file_path) as source:
-                # Adjust for ambient noise
-                self.recognizer.adjust_for_ambient_noise(source, duration=0.2)
                 audio = self.recognizer.record(source)
             
             # Try Google Speech Recognition first
             try:
-                print("Using Google Speech Recognition...")
-                text = self.recognizer.recognize_google(audio)
-                print(f"Transcription successful: {text}")
-                return self._format_transcription(text)
+                with metrics.time("recognizer_latency_seconds", "Recognition time per chunk",
+                                  backend="google"):
+                    text = self.recognizer.recognize_google(audio, language=language_tag)
+                log.debug("Transcription successful", extra={'backend': 'google', 'chars': len(text)})
+                return text
             except sr.UnknownValueError:
-                print("Google Speech Recognition could not understand audio")
+                log.debug("No speech recognized", extra={'backend': 'google'})
                 return ""
             except sr.RequestError as e:
-                print(f"Google Speech Recognition request failed: {e}")
+                metrics.counter("recognizer_errors_total", "Failed recognition requests",
+                                backend="google").inc()
+                log.warning("Recognition request failed, using offline recognition",
+                            extra={'backend': 'google', 'error': str(e)})
                 # Fallback to offline recognition
-                return self._offline_transcription(audio)
+                return self._offline_transcription(audio, language_tag)
                 
         except Exception as e:
-            print(f"Transcription error: {e}")
+            log.error("Transcription error", extra={'path': audio_file_path, 'error': str(e)})
             return ""
     
-    def _offline_transcription(self, audio):
+    def _offline_transcription(self, audio, language_tag="en-US"):
         """Fallback offline transcription using PocketSphinx"""
         try:
-            text = self.recognizer.recognize_sphinx(audio)
-            return self._format_transcription(text)
-        except:
-            return "[Could not transcribe audio segment]"
+            with metrics.time("recognizer_latency_seconds", backend="sphinx"):
+                return self.recognizer.recognize_sphinx(audio, language=language_tag)
+        except Exception as e:
+            log.warning("Offline recognition failed", extra={'backend': 'sphinx', 'error': str(e)})
+            metrics.counter("recognizer_errors_total", backend="sphinx").inc()
+            return ""  # No segment rather than a placeholder in the transcript
     
     def transcribe_microphone(self, duration=5):
         """Transcribe directly from microphone"""
         try:
             with sr.Microphone() as source:
-                print("Adjusting for ambient noise...")
+                log.info("Adjusting for ambient noise")
                 self.recognizer.adjust_for_ambient_noise(source)
-                print(f"Listening for {duration} seconds...")
+                log.info("Listening", extra={'seconds': duration})
                 audio = self.recognizer.listen(source, timeout=duration)
             
-            text = self.recognizer.recognize_google(audio)
+            text = self.recognizer.recognize_google(audio, language=self._language_tag())
             return self._format_transcription(text)
             
         except sr.WaitTimeoutError:
@@ -64,23 +128,130 @@ class TranscriptionService:
         except sr.UnknownValueError:
             return ""
         except Exception as e:
-            print(f"Microphone transcription error: {e}")
+            log.error("Microphone transcription error", extra={'error': str(e)})
             return ""
     
-    def _format_transcription(self, text):
-        """Format transcription with timestamp and cleanup"""
+    def supports_streaming(self):
+        """True when interim hypotheses are available (vosk and a model for the language)"""
+        return self.model_pool.get(self.recognition_language()) is not None
+    
+    def create_streaming_recognizer(self, rate):
+        """Return a VoskStreamingRecognizer for audio at `rate`, or None.
+
+        In "auto" mode, identify the language first (see
+        streaming_recognition.identify_streaming_language); otherwise the
+        recognizer uses the language identified so far, or the default one.
+        """
+        model = self.model_pool.get(self.recognition_language())
+        if model is None:
+            return None
+        from streaming_recognition import VoskStreamingRecognizer
+        return VoskStreamingRecognizer(model, rate, self._clean_text)
+    
+    def warm_up_models(self):
+        """Load the offline models of the configured languages, within the memory budget"""
+        languages = self.model_pool.languages()
+        if self.language != "auto" and self.language in languages:
+            # The selected language first, so it is not the one left out
+            languages.remove(self.language)
+            languages.insert(0, self.language)
+        self.model_pool.warm_up(languages)
+    
+    def recognition_language(self):
+        """The language chunks are recognized in: the selected, identified or default one"""
+        if self.language != "auto":
+            return self.language
+        with self.language_lock:
+            if self.detected_language:
+                return self.detected_language
+            if self.language_votes:
+                return max(self.language_votes, key=self.language_votes.get)
+        return DEFAULT_LANGUAGE
+    
+    def _language_tag(self):
+        language = self.recognition_language()
+        return LANGUAGE_TAGS.get(language, language)
+    
+    def _reset_identification(self):
+        self.detected_language = None
+        self.language_votes = {}  # Summed scores of the chunks identified so far
+        self.identified_chunks = 0
+    
+    def needs_identification(self):
+        """True in "auto" mode while the language of the recording is not identified yet"""
+        return self.language == "auto" and self.detected_language is None
+    
+    def identify_samples(self, samples, rate):
+        """Identify the language from float32 audio, like _identify_language does from a chunk"""
+        if samples.ndim == 2:
+            samples = samples.mean(axis=1)
+        data = (samples.clip(-1.0, 1.0) * 32767).astype('<i2').tobytes()
+        self._vote(data, rate)
+    
+    def _identify_language(self, audio_file_path):
+        """Score a chunk in every configured language until LANGUAGE_ID_CHUNKS had speech"""
+        try:
+            data, rate = read_pcm16(audio_file_path)
+        except Exception as e:
+            log.warning("Language identification failed", extra={'error': str(e)})
+            return
+        self._vote(data, rate)
+    
+    def _vote(self, data, rate):
+        languages = self.model_pool.languages()
+        if len(languages) < 2:
+            # Nothing to choose from: the only model's language, or the default
+            with self.language_lock:
+                self.detected_language = languages[0] if languages else DEFAULT_LANGUAGE
+            log.info("Language identification needs VOSK_MODELS with two or more languages",
+                     extra={'language': self.detected_language})
+            return
+        try:
+            with metrics.time("language_id_seconds", "Time to identify the language of a chunk"):
+                scores = score_languages(self.model_pool, data, rate, languages)
+        except Exception as e:
+            log.warning("Language identification failed", extra={'error': str(e)})
+            return
+        if not any(scores.values()):
+            return  # No speech to judge by
+        with self.language_lock:
+            if self.detected_language:
+                return
+            for language, score in scores.items():
+                self.language_votes[language] = self.language_votes.get(language, 0.0) + score
+            self.identified_chunks += 1
+            if self.identified_chunks >= LANGUAGE_ID_CHUNKS:
+                self.detected_language = max(self.language_votes, key=self.language_votes.get)
+                log.info("Identified language", extra={'language': self.detected_language,
+                                                       'chunks': self.identified_chunks})
+    
+    def _clean_text(self, text):
+        """Basic text cleanup and punctuation"""
         if not text:
             return ""
             
-        # Basic text cleanup
         text = text.strip()
         text = text.capitalize()
         
         # Add punctuation if missing
         if text and not text.endswith(('.', '!', '?')):
             text += '.'
+        return text
+    
+    def _format_transcription(self, text, start_ms=None):
+        """Format transcription with timestamp and cleanup.
+
+        When the audio offset of the chunk is known it is used for the
+        timestamp; otherwise the wall clock is used.
+        """
+        text = self._clean_text(text)
+        if not text:
+            return ""
         
-        timestamp = datetime.now().strftime("%H:%M:%S")
+        if start_ms is not None:
+            timestamp = format_offset(start_ms)
+        else:
+            timestamp = datetime.now().strftime("%H:%M:%S")
         return f"[{timestamp}] {text}"
     
     def get_available_languages(self):
@@ -99,5 +270,7 @@ class TranscriptionService:
         }
     
     def set_language(self, language_code):
-        """Set the recognition language"""
-        self.language = language_code
+        """Set the recognition language; "auto" identifies it from the first chunks"""
+        with self.language_lock:
+            self.language = language_code
+            self._reset_identification()
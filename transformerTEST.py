@@ -1,66 +1,31 @@
-<<<<<<< HEAD
-from transformers import AutoTokenizer, AutoModelForCausalLM
-import torch
-
-# Use the smaller GPT-Neo model
-MODEL_NAME = "EleutherAI/gpt-neo-125M"
-
-# Load the tokenizer and model
-tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
-model = AutoModelForCausalLM.from_pretrained(MODEL_NAME)
-
-# Set the pad token to the EOS token if not already defined
-if tokenizer.pad_token is None:
-    tokenizer.pad_token = tokenizer.eos_token
-
-def generate_text(prompt, max_length=100):
-    # Tokenize the input prompt with padding and truncation
-    inputs = tokenizer(prompt, return_tensors="pt", padding=True, truncation=True)
-    
-    # Generate text without tracking gradients (improves performance on CPU)
-    with torch.no_grad():
-        output = model.generate(
-            input_ids=inputs.input_ids,
-            attention_mask=inputs.attention_mask,
-            max_length=max_length,
-            do_sample=True,  # Enables sampling for varied outputs
-            top_p=0.95,      # Nucleus sampling for diversity
-            top_k=50         # Consider only the top 50 tokens at each step
-        )
-    return tokenizer.decode(output[0], skip_special_tokens=True)
-
-if __name__ == "__main__":
-    prompt = input("Enter your prompt: ")
-    generated_text = generate_text(prompt)
-    print("\nGenerated Text:\n", generated_text)
-=======
-from transformers import AutoTokenizer, AutoModelForCausalLM
 import torch
+from summarization_service import MODEL_NAME, load_language_model
 
-# Use the smaller GPT-Neo model
-MODEL_NAME = "EleutherAI/gpt-neo-125M"
+# The smaller GPT-Neo model is loaded on first use, not at import time
+_tokenizer = None
+_model = None
 
-# Load the tokenizer and model
-tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
-model = AutoModelForCausalLM.from_pretrained(MODEL_NAME)
-
-# Set the pad token to the EOS token if not already defined
-if tokenizer.pad_token is None:
-    tokenizer.pad_token = tokenizer.eos_token
+def _get_model():
+    global _tokenizer, _model
+    if _model is None:
+        _tokenizer, _model = load_language_model(MODEL_NAME)
+    return _tokenizer, _model
 
 def generate_text(prompt, max_length=100):
+    tokenizer, model = _get_model()
     # Tokenize the input prompt with padding and truncation
     inputs = tokenizer(prompt, return_tensors="pt", padding=True, truncation=True)
     
-    # Generate text without tracking gradients (improves performance on CPU)
-    with torch.no_grad():
+    # Generate text without autograd bookkeeping (improves performance on CPU)
+    with torch.inference_mode():
         output = model.generate(
             input_ids=inputs.input_ids,
             attention_mask=inputs.attention_mask,
             max_length=max_length,
             do_sample=True,  # Enables sampling for varied outputs
             top_p=0.95,      # Nucleus sampling for diversity
-            top_k=50         # Consider only the top 50 tokens at each step
+            top_k=50,        # Consider only the top 50 tokens at each step
+            pad_token_id=tokenizer.pad_token_id
         )
     return tokenizer.decode(output[0], skip_special_tokens=True)
 
@@ -68,4 +33,3 @@ if __name__ == "__main__":
     prompt = input("Enter your prompt: ")
     generated_text = generate_text(prompt)
     print("\nGenerated Text:\n", generated_text)
->>>>>>> 3bac854e4f4370cb0e196d3fab9eaac203402b44
@@ -0,0 +1,70 @@
+import threading
+import time
+
+from pipeline_metrics import metrics
+
+UI_FLUSHES = metrics.counter("ui_flushes_total", "Coalesced transcript updates applied to the UI")
+UI_UPDATES = metrics.counter("ui_updates_total", "Transcript updates posted to the UI")
+
+
+class CoalescingUpdater:
+    """Batches transcript updates from worker threads into at most max_fps UI flushes.
+
+    Final segments are queued in order; of the interim hypotheses only the
+    latest is kept. The first update after a quiet period is flushed at
+    once, later ones wait for the next frame, so a burst of partials costs
+    one scheduled callback per frame instead of one per partial.
+
+    schedule(delay_ms, callback) runs callback on the UI thread, e.g.
+    tkinter's root.after. on_segments(list) and on_live(text) apply the
+    batch there.
+    """
+
+    def __init__(self, schedule, on_segments, on_live, max_fps=10):
+        self.schedule = schedule
+        self.on_segments = on_segments
+        self.on_live = on_live
+        self.interval = 1.0 / max_fps
+        self.lock = threading.Lock()
+        self.segments = []
+        self.live = None  # None: the live line is unchanged
+        self.scheduled = False
+        self.last_flush = 0.0
+
+    def add_segment(self, segment):
+        with self.lock:
+            self.segments.append(segment)
+            self._request()
+
+    def set_live(self, text):
+        """Replace the interim hypothesis; "" clears the live line"""
+        with self.lock:
+            self.live = text
+            self._request()
+
+    def _request(self):
+        UI_UPDATES.inc()
+        if self.scheduled:
+            return
+        self.scheduled = True
+        delay = max(self.last_flush + self.interval - time.monotonic(), 0)
+        self.schedule(int(delay * 1000), self._flush)
+
+    def flush(self):
+        """Apply the queued updates now (UI thread), e.g. before finishing a recording.
+
+        A flush already scheduled still runs later, finding nothing to do.
+        """
+        self._flush()
+
+    def _flush(self):
+        with self.lock:
+            segments, self.segments = self.segments, []
+            live, self.live = self.live, None
+            self.scheduled = False
+            self.last_flush = time.monotonic()
+        UI_FLUSHES.inc()
+        if segments:
+            self.on_segments(segments)
+        if live is not None:
+            self.on_live(live)